@@ -0,0 +1,87 @@
+"""remove_repeated_phrases 차등 검증 + 속도 비교 (오프라인)
+
+예전(슬라이스 비교) 구현과 현재 구현을 합성 말뭉치에 돌려 결과가 완전히 같은지 확인하고
+걸린 시간을 비교한다.
+
+    python benchmarks/clean_subtitles.py [--words 200000] [--fuzz 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import youtube_subtitle_downloader_cached as downloader  # noqa: E402
+
+
+def legacy_remove_repeated_phrases(text):
+    # 기준 구현 (clean_subtitles 안에 있던 예전 코드 그대로)
+    words = text.split()
+    n = len(words)
+    i = 0
+    result = []
+
+    while i < n:
+        found_repeat = False
+        for length in range(1, min(15, n - i)):
+            segment = words[i:i + length]
+            repetitions = 0
+            for j in range(i, min(i + length * 3, n), length):
+                if j + length <= n and words[j:j + length] == segment:
+                    repetitions += 1
+                else:
+                    break
+            if repetitions >= 3:
+                found_repeat = True
+                i += length * repetitions
+                result.extend(segment)
+                break
+        if not found_repeat:
+            result.append(words[i])
+            i += 1
+
+    return " ".join(result)
+
+
+def synthetic_transcript(word_count, vocab_size=3000, seed=0):
+    """자동 자막처럼 구문이 2~4번씩 반복되는 구간이 섞인 단어열"""
+    rng = random.Random(seed)
+    vocab = [f"단어{i}" for i in range(vocab_size)]
+    words = []
+    while len(words) < word_count:
+        phrase = [rng.choice(vocab) for _ in range(rng.randint(1, 16))]
+        words.extend(phrase * rng.choice((1, 1, 1, 2, 3, 4)))
+    return " ".join(words[:word_count])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=200000)
+    parser.add_argument("--fuzz", type=int, default=2000)
+    args = parser.parse_args()
+
+    # 작은 어휘로 만든 짧은 문장: 겹치는 반복, 끝부분 경계 등 까다로운 경우를 많이 만든다
+    rng = random.Random(1)
+    for _ in range(args.fuzz):
+        text = " ".join(rng.choice("abc") for _ in range(rng.randint(0, 60)))
+        assert downloader.remove_repeated_phrases(text) == legacy_remove_repeated_phrases(text), text
+
+    text = synthetic_transcript(args.words)
+    start = time.perf_counter()
+    expected = legacy_remove_repeated_phrases(text)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = downloader.remove_repeated_phrases(text)
+    elapsed = time.perf_counter() - start
+
+    assert actual == expected, "결과가 예전 구현과 다릅니다"
+    print(f"fuzz {args.fuzz}건 + 합성 자막 {args.words}단어: 결과 동일")
+    print(f"예전 구현: {legacy_elapsed:.3f}초, 현재 구현: {elapsed:.3f}초 ({legacy_elapsed / elapsed:.1f}배)")
+
+
+if __name__ == "__main__":
+    main()
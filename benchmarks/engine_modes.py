@@ -0,0 +1,52 @@
+"""subprocess 모드와 in-process 모드의 초당 추출 횟수 비교 (오프라인)
+
+    python benchmarks/engine_modes.py [--calls 40] [--threads 4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+# 영상 정보 추출만 비교하도록 자막 트랙은 빼고 돌린다 (실행 파일 모드는 환경 변수로 전달)
+os.environ["FAKE_YTDLP_WITH_SUBTITLES"] = "0"
+
+import fake_yt_dlp  # noqa: E402
+import youtube_subtitle_downloader_cached as downloader  # noqa: E402
+
+
+class FakeEngine(downloader.YtDlpEngine):
+    def _make_ydl(self, params):
+        return fake_yt_dlp.make_ydl(params)
+
+
+def measure(engine, calls, threads):
+    urls = [f"https://www.youtube.com/watch?v=fake{i:07d}" for i in range(calls)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        infos = list(executor.map(engine.video_info, urls))
+    elapsed = time.perf_counter() - start
+    assert all(info["id"] == url.split("v=")[-1] for info, url in zip(infos, urls))
+    return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    fake_command = [sys.executable, os.path.join(BENCH_DIR, "fake_yt_dlp.py")]
+    results = {}
+    for mode in ("subprocess", "inprocess"):
+        results[mode] = measure(FakeEngine(mode, command=fake_command), args.calls, args.threads)
+        print(f"{mode:>10}: {results[mode]:8.1f} calls/s")
+    print(f"in-process 속도 향상: {results['inprocess'] / results['subprocess']:.1f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""네트워크 없이 yt-dlp 를 흉내 내는 가짜 추출기.
+
+- 실행 파일로 쓰면 (`python fake_yt_dlp.py <url> --dump-json ...`) 실제 yt-dlp 처럼
+  인터프리터 기동 + yt_dlp import 비용을 치른 뒤 yt-dlp 의 옵션 해석을 그대로 거쳐 결과를 출력한다.
+  (--dump-json, --flat-playlist --print, --write-auto-sub --output 등)
+- in-process 모드에서는 `make_ydl` 로 가짜 추출기만 등록된 YoutubeDL 인스턴스를 만든다.
+
+동작은 아래 모듈 변수(또는 실행 파일용 같은 이름의 환경 변수 FAKE_YTDLP_*)로 조절한다.
+멤버 전용/자막 없음은 영상 ID 로 정해지므로 다시 시도해도 결과가 같고,
+일시적 실패(FAILURE_RATE)만 시도마다 무작위로 일어난다.
+"""
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import vtt_corpus  # noqa: E402
+
+
+def _env(name, default, cast=float):
+    value = os.environ.get(f"FAKE_YTDLP_{name}")
+    return cast(value) if value else default
+
+
+FAKE_LATENCY = _env("LATENCY", 0.0)  # 추출 1회당 인위적 지연 (초)
+LATENCY_JITTER = _env("LATENCY_JITTER", 0.0)  # 지연에 더해지는 0~jitter 초의 무작위 값
+FAILURE_RATE = _env("FAILURE_RATE", 0.0)  # 시도마다 일시적 실패(HTTP 503)가 날 확률
+THROTTLE_RATE = _env("THROTTLE_RATE", 0.0)  # 시도마다 HTTP 429 가 날 확률
+MEMBERS_ONLY_RATE = _env("MEMBERS_ONLY_RATE", 0.0)  # 멤버 전용 영상 비율
+NO_SUBTITLES_RATE = _env("NO_SUBTITLES_RATE", 0.0)  # 자동 자막이 없는 영상 비율
+MANUAL_SUBTITLES_RATE = _env("MANUAL_SUBTITLES_RATE", 0.0)  # 업로더가 올린(수동) 자막도 있는 영상 비율
+WITH_SUBTITLES = _env("WITH_SUBTITLES", 1, int)  # 0 이면 자막 트랙을 돌려주지 않는다 (예전 동작)
+CHANNEL_SIZE = _env("CHANNEL_SIZE", 100, int)  # 핸들 끝에 숫자가 없을 때 채널 영상 수
+CHANNEL_NEWEST = _env("CHANNEL_NEWEST", 1_700_000_000, int)  # 채널 최신 영상의 업로드 시각 (epoch)
+UPLOAD_INTERVAL = _env("UPLOAD_INTERVAL", 3600, int)  # 채널 영상 사이의 업로드 간격 (초)
+# 0 보다 크면 채널 목록이 이 개수만큼 나온 뒤 HTTP 429 로 끊긴다 (실행 파일은 반환 코드 1)
+LIST_FAIL_AFTER = _env("LIST_FAIL_AFTER", 0, int)
+# 1 이면 채널 목록의 timestamp 를 YouTube 처럼 현재 시각 기준 상대 시간("3 days ago")에서 계산한 근삿값으로 준다
+APPROXIMATE_DATES = _env("APPROXIMATE_DATES", 0, int)
+SUBTITLE_VARIANTS = 16  # 서로 다른 자막 문서 수 (생성 비용을 벤치마크 시간에서 빼기 위해 재사용)
+
+_random = random.Random()
+
+
+def _video_fraction(video_id, salt):
+    # 영상 ID 마다 고정된 [0, 1) 값
+    return zlib.crc32(f"{salt}:{video_id}".encode()) / 2 ** 32
+
+
+@lru_cache(maxsize=SUBTITLE_VARIANTS)
+def subtitle_document(variant):
+    minutes = 1 + variant * 59 / (SUBTITLE_VARIANTS - 1) if variant % 4 == 0 else 2 + variant
+    return vtt_corpus.generate_rolling_vtt(minutes, seed=variant)
+
+
+def _channel_size(handle):
+    digits = "".join(char for char in handle if char.isdigit())
+    return int(digits) if digits else CHANNEL_SIZE
+
+
+def _upload_timestamp(handle, number):
+    # 채널 목록과 영상 정보가 같은 업로드 시각을 쓰도록 (핸들, 번호) 로 정한다. 번호가 클수록 최신
+    return CHANNEL_NEWEST - (_channel_size(handle) - number) * UPLOAD_INTERVAL
+
+
+def _relative_timestamp(timestamp):
+    # "N units ago" 를 yt-dlp 가 다시 시각으로 바꾼 값처럼 단위에 맞춰 반올림한다
+    age = max(time.time() - timestamp, 0)
+    for limit, unit in ((3600, 60), (86400, 3600), (7 * 86400, 86400), (31 * 86400, 7 * 86400),
+                        (365 * 86400, 30 * 86400)):
+        if age < limit:
+            break
+    else:
+        unit = 365 * 86400
+    return int(time.time() - int(age // unit) * unit)
+
+
+def _sleep():
+    delay = FAKE_LATENCY + (_random.uniform(0, LATENCY_JITTER) if LATENCY_JITTER else 0)
+    if delay:
+        time.sleep(delay)
+
+
+class FakeYoutubeIE(InfoExtractor):
+    IE_NAME = "FakeYoutube"
+    _VALID_URL = r"https?://(?:www\.)?youtube\.com/watch\?v=(?P<id>[\w-]+)"
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        _sleep()
+        if THROTTLE_RATE and _random.random() < THROTTLE_RATE:
+            raise yt_dlp.utils.ExtractorError("Unable to download webpage: HTTP Error 429: Too Many Requests",
+                                              expected=True)
+        if FAILURE_RATE and _random.random() < FAILURE_RATE:
+            raise yt_dlp.utils.ExtractorError("Unable to download webpage: HTTP Error 503: Service Unavailable",
+                                              expected=True)
+        if _video_fraction(video_id, "members") < MEMBERS_ONLY_RATE:
+            raise yt_dlp.utils.ExtractorError(
+                "Join this channel to get access to members-only content like this video", expected=True)
+
+        index = zlib.crc32(video_id.encode())
+        channel_video = re.fullmatch(r"(?P<handle>[\w.-]+)_(?P<number>\d{6})", video_id)
+        if channel_video:
+            uploaded = datetime.fromtimestamp(
+                _upload_timestamp(channel_video["handle"], int(channel_video["number"])), timezone.utc)
+            upload_date = uploaded.strftime("%Y%m%d")
+        else:
+            upload_date = f"2024{index % 12 + 1:02d}{index % 28 + 1:02d}"
+        info = {
+            "id": video_id,
+            "title": f"가짜 영상 {video_id}",
+            "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+            "upload_date": upload_date,
+            "formats": [{"format_id": "18", "url": f"https://example.invalid/{video_id}.mp4", "ext": "mp4"}],
+        }
+        if WITH_SUBTITLES and _video_fraction(video_id, "subtitles") >= NO_SUBTITLES_RATE:
+            # data 가 있는 자막 트랙은 네트워크 없이 그대로 쓰인다. 언어마다 다른 문서를 준다
+            info["automatic_captions"] = {
+                lang: [{"ext": "vtt", "data": subtitle_document((index + offset) % SUBTITLE_VARIANTS),
+                        "url": f"https://example.invalid/{video_id}.{lang}.vtt"}]
+                for offset, lang in enumerate(("ko", "en"))
+            }
+        if WITH_SUBTITLES and _video_fraction(video_id, "manual") < MANUAL_SUBTITLES_RATE:
+            info["subtitles"] = {
+                "ko": [{"ext": "vtt", "data": subtitle_document((index + 7) % SUBTITLE_VARIANTS),
+                        "url": f"https://example.invalid/{video_id}.ko.manual.vtt"}],
+            }
+        return info
+
+
+class FakeChannelIE(InfoExtractor):
+    """`https://www.youtube.com/@bench300/videos` → 영상 300개 (최신순). 숫자가 없으면 CHANNEL_SIZE 개"""
+    IE_NAME = "FakeChannel"
+    _VALID_URL = r"https?://(?:www\.)?youtube\.com/@(?P<id>[\w.-]+?)(?:/videos)?/?$"
+
+    def _real_extract(self, url):
+        handle = self._match_id(url)
+        _sleep()
+        return self.playlist_result(self._entries(handle), handle, f"가짜 채널 {handle}")
+
+    def _entries(self, handle):
+        # 실제 채널 목록처럼 페이지를 넘기며 받는 제너레이터 (LIST_FAIL_AFTER 개 뒤에 끊을 수 있다)
+        for count, number in enumerate(range(_channel_size(handle), 0, -1)):
+            if LIST_FAIL_AFTER and count >= LIST_FAIL_AFTER:
+                raise yt_dlp.utils.ExtractorError("Unable to download API page: HTTP Error 429: Too Many Requests",
+                                                  expected=True)
+            timestamp = _upload_timestamp(handle, number)
+            yield self.url_result(
+                f"https://www.youtube.com/watch?v={handle}_{number:06d}", FakeYoutubeIE.IE_NAME,
+                f"{handle}_{number:06d}", timestamp=_relative_timestamp(timestamp) if APPROXIMATE_DATES else timestamp)
+
+
+def make_ydl(params):
+    ydl = yt_dlp.YoutubeDL(params, auto_init=False)
+    ydl.add_info_extractor(FakeYoutubeIE())
+    ydl.add_info_extractor(FakeChannelIE())
+    return ydl
+
+
+def main(argv):
+    # 실제 yt-dlp 와 같은 기동 비용을 치르도록 기본 추출기 목록을 읽어 둔다
+    yt_dlp.extractor.gen_extractor_classes()
+    parsed = yt_dlp.parse_options(argv)
+    with make_ydl(parsed.ydl_opts) as ydl:
+        return ydl.download(parsed.urls)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
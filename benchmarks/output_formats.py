@@ -0,0 +1,78 @@
+"""출력 형식별 파일 크기 / 쓰기 / 읽기 시간 비교 (오프라인)
+
+    python benchmarks/output_formats.py [--rows 2000] [--words 3000]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import youtube_subtitle_downloader_cached as downloader  # noqa: E402
+
+
+def synthetic_rows(count, words_per_row, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"단어{i}" for i in range(5000)]
+    for i in range(count):
+        yield {
+            "Published At": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00Z",
+            "Title": f"합성 영상 {i}",
+            "Video URL": f"https://www.youtube.com/watch?v=bench{i:06d}",
+            "Subtitles": " ".join(rng.choice(vocab) for _ in range(words_per_row)),
+        }
+
+
+def read_back(output_format, path):
+    if output_format == "csv":
+        downloader.raise_csv_field_limit()
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return sum(1 for _ in csv.DictReader(f))
+    if output_format == "parquet":
+        return downloader.pyarrow.parquet.read_table(path).num_rows
+    with open(path, "rb") as f:
+        reader = io.TextIOWrapper(downloader.zstandard.ZstdDecompressor().stream_reader(f), encoding="utf-8")
+        return sum(1 for line in reader if json.loads(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=3000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_rows(args.rows, args.words))
+    work_dir = tempfile.mkdtemp(prefix="ytsd_bench_")
+    print(f"{'형식':>10} {'크기(MB)':>10} {'쓰기(초)':>10} {'읽기(초)':>10}")
+    for output_format, sink_class in downloader.OUTPUT_FORMATS.items():
+        try:
+            downloader.get_output_sink_class(output_format)
+        except ImportError as e:
+            print(f"{output_format:>10} 건너뜀: {e}")
+            continue
+
+        path = os.path.join(work_dir, f"bench.{sink_class.extension}")
+        start = time.perf_counter()
+        sink = downloader.open_output_sink(output_format, path)
+        for row in rows:
+            sink.write(row)
+        sink.close()
+        write_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        assert read_back(output_format, path) == len(rows)
+        read_elapsed = time.perf_counter() - start
+
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{output_format:>10} {size_mb:10.1f} {write_elapsed:10.2f} {read_elapsed:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""오프라인 벤치마크 모음 (가짜 yt-dlp + 합성 자동 자막)
+
+시나리오마다 별도 프로세스와 임시 폴더에서 돌려서 최대 RSS 와 캐시 상태가 서로 섞이지 않게 한다.
+
+    python benchmarks/suite.py                    # 전체 시나리오
+    python benchmarks/suite.py clean cache        # 일부만
+    python benchmarks/suite.py --quick            # 작은 입력으로 빠르게
+    python benchmarks/suite.py --save-baseline    # benchmarks/baseline.json 갱신
+    python benchmarks/suite.py --compare          # 기준값과 비교, tolerance 이상 나빠지면 종료 코드 1
+
+지표 이름 규칙: `*_per_sec` 는 클수록, 나머지(`*_seconds`, `*_mb`)는 작을수록 좋다.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+RESULT_PREFIX = "BENCH_RESULT "
+
+# e2e 시나리오의 가짜 yt-dlp 설정 (실제 채널에서 보이는 정도의 지연/실패 비율)
+E2E_FAKE = {
+    "LATENCY": 0.05,
+    "LATENCY_JITTER": 0.05,
+    "FAILURE_RATE": 0.01,
+    "MEMBERS_ONLY_RATE": 0.03,
+    "NO_SUBTITLES_RATE": 0.03,
+}
+
+
+def _import_downloader():
+    # 시나리오가 현재 폴더 아래에 만드는 cache/result/logs 가 서로, 또 저장소와 섞이지 않도록 임시 폴더에서 돌린다
+    os.chdir(tempfile.mkdtemp(prefix="ytsd_bench_"))
+    sys.path.insert(0, REPO_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import youtube_subtitle_downloader_cached as downloader
+    logging.getLogger().setLevel(logging.WARNING)
+    return downloader
+
+
+def scenario_clean(downloader, quick):
+    """clean_subtitles: 길이가 다양한 rolling 자동 자막 문서 정리"""
+    import vtt_corpus
+    corpus = vtt_corpus.generate_corpus(40 if quick else 200, seed=7)
+    megabytes = sum(len(document.encode("utf-8")) for document in corpus) / 1e6
+
+    start = time.perf_counter()
+    for document in corpus:
+        downloader.clean_subtitles(document)
+    elapsed = time.perf_counter() - start
+    return {
+        "videos_per_sec": len(corpus) / elapsed,
+        "mb_per_sec": megabytes / elapsed,
+        "total_seconds": elapsed,
+    }
+
+
+def scenario_cache(downloader, quick):
+    """Cache: 쓰기, 새로 연 캐시의 키 인덱스 로드(preload), 디스크 읽기, 메모리 읽기"""
+    count = 5000 if quick else 50000
+    keys = [f"details_bench{i:07d}" for i in range(count)]
+    value = {"title": "가짜 영상", "url": "https://www.youtube.com/watch?v=bench", "published_at": "2024-01-01T00:00:00Z"}
+    path = os.path.abspath("bench_cache.db")
+
+    cache = downloader.Cache(path)
+    start = time.perf_counter()
+    for key in keys:
+        cache.set(key, value)
+    set_elapsed = time.perf_counter() - start
+    cache.close()
+
+    cache = downloader.Cache(path, max_memory_items=count)
+    start = time.perf_counter()
+    missing = cache.missing_keys(keys + [f"details_missing{i}" for i in range(count // 10)])
+    preload_elapsed = time.perf_counter() - start
+    assert len(missing) == count // 10
+
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    cold_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    warm_elapsed = time.perf_counter() - start
+    cache.close()
+    return {
+        "set_per_sec": count / set_elapsed,
+        "preload_seconds": preload_elapsed,
+        "disk_get_per_sec": count / cold_elapsed,
+        "memory_get_per_sec": count / warm_elapsed,
+    }
+
+
+def _stage_busy_seconds(downloader):
+    # 단계별 처리 시간 합계 (여러 worker 가 동시에 쓴 시간의 합)
+    return {
+        key.split('"')[1]: value["sum"]
+        for key, value in downloader.STAGE_SECONDS.summary().items()
+    }
+
+
+def _run_e2e(downloader, quick, mode, languages="ko"):
+    import fake_yt_dlp
+    for name, value in E2E_FAKE.items():
+        setattr(fake_yt_dlp, name if name != "LATENCY" else "FAKE_LATENCY", value)
+        os.environ[f"FAKE_YTDLP_{name}"] = str(value)  # subprocess 모드의 가짜 실행 파일용
+
+    class FakeEngine(downloader.YtDlpEngine):
+        def _make_ydl(self, params):
+            return fake_yt_dlp.make_ydl(params)
+
+    downloader.engine = FakeEngine(mode, command=[sys.executable, os.path.join(BENCH_DIR, "fake_yt_dlp.py")])
+    if mode == "subprocess":
+        size = 20 if quick else 60
+    else:
+        size = 100 if quick else 400
+    channel_url = f"https://www.youtube.com/@bench{size}"
+
+    results = {}
+    for phase in ("cold", "warm"):
+        # warm: 같은 채널을 다시 수집 (캐시와 네거티브 캐시가 채워진 상태)
+        written_before = downloader.VIDEOS_WRITTEN.value()
+        stages_before = _stage_busy_seconds(downloader)
+        start = time.perf_counter()
+        downloader.collect_and_save_data(channel_url, languages)
+        elapsed = time.perf_counter() - start
+        written = downloader.VIDEOS_WRITTEN.value() - written_before
+
+        results[f"{phase}_videos_per_sec"] = written / elapsed
+        results[f"{phase}_seconds"] = elapsed
+        for stage, busy in _stage_busy_seconds(downloader).items():
+            results[f"{phase}_{stage}_busy_seconds"] = busy - stages_before.get(stage, 0)
+        time.sleep(1)  # 출력 파일 이름(초 단위 시각)이 겹치지 않게
+    results["videos"] = size
+    return results
+
+
+def scenario_e2e(downloader, quick):
+    """collect_and_save_data 전체 (in-process yt-dlp, 지연/실패/멤버 전용 포함)"""
+    return _run_e2e(downloader, quick, "inprocess")
+
+
+def scenario_e2e_subprocess(downloader, quick):
+    """collect_and_save_data 전체 (호출마다 가짜 yt-dlp 프로세스 실행)"""
+    return _run_e2e(downloader, quick, "subprocess")
+
+
+def scenario_e2e_languages(downloader, quick):
+    """collect_and_save_data 전체, 세 언어(ko,en,ja)를 영상당 한 번의 추출로 (ja 는 자막 없음)"""
+    return _run_e2e(downloader, quick, "inprocess", languages="ko,en,ja")
+
+
+SCENARIOS = {
+    "clean": scenario_clean,
+    "cache": scenario_cache,
+    "e2e": scenario_e2e,
+    "e2e_subprocess": scenario_e2e_subprocess,
+    "e2e_languages": scenario_e2e_languages,
+}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return {}
+    # 리눅스는 KB, macOS 는 바이트 단위
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / (1024 * 1024)
+    return {
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    }
+
+
+def run_scenario_here(name, quick):
+    downloader = _import_downloader()
+    result = SCENARIOS[name](downloader, quick)
+    result.update(_peak_rss_mb())
+    print(RESULT_PREFIX + json.dumps(result))
+
+
+def run_scenario(name, quick):
+    cmd = [sys.executable, os.path.abspath(__file__), "--run-scenario", name] + (["--quick"] if quick else [])
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"시나리오 {name} 실패 (반환 코드 {completed.returncode}):\n{completed.stderr[-2000:]}")
+
+
+def _is_higher_better(metric):
+    return metric.endswith("_per_sec")
+
+
+def compare(results, baseline, tolerance):
+    """나빠진 지표 목록 [(시나리오, 지표, 현재, 기준, 변화율)]"""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get("results", {}).get(name, {}).get(metric)
+            if not base or metric == "videos":
+                continue
+            change = (value - base) / base
+            worse = -change if _is_higher_better(metric) else change
+            if worse > tolerance:
+                regressions.append((name, metric, value, base, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"실행할 시나리오 (기본값: 전체 = {', '.join(SCENARIOS)})")
+    parser.add_argument("--quick", action="store_true", help="작은 입력으로 빠르게 돌린다")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="결과를 기준값 파일로 저장")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="기준값 파일과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="나빠졌다고 볼 변화율 (기본값: 0.25)")
+    parser.add_argument("--run-scenario", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(unknown)} (가능: {', '.join(SCENARIOS)})")
+
+    if args.run_scenario:
+        run_scenario_here(args.run_scenario, args.quick)
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != args.quick:
+            print(f"경고: 기준값은 quick={baseline.get('quick')} 로 측정되었습니다.")
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        print(f"== {name}: {SCENARIOS[name].__doc__}", flush=True)
+        results[name] = run_scenario(name, args.quick)
+        for metric, value in results[name].items():
+            base = (baseline or {}).get("results", {}).get(name, {}).get(metric)
+            note = f"  (기준 {base:.4g}, {(value - base) / base * 100:+.1f}%)" if base else ""
+            print(f"   {metric:<28} {value:12.4g}{note}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "quick": args.quick,
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpu_count": os.cpu_count()},
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.save_baseline}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, metric, value, base, change in regressions:
+            print(f"성능 저하: {name}.{metric} {base:.4g} → {value:.4g} ({change * 100:+.1f}%)")
+        if regressions:
+            return 1
+        print(f"기준값 대비 {args.tolerance * 100:.0f}% 이상 나빠진 지표 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
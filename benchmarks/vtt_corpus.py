@@ -0,0 +1,100 @@
+"""YouTube 자동 자막처럼 생긴 합성 WebVTT 생성기 (오프라인 벤치마크용)
+
+자동 자막은 한 줄씩 올라가는(rolling) 형식이다. 큐마다 직전 줄이 그대로 다시 나오고
+새 줄에는 단어별 <00:00:01.234><c> 단어</c> 타이밍 태그가 붙으며, 두 큐 사이에는
+10ms 짜리 이어 붙이기 큐가 끼어 있다. 말버릇처럼 같은 구문이 2~4번 반복되는 구간과
+[음악] 같은 효과음 표기도 섞는다.
+
+    python benchmarks/vtt_corpus.py --minutes 10 > sample.vtt
+"""
+import argparse
+import itertools
+import random
+import sys
+
+HEADER = "WEBVTT\nKind: captions\nLanguage: ko\n"
+SOUND_TAGS = ("[음악]", "[박수]", "[웃음]")
+
+
+def _timestamp(seconds):
+    hours, rest = divmod(int(seconds * 1000), 3600 * 1000)
+    minutes, rest = divmod(rest, 60 * 1000)
+    secs, millis = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def _vocabulary(size, rng):
+    syllables = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추"
+    return [
+        "".join(rng.choice(syllables) for _ in range(rng.randint(1, 4)))
+        for _ in range(size)
+    ]
+
+
+def iter_lines(word_count, rng, vocab):
+    """한 줄(4~9 단어)씩 자막 문장을 만든다. 자주 쓰는 단어가 더 자주 나오도록 지프 분포를 흉내 낸다."""
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    words = []
+    while len(words) < word_count:
+        roll = rng.random()
+        if roll < 0.02:
+            words.append(rng.choice(SOUND_TAGS))
+            continue
+        phrase = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(1, 6))
+        # 반복 구간: 말더듬/후렴처럼 같은 구문이 연속으로 나온다
+        words.extend(phrase * (rng.choice((2, 3, 4)) if roll < 0.12 else 1))
+    words = words[:word_count]
+
+    position = 0
+    while position < len(words):
+        length = rng.randint(4, 9)
+        yield words[position:position + length]
+        position += length
+
+
+def generate_rolling_vtt(minutes, seed=0, vocab_size=2000, words_per_minute=150):
+    """minutes 분 분량의 rolling 자동 자막 VTT 문자열"""
+    rng = random.Random(seed)
+    vocab = _vocabulary(vocab_size, rng)
+    parts = [HEADER]
+    clock = rng.uniform(0.1, 1.0)
+    previous = ""
+    for line in iter_lines(int(minutes * words_per_minute), rng, vocab):
+        duration = len(line) * 60 / words_per_minute * rng.uniform(0.8, 1.2)
+        start, end = clock, clock + duration
+
+        timed = [line[0]]
+        step = duration / len(line)
+        for index, word in enumerate(line[1:], 1):
+            timed.append(f"<{_timestamp(start + step * index)}><c> {word}</c>")
+        parts.append(f"\n{_timestamp(start)} --> {_timestamp(end)} align:start position:0%\n"
+                     f"{previous or ' '}\n{''.join(timed)}\n")
+
+        plain = " ".join(line)
+        # 줄이 위로 올라가는 순간의 10ms 큐 (직전 줄 + 빈 줄)
+        parts.append(f"\n{_timestamp(end)} --> {_timestamp(end + 0.01)} align:start position:0%\n{plain}\n \n")
+        previous = plain
+        clock = end + 0.01
+    return "".join(parts)
+
+
+def generate_corpus(count, min_minutes=1, max_minutes=60, seed=0):
+    """길이가 다양한 VTT 문서 count 개 (짧은 영상이 많고 긴 영상은 드물게)"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        minutes = min(max_minutes, max(min_minutes, rng.expovariate(1 / 12)))
+        corpus.append(generate_rolling_vtt(minutes, seed=seed * 100003 + index))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.stdout.write(generate_rolling_vtt(args.minutes, args.seed))
+
+
+if __name__ == "__main__":
+    main()
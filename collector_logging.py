@@ -0,0 +1,175 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+# ─── 큐 기반 로깅 (QueueHandler → QueueListener) ─────────────────────
+# 작업 스레드는 레코드를 큐에 넣기만 하고, 파일/터미널 쓰기는 리스너 스레드 하나가 맡는다.
+# 로그 파일은 한 줄에 JSON 레코드 하나(jsonl)이고, 터미널에는 사람이 읽는 형식으로 찍는다.
+
+CONSOLE_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# LogRecord 기본 속성. 나머지(extra=...)는 JSON 레코드의 필드로 그대로 남긴다
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_setup_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+_log_path = None
+
+
+class JsonFormatter(logging.Formatter):
+    """LogRecord → 한 줄 JSON. extra 로 넘긴 필드도 함께 쓴다"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith("_"):
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(log_folder, level=logging.INFO, console=True):
+    """루트 로거가 큐로만 기록하게 설정하고 JSON 로그 파일 경로를 돌려준다.
+
+    logging.basicConfig 처럼 루트 로거에 이미 핸들러가 있으면(다른 프로그램에 포함된 경우 등) 건드리지 않고
+    None 을 돌려준다. 이미 설정했으면 처음 만든 로그 파일 경로를 그대로 돌려준다.
+    리스너는 프로세스가 끝날 때 큐에 남은 레코드를 모두 쓰고 멈춘다.
+    """
+    global _listener, _queue_handler, _log_path
+    with _setup_lock:
+        if _listener is not None:
+            return _log_path
+        root = logging.getLogger()
+        if root.handlers:
+            return None
+
+        os.makedirs(log_folder, exist_ok=True)
+        path = os.path.join(log_folder, f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        file_handler = logging.FileHandler(path, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+            handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+        _log_path = path
+        atexit.register(shutdown_logging)
+        return path
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 쓰고 리스너와 핸들러를 닫는다"""
+    global _listener, _queue_handler, _log_path
+    with _setup_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = _queue_handler = _log_path = None
+
+
+# ─── 진행 상황 보고 ──────────────────────────────────────────────────
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}시간 {seconds % 3600 // 60}분"
+    if seconds >= 60:
+        return f"{seconds // 60}분 {seconds % 60}초"
+    return f"{seconds}초"
+
+
+class ProgressReporter:
+    """interval 초마다 진행 상황을 샘플링해서 처리량과 남은 시간(ETA)을 로그로 남긴다.
+
+    작업 쪽은 카운터만 올리고 락이나 로그 호출 없이 지나간다. sample() 은 (처리한 수, 전체 수) 를
+    돌려주는 함수이고, detail() 을 주면 그 문자열을 줄 끝에 붙인다. 처리량은 구간별 값을 지수 평활한다.
+    로그 레코드에는 `progress` 필드로 같은 값이 들어가므로 JSON 로그에서 그대로 읽을 수 있다.
+    """
+
+    def __init__(self, sample, interval=5.0, label="진행 상황", detail=None, log=None, smoothing=0.3):
+        self.sample = sample
+        self.interval = interval
+        self.label = label
+        self.detail = detail
+        self.log = log or logger
+        self.smoothing = smoothing
+        self.rate = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._started_at = self._last_time = time.monotonic()
+        self._last_done = self.sample()[0]
+        self._first_done = self._last_done
+        self._thread = threading.Thread(target=self._run, name="progress-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                self.log.debug(f"진행 상황 보고 실패: {e}")
+
+    def report(self, final=False):
+        now = time.monotonic()
+        done, total = self.sample()
+        if now > self._last_time:
+            rate = (done - self._last_done) / (now - self._last_time)
+            self.rate = rate if self.rate is None else self.smoothing * rate + (1 - self.smoothing) * self.rate
+        self._last_time, self._last_done = now, done
+
+        elapsed = now - self._started_at
+        percent = done / total * 100 if total else 100.0
+        if final:
+            average = (done - self._first_done) / elapsed if elapsed else 0.0
+            message = (f"{self.label}: {done}/{total} ({percent:.1f}%) 완료, 평균 초당 {average:.1f}개, "
+                       f"걸린 시간 {format_duration(elapsed)}")
+            fields = {"done": done, "total": total, "rate": round(average, 3), "elapsed": round(elapsed, 3)}
+        else:
+            remaining = max(total - done, 0)
+            eta = remaining / self.rate if self.rate else None
+            eta_text = format_duration(eta) if eta is not None else "알 수 없음"
+            message = (f"{self.label}: {done}/{total} ({percent:.1f}%) 초당 {self.rate:.1f}개, "
+                       f"남은 시간 약 {eta_text}")
+            fields = {"done": done, "total": total, "rate": round(self.rate, 3),
+                      "eta": round(eta, 1) if eta is not None else None, "elapsed": round(elapsed, 3)}
+        detail = self.detail() if self.detail else None
+        if detail:
+            message += f" | {detail}"
+        self.log.info(message, extra={"progress": fields})
+        return fields
+
+    def stop(self):
+        """보고 스레드를 멈추고 마지막 요약을 한 번 남긴다"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+            self.report(final=True)
@@ -0,0 +1,264 @@
+import bisect
+import json
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+# ─── 수집기 계측 (Prometheus 텍스트 형식 + 실행 끝의 JSON 요약) ──────────
+# prometheus_client 없이 표준 라이브러리만 쓴다. 값은 여러 스레드에서 갱신되므로 지표마다 락을 둔다.
+# 레이블은 키워드 인자로 넘기며, 같은 이름의 지표는 같은 레이블 이름을 써야 한다.
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+CPU_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+    def summary(self):
+        with self._lock:
+            return {_format_labels(key) or "total": value for key, value in sorted(self._values.items())}
+
+
+class Gauge(Counter):
+    """set() 으로 값을 바꾸거나, set_function() 으로 읽을 때마다 값을 계산한다 (큐 길이 등)"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation):
+        super().__init__(name, documentation)
+        self._functions = {}
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def set_function(self, func, **labels):
+        with self._lock:
+            self._functions[_label_key(labels)] = func
+
+    def remove(self, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+            self._functions.pop(key, None)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, func in functions.items():
+            try:
+                values[key] = func()
+            except Exception as e:
+                logger.debug(f"게이지 {self.name} 값 계산 실패: {e}")
+        return [(self.name, key, value) for key, value in sorted(values.items())]
+
+    def summary(self):
+        return {_format_labels(key) or "value": value for _, key, value in self.samples()}
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 레이블 → [버킷별 개수 ..., +Inf 개수, 합계]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            series_items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        samples = []
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", key + (("le", _format_value(float(bound))),), cumulative))
+            samples.append((f"{self.name}_count", key, cumulative))
+            samples.append((f"{self.name}_sum", key, series[-1]))
+        return samples
+
+    def _quantile(self, series, q):
+        # Prometheus histogram_quantile 과 같은 방식으로 버킷 안에서 선형 보간한다
+        total = sum(series[:-1])
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, series[:-2]):
+            if count and cumulative + count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        return self.buckets[-1]
+
+    def summary(self):
+        with self._lock:
+            series_items = [(key, list(series)) for key, series in sorted(self._series.items())]
+        result = {}
+        for key, series in series_items:
+            count = sum(series[:-1])
+            result[_format_labels(key) or "all"] = {
+                "count": count,
+                "sum": round(series[-1], 6),
+                "mean": round(series[-1] / count, 6) if count else 0,
+                "p50": round(self._quantile(series, 0.5), 6),
+                "p95": round(self._quantile(series, 0.95), 6),
+            }
+        return result
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.monotonic() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _register(self, metric_class, name, documentation, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, documentation, **kwargs)
+            return metric
+
+    def counter(self, name, documentation):
+        return self._register(Counter, name, documentation)
+
+    def gauge(self, name, documentation):
+        return self._register(Gauge, name, documentation)
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS):
+        return self._register(Histogram, name, documentation, buckets=buckets)
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            "elapsed_seconds": round(time.time() - self.started_at, 3),
+            "metrics": {metric.name: metric.summary() for metric in metrics},
+        }
+
+    def write_summary(self, path, **extra):
+        summary = {**extra, **self.summary()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+
+registry = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body = self.server.registry.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.split("?")[0] == "/metrics.json":
+            body = json.dumps(self.server.registry.summary(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics {self.address_string()} {format % args}")
+
+
+def start_http_server(port, host="127.0.0.1", metrics_registry=None):
+    """/metrics (Prometheus) 와 /metrics.json 을 백그라운드 스레드에서 제공한다.
+
+    기본값은 이 머신에서만 접속할 수 있는 127.0.0.1. 다른 머신의 Prometheus 가 수집하려면 host 를 "0.0.0.0" 등으로 준다.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.registry = metrics_registry or registry
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logger.info(f"메트릭 엔드포인트: http://{host}:{server.server_address[1]}/metrics")
+    return server
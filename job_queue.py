@@ -0,0 +1,263 @@
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# ─── 여러 머신에 영상 나눠 주기 (임대 방식 작업 큐) ─────────────────────
+# 코디네이터가 영상 ID 를 큐에 넣고, 워커는 일정 시간 동안만 유효한 임대(lease)로 작업을 가져간다.
+# 워커가 죽어서 임대 시간이 지나면 작업은 다시 대기 상태로 돌아가 다른 워커가 가져간다.
+# 결과 행은 큐에 함께 저장되고, 코디네이터가 채널별로 모아 하나의 출력 파일로 합친다.
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class LeasedJob:
+    __slots__ = ("job_id", "channel", "video_id", "attempts")
+
+    def __init__(self, job_id, channel, video_id, attempts):
+        self.job_id = job_id
+        self.channel = channel
+        self.video_id = video_id
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"LeasedJob({self.job_id}, {self.channel!r}, {self.video_id!r}, attempts={self.attempts})"
+
+
+class JobQueue(abc.ABC):
+    """작업 큐 어댑터 인터페이스. 다른 저장소(Redis, DB 서버 등)를 쓰려면 이 메서드들을 구현한다.
+
+    같은 (channel, video_id) 는 한 번만 들어가고, 작업은 pending → leased → done/failed 로 진행한다.
+    """
+
+    @abc.abstractmethod
+    def set_meta(self, name, value):
+        pass
+
+    @abc.abstractmethod
+    def get_meta(self, name, default=None):
+        pass
+
+    @abc.abstractmethod
+    def add(self, jobs):
+        """(channel, video_id) 를 주어진 순서대로 대기열에 넣고 새로 들어간 개수를 돌려준다"""
+
+    @abc.abstractmethod
+    def lease(self, worker_id, count, lease_seconds):
+        """만료된 임대를 먼저 회수한 다음, 대기 중인 작업을 최대 count 개 임대한다"""
+
+    @abc.abstractmethod
+    def reclaim_expired(self):
+        """임대 시간이 지난 작업을 대기열로 되돌리고 (시도 횟수를 다 쓴 작업은 실패로) 되돌린 개수를 돌려준다"""
+
+    @abc.abstractmethod
+    def renew(self, worker_id, lease_seconds):
+        """worker_id 가 들고 있는 임대 기간을 모두 연장한다"""
+
+    @abc.abstractmethod
+    def complete(self, job_id, result):
+        pass
+
+    @abc.abstractmethod
+    def fail(self, job_id, reason, retry=False):
+        """retry 이면 시도 횟수가 남은 작업은 대기열로 되돌리고, 아니면 바로 실패로 처리한다"""
+
+    @abc.abstractmethod
+    def release(self, job_id):
+        """처리하지 못한 작업을 바로 대기열로 되돌린다 (종료 중인 워커 등)"""
+
+    @abc.abstractmethod
+    def counts(self):
+        """{상태: 개수}"""
+
+    @abc.abstractmethod
+    def results(self, channel):
+        """channel 의 완료된 결과를 하나씩 돌려준다"""
+
+    @abc.abstractmethod
+    def channels(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """SQLite 파일 하나로 된 작업 큐.
+
+    기본값(WAL)은 같은 머신의 여러 워커 프로세스 전용이다. WAL 의 공유 메모리 인덱스는 다른 머신이나
+    네트워크 파일 시스템 사이에서는 동작하지 않아 큐가 깨질 수 있다. 여러 머신이 파일 잠금이 제대로 동작하는
+    공유 디스크로 같은 파일을 쓸 때는 shared_disk=True 로 롤백 저널(journal_mode=DELETE)을 쓴다.
+    코디네이터와 모든 워커가 같은 설정으로 열어야 한다.
+    임대는 BEGIN IMMEDIATE 트랜잭션 안에서 골라서 표시하므로 두 워커가 같은 작업을 동시에 가져가지 않는다.
+    max_attempts 번 임대했는데도 끝나지 않은 작업은 실패로 처리한다.
+    """
+
+    RESULTS_PAGE_SIZE = 200  # results() 가 한 번에 읽는 결과 행 수
+
+    def __init__(self, db_path, max_attempts=3, shared_disk=False):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._lock = threading.RLock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # 트랜잭션은 직접 연다 (isolation_level=None)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        if shared_disk:
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.execute("PRAGMA synchronous=FULL")
+        else:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " channel TEXT NOT NULL,"
+                " video_id TEXT NOT NULL,"
+                " state TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " leased_by TEXT,"
+                " lease_expires REAL,"
+                " result TEXT,"
+                " reason TEXT,"
+                " UNIQUE (channel, video_id))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    def _transaction(self, immediate=False):
+        return _Transaction(self._conn, self._lock, immediate)
+
+    def set_meta(self, name, value):
+        with self._transaction():
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def get_meta(self, name, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def add(self, jobs):
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO jobs (channel, video_id) VALUES (?, ?)", jobs)
+            return self._conn.total_changes - before
+
+    def _reclaim_expired(self, now):
+        # 임대 시간이 지난 작업: 시도 횟수가 남았으면 대기열로, 다 썼으면 실패로
+        self._conn.execute(
+            "UPDATE jobs SET state = ?, reason = 'lease_expired', leased_by = NULL, lease_expires = NULL"
+            " WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, LEASED, now, self.max_attempts))
+        reclaimed = self._conn.execute(
+            "UPDATE jobs SET state = ?, leased_by = NULL, lease_expires = NULL"
+            " WHERE state = ? AND lease_expires < ?", (PENDING, LEASED, now)).rowcount
+        if reclaimed:
+            logger.warning(f"임대 시간이 지난 작업 {reclaimed}개를 대기열로 되돌림")
+        return reclaimed
+
+    def reclaim_expired(self):
+        with self._transaction(immediate=True):
+            return self._reclaim_expired(time.time())
+
+    def lease(self, worker_id, count, lease_seconds):
+        now = time.time()
+        with self._transaction(immediate=True):
+            self._reclaim_expired(now)
+            rows = self._conn.execute("SELECT id, channel, video_id, attempts FROM jobs WHERE state = ?"
+                                      " ORDER BY id LIMIT ?", (PENDING, count)).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET state = ?, leased_by = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                ((LEASED, worker_id, now + lease_seconds, row[0]) for row in rows))
+        return [LeasedJob(job_id, channel, video_id, attempts + 1) for job_id, channel, video_id, attempts in rows]
+
+    def renew(self, worker_id, lease_seconds):
+        with self._transaction():
+            return self._conn.execute("UPDATE jobs SET lease_expires = ? WHERE state = ? AND leased_by = ?",
+                                      (time.time() + lease_seconds, LEASED, worker_id)).rowcount
+
+    def complete(self, job_id, result):
+        # 임대가 만료돼 다른 워커에게 넘어갔더라도 먼저 끝낸 결과를 받는다 (같은 영상이면 결과도 같다)
+        with self._transaction():
+            self._conn.execute("UPDATE jobs SET state = ?, result = ?, reason = NULL, leased_by = NULL,"
+                               " lease_expires = NULL WHERE id = ? AND state IN (?, ?)",
+                               (DONE, json.dumps(result, ensure_ascii=False), job_id, PENDING, LEASED))
+
+    def fail(self, job_id, reason, retry=False):
+        with self._transaction():
+            self._conn.execute("UPDATE jobs SET state = CASE WHEN ? AND attempts < ? THEN ? ELSE ? END,"
+                               " reason = ?, leased_by = NULL, lease_expires = NULL WHERE id = ? AND state IN (?, ?)",
+                               (retry, self.max_attempts, PENDING, FAILED, reason, job_id, PENDING, LEASED))
+
+    def release(self, job_id):
+        with self._transaction():
+            self._conn.execute("UPDATE jobs SET state = ?, leased_by = NULL, lease_expires = NULL,"
+                               " attempts = MAX(attempts - 1, 0) WHERE id = ? AND state = ?",
+                               (PENDING, job_id, LEASED))
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def results(self, channel):
+        # 결과 행마다 자막 전체가 들어 있으므로 채널 전체를 한 번에 읽지 않고 id 순서로 나눠 읽는다
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute("SELECT id, result FROM jobs WHERE channel = ? AND state = ? AND id > ?"
+                                          " ORDER BY id LIMIT ?",
+                                          (channel, DONE, last_id, self.RESULTS_PAGE_SIZE)).fetchall()
+            if not rows:
+                return
+            for job_id, result in rows:
+                yield json.loads(result)
+            last_id = rows[-1][0]
+
+    def channels(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT channel FROM jobs ORDER BY channel")]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    # isolation_level=None 연결에서 BEGIN/COMMIT/ROLLBACK 을 직접 관리한다
+    def __init__(self, conn, lock, immediate):
+        self.conn = conn
+        self.lock = lock
+        self.immediate = immediate
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+        return False
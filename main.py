@@ -1,47 +1,31 @@
 import json
+import argparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import csv
 import re
 import os
 import subprocess
 from datetime import datetime
-import sys
+import logging
 
-# 로그 디렉토리 생성
-LOG_FOLDER = os.path.join(os.getcwd(), "logs")
-if not os.path.exists(LOG_FOLDER):
-    os.makedirs(LOG_FOLDER)
-
-# Logger 클래스 정의
-class Logger(object):
-    def __init__(self):
-        now = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_filename = os.path.join(LOG_FOLDER, f"log_{now}.txt")
-        self.terminal = sys.stdout
-        self.logfile = open(log_filename, "a", encoding="utf-8")
-
-    def write(self, message):
-        self.terminal.write(message)
-        self.logfile.write(message)
-
-    def flush(self):
-        self.terminal.flush()
-        self.logfile.flush()
+from collector_logging import setup_logging
+# 채널 목록 파일, 가중치 라운드 로빈, 입력 검증은 수집기 모듈의 것을 같이 쓴다 (import 해도 부작용이 없다)
+from youtube_subtitle_downloader_cached import (load_channel_list, interleave_weighted, get_valid_input,
+                                                validate_positive_integer, validate_date_format, validate_languages,
+                                                positive_int_argument, date_argument, languages_argument)
 
-# stdout, stderr 리디렉션
-sys.stdout = Logger()
-sys.stderr = sys.stdout
+# 로그는 `__main__` 에서 setup_logging 으로 설정한다 (import 할 때 stdout 을 바꾸지 않는다)
+LOG_FOLDER = os.path.join(os.getcwd(), "logs")
+logger = logging.getLogger(__name__)
 
 
-# 폴더 설정
+# 폴더 설정 (자막을 처음 받을 때 만든다)
 TEMP_FOLDER = os.path.join(os.getcwd(), "temp")
-if not os.path.exists(TEMP_FOLDER):
-    os.makedirs(TEMP_FOLDER)
 
 
 # 영상 ID 목록을 가져오는 함수 (flat-playlist 활용)
 def get_video_ids(channel_url, max_videos=None, start_date=None, end_date=None):
-    print(f"[{datetime.now()}] 영상 ID 목록 수집 시작: {channel_url}")
+    logger.info(f"영상 ID 목록 수집 시작: {channel_url}")
     if start_date and end_date:
         # 검색 기반 수집
         search_query = f"{channel_url} before:{end_date} after:{start_date}"
@@ -65,7 +49,7 @@ def get_video_ids(channel_url, max_videos=None, start_date=None, end_date=None):
 
     result = subprocess.run(cmd, capture_output=True, text=True)
     ids = [line.strip() for line in result.stdout.strip().split("\n") if line.strip()]
-    print(f"[{datetime.now()}] 수집 완료: 총 {len(ids)}개 ID")
+    logger.info(f"수집 완료: 총 {len(ids)}개 ID")
     return ids
 
 
@@ -97,9 +81,9 @@ def get_video_details(video_id):
             "published_at": published_at
         }
     except json.JSONDecodeError:
-        print(f"[ERROR] JSON 파싱 실패: {video_id}")
-        print(f"yt-dlp stderr: {result.stderr}")
-        print(f"yt-dlp stdout: {result.stdout[:1000]}")
+        logger.error(f"JSON 파싱 실패: {video_id}")
+        logger.error(f"yt-dlp stderr: {result.stderr}")
+        logger.error(f"yt-dlp stdout: {result.stdout[:1000]}")
         return None
 
 
@@ -111,9 +95,10 @@ def get_subtitles(video_url, sub_lang="ko"):
 
     if os.path.exists(subtitle_path):
         with open(subtitle_path, "r", encoding="utf-8") as file:
-            print("받아놓은거 있네~")
+            logger.info("받아놓은거 있네~")
             return file.read()
-    print("받아놓은거 없네...")
+    logger.info("받아놓은거 없네...")
+    os.makedirs(TEMP_FOLDER, exist_ok=True)
     result = subprocess.run(
         ["yt-dlp", "--write-auto-sub", "--sub-lang", sub_lang, "--skip-download", "--no-playlist","--retries 3",
          "--output", TEMP_FOLDER + "/" + "%(id)s.%(ext)s", video_url],
@@ -124,9 +109,9 @@ def get_subtitles(video_url, sub_lang="ko"):
     if result.returncode == 0 and os.path.exists(subtitle_path):
         with open(subtitle_path, "r", encoding="utf-8") as file:
             return file.read()
-    print("자막없음?")
-    print(f"yt-dlp stderr: {result.stderr}")
-    print(f"yt-dlp stdout: {result.stdout[:1000]}")
+    logger.warning("자막없음?")
+    logger.warning(f"yt-dlp stderr: {result.stderr}")
+    logger.warning(f"yt-dlp stdout: {result.stdout[:1000]}")
     return ""
 
 def clean_subtitles(subtitles):
@@ -168,10 +153,10 @@ def clean_subtitles(subtitles):
     return cleaned_subtitles.strip()
 
 def process_video(video_id, sub_lang):
-    print(f"[{datetime.now()}] 조회 및 처리 시작: {video_id}")
+    logger.info(f"조회 및 처리 시작: {video_id}")
     video = get_video_details(video_id)
     if not video:
-        print(f"[{datetime.now()}] 영상 정보 없음: {video_id}")
+        logger.warning(f"영상 정보 없음: {video_id}")
         return None
 
     url = video["url"]
@@ -179,69 +164,89 @@ def process_video(video_id, sub_lang):
     subtitles = get_subtitles(url, sub_lang)
     if subtitles:
         cleaned = clean_subtitles(subtitles)
-        print(f"[{datetime.now()}] 처리 완료: {video_id}")
+        logger.info(f"처리 완료: {video_id}")
         return {
             "Title": title,
             "Video URL": url,
             "Published At": video.get("published_at"),
             "Subtitles": cleaned
         }
-    print(f"[{datetime.now()}] 자막 없음 또는 처리 실패: {video_id}")
+    logger.warning(f"자막 없음 또는 처리 실패: {video_id}")
     return None
 
-def collect_and_save_data(channel_url, sub_lang="ko", max_videos=None, start_date=None, end_date=None):
-    video_ids = get_video_ids(channel_url, max_videos, start_date, end_date)
-    processed_data = []
+def _channel_name(channel_url):
+    return channel_url.rstrip('/').split("/")[-1]
+
+
+def collect_channels(channels, sub_lang="ko", max_videos=None, start_date=None, end_date=None, max_workers=30):
+    """여러 채널을 스레드 풀 하나로 함께 수집하고 채널마다 CSV 파일을 하나씩 만든다.
 
-    with ThreadPoolExecutor(max_workers=30) as executor:
-        futures = [executor.submit(process_video, vid, sub_lang) for vid in video_ids]
+    channels 는 채널 URL 또는 (채널 URL, 가중치) 목록이다. 반환값은 {채널 URL: 출력 파일}.
+    """
+    channel_ids = []
+    for channel in channels:
+        channel_url, weight = (channel, 1) if isinstance(channel, str) else channel
+        channel_ids.append((channel_url, max(int(weight), 1),
+                            get_video_ids(channel_url, max_videos, start_date, end_date)))
+    processed_data = {channel_url: [] for channel_url, _, _ in channel_ids}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_video, vid, sub_lang): channel_url
+                   for channel_url, vid in interleave_weighted(channel_ids)}
         for future in as_completed(futures):
             result = future.result()
             if result:
-                processed_data.append(result)
-
-    from datetime import datetime
-    processed_data.sort(
-        key=lambda x: datetime.fromisoformat(x["Published At"].rstrip("Z"))
-    )
-
-    channel_name = channel_url.rstrip('/').split("/")[-1]
-    output_file = f"{channel_name}_subtitles.csv"
-    with open(output_file, "w", encoding="utf-8", newline="") as csvfile:
-        fieldnames = ["Published At", "Title", "Video URL", "Subtitles"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(processed_data)
-
-    print(f"Data saved to: {output_file}")
-
-def get_valid_input(prompt, validation_func=None, optional=False):
-    while True:
-        user_input = input(prompt)
-        if optional and user_input.strip().lower() == "skip":
-            return None
-        if optional and user_input.strip().lower() == "s":
-            return None
-        if validation_func is None or validation_func(user_input):
-            return user_input
-        print("잘못된 입력입니다. 다시 시도해주세요.")
-
-def validate_positive_integer(value):
-    return value.isdigit() and int(value) > 0
-
-def validate_date_format(value):
-    try:
-        datetime.fromisoformat(value)
-        return True
-    except ValueError:
-        return False
+                processed_data[futures[future]].append(result)
+
+    outputs = {}
+    for channel_url, rows in processed_data.items():
+        rows.sort(key=lambda x: x["Published At"] or "")
+        output_file = f"{_channel_name(channel_url)}_subtitles.csv"
+        with open(output_file, "w", encoding="utf-8", newline="") as csvfile:
+            fieldnames = ["Published At", "Title", "Video URL", "Subtitles"]
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        logger.info(f"Data saved to: {output_file}")
+        outputs[channel_url] = output_file
+    return outputs
+
+
+def collect_and_save_data(channel_url, sub_lang="ko", max_videos=None, start_date=None, end_date=None):
+    return collect_channels([channel_url], sub_lang, max_videos, start_date, end_date)[channel_url]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YouTube 채널 자막 수집기 (채널을 지정하지 않으면 대화형 입력)")
+    parser.add_argument("-c", "--channel", action="append", default=[], help="채널 URL 또는 핸들 (여러 번 지정 가능)")
+    parser.add_argument("-f", "--channels-file", help="채널 목록 파일 (한 줄에 `채널 URL [가중치]`)")
+    parser.add_argument("-l", "--lang", type=languages_argument, default="ko", help="자막 언어 (기본값: ko)")
+    parser.add_argument("--max-videos", type=positive_int_argument, help="채널당 최대 영상 수")
+    parser.add_argument("--start-date", type=date_argument, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date_argument, help="종료일 (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+    if "," in args.lang:
+        # 자막 파일을 언어 하나로 받으므로 여러 언어는 수집기(youtube_subtitle_downloader_cached.py)를 쓴다
+        parser.error(f"main.py 는 자막 언어를 하나만 받습니다: {args.lang}")
+    if args.channels_file:
+        try:
+            args.channel.extend(load_channel_list(args.channels_file))
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    return args
+
 
 if __name__ == "__main__":
-    channel_url = input("YouTube 채널 URL 또는 핸들을 입력하세요: ")
-    subtitle_lang = input("자막 언어(ko, en 등)를 입력하세요: ")
-    max_videos = get_valid_input("최대 영상 수(숫자 또는 'skip'): ", validate_positive_integer, optional=True)
-    max_videos = int(max_videos) if max_videos else None
-    start_date = get_valid_input("시작일 (YYYY-MM-DD 또는 'skip:s'): ", validate_date_format, optional=True)
-    end_date = get_valid_input("종료일 (YYYY-MM-DD 또는 'skip:s'): ", validate_date_format, optional=True)
-    collect_and_save_data(channel_url, subtitle_lang, max_videos,start_date,end_date)
-# https://www.youtube.com/@sbsnews8
\ No newline at end of file
+    args = parse_args()
+    setup_logging(LOG_FOLDER)
+    if args.channel:
+        collect_channels(args.channel, args.lang, args.max_videos, args.start_date, args.end_date)
+    else:
+        channel_url = input("YouTube 채널 URL 또는 핸들을 입력하세요: ")
+        subtitle_lang = get_valid_input("자막 언어(ko, en 등)를 입력하세요: ",
+                                        lambda value: validate_languages(value) and "," not in value).strip()
+        max_videos = get_valid_input("최대 영상 수(숫자 또는 'skip'): ", validate_positive_integer, optional=True)
+        max_videos = int(max_videos) if max_videos else None
+        start_date = get_valid_input("시작일 (YYYY-MM-DD 또는 'skip:s'): ", validate_date_format, optional=True)
+        end_date = get_valid_input("종료일 (YYYY-MM-DD 또는 'skip:s'): ", validate_date_format, optional=True)
+        collect_and_save_data(channel_url, subtitle_lang, max_videos,start_date,end_date)
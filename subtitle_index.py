@@ -0,0 +1,469 @@
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+# ─── 수집한 자막 전문 검색 (SQLite FTS5) ─────────────────────────────────
+# 영상마다 제목과 정리된 자막을 FTS5 테이블에 넣고, 채널/업로드 날짜는 일반 테이블에 둬서 함께 거른다.
+# 같은 영상을 다시 넣으면 내용 해시를 비교해 바뀐 것만 다시 색인한다 (재실행 시 증분 갱신).
+# timeline 은 정리된 자막의 글자 위치 → 자막 구간 시작 시각 목록이며, 검색 결과의 시간 위치를 계산하는 데 쓴다.
+
+DEFAULT_TOKENIZER = "unicode61 remove_diacritics 2"
+TIMELINE_LOOKAHEAD = 200  # 정리 과정에서 빠진 단어를 건너뛸 때 앞으로 찾아볼 최대 단어 수
+_HIT_START = "\x02"
+_HIT_END = "\x03"
+SEARCH_ORDERS = {"relevance": "rank", "newest": "v.published_at DESC"}
+
+
+def content_hash(title, text):
+    return hashlib.blake2b(f"{title or ''}\n{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def build_timeline(text, segments):
+    """정리된 자막 text 의 글자 위치와 자막 구간 시작 시각을 잇는다. [(글자 위치, 초), ...]
+
+    정리된 자막은 구간 텍스트를 이어 붙인 뒤 반복 구문을 뺀 것이므로, 단어를 앞에서부터
+    차례로 맞춰 가면 단어마다 원래 구간을 찾을 수 있다. 시각이 바뀌는 지점만 남긴다.
+    """
+    words = [(start, word) for start, _, segment_text in segments for word in segment_text.split()]
+    timeline = []
+    position = 0
+    for match in re.finditer(r"\S+", text):
+        word = match.group()
+        limit = min(len(words), position + TIMELINE_LOOKAHEAD)
+        index = next((index for index in range(position, limit) if words[index][1] == word), None)
+        if index is None:
+            continue
+        position = index + 1
+        start = round(words[index][0], 2)
+        if not timeline or timeline[-1][1] != start:
+            timeline.append((match.start(), start))
+    return timeline
+
+
+def _pack_timeline(timeline):
+    return sqlite3.Binary(zlib.compress(json.dumps(timeline, separators=(",", ":")).encode("utf-8")))
+
+
+def _unpack_timeline(blob):
+    return json.loads(zlib.decompress(blob)) if blob else []
+
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"(\*)?|([()])|([^\s()"]+)')
+_OPERATORS = ("AND", "OR", "NOT")
+
+
+def _query_tokens(query):
+    # (종류, 값): "term" 은 FTS5 에 그대로 넣을 수 있게 따옴표로 감싼 피연산자, "exclude" 는 `-단어` 로 제외할 단어
+    for match in _QUERY_TOKEN.finditer(query):
+        phrase, phrase_prefix, paren, word = match.groups()
+        if paren:
+            yield paren, paren
+        elif phrase is not None:
+            if phrase.strip():
+                yield "term", f'"{phrase}"' + ("*" if phrase_prefix else "")
+        elif word in _OPERATORS:
+            yield "operator", word
+        else:
+            negated = word.startswith("-") and len(word) > 1
+            word = word[1:] if negated else word
+            prefix = word.endswith("*") and len(word) > 1
+            word = word.rstrip("*") if prefix else word
+            yield "exclude" if negated else "term", '"' + word.replace('"', '""') + '"' + ("*" if prefix else "")
+
+
+def to_fts_query(query):
+    """검색어를 FTS5 MATCH 식으로 바꾼다.
+
+    - 띄어 쓴 단어는 모두 포함 (AND), "따옴표"는 구문, AND / OR / NOT 과 괄호는 그대로
+    - `-단어` 는 제외, `단어*` 는 접두어 검색
+    - 그 밖의 기호는 FTS5 문법으로 해석되지 않도록 단어마다 따옴표로 감싼다
+    - 짝이 없는 괄호, 빈 괄호, 앞뒤에 피연산자가 없는 연산자는 버리고 닫히지 않은 괄호는 끝에서 닫는다
+    """
+    parts = []
+    excluded = []
+    depth = 0
+
+    def expects_operand():
+        return not parts or parts[-1] in _OPERATORS or parts[-1] == "("
+
+    def drop_dangling():
+        # 끝에 남은 연산자와 빈 여는 괄호를 지운다
+        nonlocal depth
+        while parts and (parts[-1] in _OPERATORS or parts[-1] == "("):
+            if parts.pop() == "(":
+                depth -= 1
+
+    for kind, value in _query_tokens(query):
+        if kind in ("term", "("):
+            # FTS5 는 괄호 옆에서는 AND 를 생략할 수 없으므로 피연산자 사이에 항상 AND 를 넣는다
+            if not expects_operand():
+                parts.append("AND")
+            parts.append(value)
+            depth += kind == "("
+        elif kind == "operator":
+            if not expects_operand():
+                parts.append(value)
+        elif kind == ")":
+            if not depth:
+                continue
+            while parts[-1] in _OPERATORS:
+                parts.pop()
+            if parts[-1] == "(":
+                parts.pop()
+            else:
+                parts.append(")")
+            depth -= 1
+        else:
+            excluded.append(value)
+    drop_dangling()
+    parts.extend(")" * depth)
+
+    if not parts:
+        raise ValueError(f"검색어가 올바르지 않습니다: {query!r}")
+    expression = " ".join(parts)
+    if excluded:
+        expression = f"({expression})" + "".join(f" NOT {term}" for term in excluded)
+    return expression
+
+
+class SearchHit:
+    __slots__ = ("video_id", "channel", "title", "url", "published_at", "offset", "snippet", "score")
+
+    def __init__(self, video_id, channel, title, url, published_at, offset, snippet, score):
+        self.video_id = video_id
+        self.channel = channel
+        self.title = title
+        self.url = url
+        self.published_at = published_at
+        self.offset = offset  # 자막에서 처음 일치한 위치의 시각 (초), 알 수 없으면 None
+        self.snippet = snippet
+        self.score = score  # bm25 (작을수록 관련도가 높다)
+
+    @property
+    def timed_url(self):
+        """검색어가 나오는 시각부터 재생되는 영상 링크"""
+        if self.offset is None or not self.url:
+            return self.url
+        return f"{self.url}{'&' if '?' in self.url else '?'}t={int(self.offset)}s"
+
+    def to_dict(self):
+        return {**{name: getattr(self, name) for name in self.__slots__}, "timed_url": self.timed_url}
+
+    def __repr__(self):
+        return f"SearchHit({self.video_id!r}, offset={self.offset}, score={self.score:.3f})"
+
+
+class SubtitleIndex:
+    """SQLite(WAL) 파일 하나로 된 자막 전문 검색 색인.
+
+    add() 는 바로 커밋하지 않고 batch_size 개마다 (또는 commit()/close() 때) 한 트랜잭션으로 반영한다.
+    tokenizer 는 색인을 처음 만들 때만 쓰인다. 한국어처럼 조사가 붙는 언어에서 단어 일부로도
+    찾으려면 "trigram" 을 쓴다 (색인이 2~3배 커지고, 세 글자보다 짧은 검색어는 찾지 못한다).
+    """
+
+    def __init__(self, db_path, tokenizer=DEFAULT_TOKENIZER, batch_size=200):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._pending = 0
+        self._lock = threading.RLock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                " id INTEGER PRIMARY KEY,"
+                " video_id TEXT NOT NULL UNIQUE,"
+                " channel TEXT,"
+                " title TEXT,"
+                " url TEXT,"
+                " published_at TEXT,"
+                " content_hash TEXT NOT NULL,"
+                " timeline BLOB,"
+                " indexed_at TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS videos_channel ON videos (channel, published_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS videos_published ON videos (published_at)")
+            self._conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5("
+                               f"title, text, tokenize = '{tokenizer}')")
+
+    def indexed_hash(self, video_id):
+        """색인된 영상의 내용 해시 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, video_id, text, channel=None, title=None, url=None, published_at=None, timeline=None):
+        """영상 하나를 색인에 넣는다. 내용이 같은 영상이 이미 있으면 메타데이터만 갱신하고 False 를 반환한다"""
+        digest = content_hash(title, text)
+        with self._lock:
+            row = self._conn.execute("SELECT id, content_hash FROM videos WHERE video_id = ?",
+                                     (video_id,)).fetchone()
+            if row and row[1] == digest:
+                self._conn.execute("UPDATE videos SET channel = COALESCE(?, channel), url = COALESCE(?, url),"
+                                   " published_at = COALESCE(?, published_at),"
+                                   " timeline = COALESCE(?, timeline) WHERE id = ?",
+                                   (channel, url, published_at, _pack_timeline(timeline) if timeline else None,
+                                    row[0]))
+                self._after_write()
+                return False
+            if row:
+                self._conn.execute("DELETE FROM transcripts WHERE rowid = ?", (row[0],))
+                self._conn.execute("DELETE FROM videos WHERE id = ?", (row[0],))
+            cursor = self._conn.execute(
+                "INSERT INTO videos (video_id, channel, title, url, published_at, content_hash, timeline, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (video_id, channel, title, url, published_at, digest,
+                 _pack_timeline(timeline) if timeline else None, datetime.now().isoformat()))
+            self._conn.execute("INSERT INTO transcripts (rowid, title, text) VALUES (?, ?, ?)",
+                               (cursor.lastrowid, title or "", text))
+            self._after_write()
+            return True
+
+    def _after_write(self):
+        # 호출한 쪽에서 self._lock 을 잡고 있어야 한다
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._conn.commit()
+            self._pending = 0
+
+    def remove(self, video_id):
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            if not row:
+                return False
+            self._conn.execute("DELETE FROM transcripts WHERE rowid = ?", (row[0],))
+            self._conn.execute("DELETE FROM videos WHERE id = ?", (row[0],))
+            self._after_write()
+            return True
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def optimize(self):
+        """FTS5 세그먼트를 하나로 합친다 (대량 색인 뒤 검색이 빨라진다)"""
+        with self._lock:
+            self._conn.commit()
+            self._conn.execute("INSERT INTO transcripts (transcripts) VALUES ('optimize')")
+            self._conn.commit()
+
+    @staticmethod
+    def _filters(channel, start_date, end_date):
+        clauses, params = [], []
+        if channel:
+            clauses.append("v.channel = ?")
+            params.append(channel)
+        if start_date:
+            clauses.append("v.published_at >= ?")
+            params.append(start_date)
+        if end_date:
+            # published_at 은 ISO 문자열이므로 다음 날 0시보다 작으면 end_date 당일까지 포함된다
+            clauses.append("v.published_at < date(?, '+1 day')")
+            params.append(end_date)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def search(self, query, channel=None, start_date=None, end_date=None, limit=20, offset=0, raw=False,
+               order="relevance"):
+        """검색어와 일치하는 영상을 돌려준다 ([SearchHit]).
+
+        order="relevance" 는 bm25 관련도 순, "newest" 는 업로드 날짜 최신순이다. 관련도 순은 일치하는
+        영상 전체의 점수를 매겨야 하므로, 거의 모든 영상에 나오는 흔한 단어는 newest 가 훨씬 빠르다.
+        raw=True 이면 query 를 FTS5 MATCH 식으로 그대로 쓴다.
+        날짜는 YYYY-MM-DD 이며 end_date 당일도 포함한다.
+        """
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"알 수 없는 정렬 방식: {order} (가능: {', '.join(SEARCH_ORDERS)})")
+        where, params = self._filters(channel, start_date, end_date)
+        sql = ("SELECT v.video_id, v.channel, v.title, v.url, v.published_at, v.timeline,"
+               " snippet(transcripts, 1, '[', ']', '…', 16),"
+               f" CASE WHEN v.timeline IS NULL THEN 0"
+               f" ELSE instr(highlight(transcripts, 1, '{_HIT_START}', '{_HIT_END}'), '{_HIT_START}') END,"
+               " bm25(transcripts)"
+               " FROM transcripts JOIN videos v ON v.id = transcripts.rowid"
+               f" WHERE transcripts MATCH ?{where} ORDER BY {SEARCH_ORDERS[order]} LIMIT ? OFFSET ?")
+        match = query if raw else to_fts_query(query)
+        with self._lock:
+            rows = self._conn.execute(sql, [match] + params + [limit, offset]).fetchall()
+
+        hits = []
+        for video_id, channel_url, title, url, published_at, timeline, snippet, position, score in rows:
+            hits.append(SearchHit(video_id, channel_url, title, url, published_at,
+                                  self._offset_at(_unpack_timeline(timeline), position - 1) if position else None,
+                                  snippet, score))
+        return hits
+
+    @staticmethod
+    def _offset_at(timeline, char_position):
+        index = bisect.bisect_right([position for position, _ in timeline], char_position) - 1
+        return timeline[max(index, 0)][1] if timeline else None
+
+    def count(self, query, channel=None, start_date=None, end_date=None, raw=False):
+        where, params = self._filters(channel, start_date, end_date)
+        sql = ("SELECT COUNT(*) FROM transcripts JOIN videos v ON v.id = transcripts.rowid"
+               f" WHERE transcripts MATCH ?{where}")
+        with self._lock:
+            return self._conn.execute(sql, [query if raw else to_fts_query(query)] + params).fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            videos, channels, timed = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT channel), COUNT(timeline) FROM videos").fetchone()
+        return {"videos": videos, "channels": channels, "with_timeline": timed,
+                "size_mb": round(os.path.getsize(self.db_path) / 1e6, 2)}
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def _video_id_from_url(url):
+    match = re.search(r"[?&]v=([\w-]+)", url or "")
+    return match.group(1) if match else None
+
+
+def channel_url_from_folder(folder):
+    """result/<채널>/ 폴더 이름 → 수집할 때 쓰는 채널 URL (핸들은 @핸들, UC 로 시작하는 채널 ID 는 /channel/)"""
+    if re.fullmatch(r"UC[\w-]{22}", folder):
+        return f"https://www.youtube.com/channel/{folder}"
+    return f"https://www.youtube.com/@{folder}"
+
+
+def _subtitle_column(fieldnames, sub_lang=None):
+    # 언어가 하나면 `Subtitles`, 여럿이면 `Subtitles (ko)` 처럼 언어마다 한 열이다.
+    # sub_lang 을 주지 않으면 첫 번째 자막 열(수집할 때 첫 번째 언어)을 쓴다
+    columns = [name for name in fieldnames or [] if name == "Subtitles" or name.startswith("Subtitles (")]
+    if sub_lang:
+        wanted = f"Subtitles ({sub_lang})"
+        if wanted in columns:
+            return wanted
+        return "Subtitles" if "Subtitles" in columns else None
+    return columns[0] if columns else None
+
+
+def ingest_csv(index, path, channel=None, sub_lang=None):
+    """수집 결과 CSV 를 색인에 넣는다 (시각 정보 없이). 새로 색인한 영상 수를 반환한다.
+
+    channel 을 주지 않으면 result/<채널>/ 폴더 이름으로 채널 URL 을 만든다 (수집 중 색인과 같은 값).
+    여러 언어를 수집한 CSV 는 sub_lang 의 자막 열을, 주지 않으면 첫 번째 자막 열을 색인한다.
+    """
+    channel = channel or channel_url_from_folder(os.path.basename(os.path.dirname(os.path.abspath(path))))
+    added = 0
+    # 긴 자막이 한 칸에 들어가므로 csv 기본 필드 크기 제한을 푼다 (Windows 의 C long 은 32비트)
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        reader = csv.DictReader(file)
+        column = _subtitle_column(reader.fieldnames, sub_lang)
+        if column is None:
+            raise ValueError(f"자막 열이 없습니다: {path}" + (f" (언어: {sub_lang})" if sub_lang else ""))
+        for row in reader:
+            video_id = _video_id_from_url(row.get("Video URL"))
+            if video_id and row.get(column):
+                added += index.add(video_id, row[column], channel=channel, title=row.get("Title"),
+                                   url=row.get("Video URL"), published_at=row.get("Published At"))
+    index.commit()
+    return added
+
+
+def _format_offset(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="수집한 자막 전문 검색",
+        epilog='검색어 예: 날씨 예보 / "오늘 날씨" / 날씨 OR 기온 / 날씨 -광고 / 예보*')
+    parser.add_argument("index", help="색인 파일 경로 (예: cache/subtitle_index.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="검색")
+    search.add_argument("query")
+    search.add_argument("--channel", help="채널 URL 로 거르기")
+    search.add_argument("--start-date", help="업로드 날짜 시작 (YYYY-MM-DD)")
+    search.add_argument("--end-date", help="업로드 날짜 끝 (YYYY-MM-DD, 당일 포함)")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--offset", type=int, default=0, help="건너뛸 결과 수 (페이지 넘기기)")
+    search.add_argument("--order", choices=list(SEARCH_ORDERS), default="relevance",
+                        help="relevance: 관련도 순 (기본값), newest: 최신순 (흔한 단어도 빠르다)")
+    search.add_argument("--raw", action="store_true", help="검색어를 FTS5 MATCH 식으로 그대로 쓴다")
+    search.add_argument("--json", action="store_true", help="결과를 한 줄에 하나씩 JSON 으로 출력")
+
+    ingest = commands.add_parser("ingest", help="수집 결과 CSV 를 색인에 넣기")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--channel", help="채널 URL (기본값: CSV 가 있는 폴더 이름으로 만든 "
+                                          "https://www.youtube.com/@<폴더>)")
+    ingest.add_argument("--lang", help="여러 언어를 수집한 CSV 에서 색인할 언어 (기본값: 첫 번째 자막 열)")
+    ingest.add_argument("--tokenizer", default=DEFAULT_TOKENIZER,
+                        help=f"새 색인을 만들 때 쓸 FTS5 토크나이저 (기본값: {DEFAULT_TOKENIZER})")
+
+    commands.add_parser("stats", help="색인 현황")
+    commands.add_parser("optimize", help="색인 세그먼트 합치기")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.command != "ingest" and not os.path.exists(args.index):
+        print(f"색인 파일이 없습니다: {args.index}", file=sys.stderr)
+        return 1
+    index = SubtitleIndex(args.index, **({"tokenizer": args.tokenizer} if args.command == "ingest" else {}))
+    try:
+        if args.command == "search":
+            started = time.perf_counter()
+            try:
+                hits = index.search(args.query, args.channel, args.start_date, args.end_date,
+                                    limit=args.limit, offset=args.offset, raw=args.raw, order=args.order)
+            except (ValueError, sqlite3.OperationalError) as e:
+                print(f"검색어 오류: {e}", file=sys.stderr)
+                return 2
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for hit in hits:
+                if args.json:
+                    print(json.dumps(hit.to_dict(), ensure_ascii=False))
+                    continue
+                at = f" @ {_format_offset(hit.offset)}" if hit.offset is not None else ""
+                print(f"{(hit.published_at or '')[:10]}  {hit.title}{at}\n    {hit.timed_url}\n    {hit.snippet}")
+            if not args.json:
+                print(f"{len(hits)}건 ({elapsed_ms:.1f}ms)")
+        elif args.command == "ingest":
+            for path in args.files:
+                try:
+                    added = ingest_csv(index, path, args.channel, args.lang)
+                except ValueError as e:
+                    print(e, file=sys.stderr)
+                    return 2
+                print(f"{path}: {added}개 색인")
+        elif args.command == "stats":
+            print(json.dumps(index.stats(), ensure_ascii=False))
+        elif args.command == "optimize":
+            index.optimize()
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
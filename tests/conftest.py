@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "benchmarks"))
+
+import youtube_subtitle_downloader_cached as downloader  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiter(monkeypatch):
+    # 테스트에서 낸 429 가 다른 테스트의 동시 실행 한도와 속도를 줄이지 않도록 테스트마다 새 제한기를 쓴다
+    limiter = downloader.AdaptiveLimiter()
+    monkeypatch.setattr(downloader, "yt_dlp_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """run_with_retries 의 재시도 대기를 건너뛴다"""
+    monkeypatch.setattr(downloader.time, "sleep", lambda seconds: None)
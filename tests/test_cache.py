@@ -0,0 +1,29 @@
+import youtube_subtitle_downloader_cached as downloader
+
+
+def test_memory_lru_is_bounded_by_bytes(tmp_path):
+    cache = downloader.Cache(str(tmp_path / "subtitles.db"), compress=True, max_memory_bytes=10_000)
+    try:
+        for number in range(20):
+            assert cache.set(f"subtitle_{number}", "가" * 2000)
+        assert cache.memory_bytes <= 10_000
+        assert 0 < len(cache.memory_cache) < 20
+        assert cache.memory_bytes == sum(size for _, size in cache.memory_cache.values())
+
+        # 메모리에서 밀려난 값도 디스크에서 다시 읽는다
+        assert cache.get("subtitle_0") == "가" * 2000
+        assert cache.memory_bytes <= 10_000
+    finally:
+        cache.close()
+
+
+def test_value_larger_than_bound_is_not_kept_in_memory(tmp_path):
+    cache = downloader.Cache(str(tmp_path / "subtitles.db"), max_memory_bytes=1000)
+    try:
+        cache.set("small", "a" * 100)
+        cache.set("large", "b" * 5000)
+        assert cache.get("large") == "b" * 5000
+        assert list(cache.memory_cache) == [cache._hash_key("small")]
+        assert cache.memory_bytes < 1000
+    finally:
+        cache.close()
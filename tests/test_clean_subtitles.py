@@ -0,0 +1,20 @@
+import random
+
+import pytest
+
+import youtube_subtitle_downloader_cached as downloader
+from clean_subtitles import legacy_remove_repeated_phrases, synthetic_transcript
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_remove_repeated_phrases_matches_legacy_fuzz(seed):
+    # 작은 어휘로 만든 짧은 문장: 겹치는 반복, 끝부분 경계 등 까다로운 경우를 많이 만든다
+    rng = random.Random(seed)
+    for _ in range(250):
+        text = " ".join(rng.choice("abc") for _ in range(rng.randint(0, 60)))
+        assert downloader.remove_repeated_phrases(text) == legacy_remove_repeated_phrases(text), text
+
+
+def test_remove_repeated_phrases_matches_legacy_transcript():
+    text = synthetic_transcript(5000, seed=11)
+    assert downloader.remove_repeated_phrases(text) == legacy_remove_repeated_phrases(text)
@@ -0,0 +1,49 @@
+import pytest
+
+import collector_metrics
+import main
+import youtube_subtitle_downloader_cached as downloader
+
+
+@pytest.mark.parametrize("value", ["", " , ", "ko en", "en.*", "ko;rm"])
+def test_bad_language_lists_fail_at_argument_parsing(value, capsys):
+    with pytest.raises(SystemExit):
+        main.parse_args(["-c", "@a", "-l", value])
+    assert "자막 언어" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        downloader.build_arg_parser().parse_args(["-c", "@a", "-l", value])
+
+
+def test_language_arguments_are_normalized():
+    assert main.parse_args(["-c", "@a", "-l", " en-US "]).lang == "en-US"
+    assert downloader.build_arg_parser().parse_args(["-c", "@a", "-l", "ko, en,ko"]).lang == "ko,en"
+
+
+def test_main_rejects_several_languages(capsys):
+    with pytest.raises(SystemExit):
+        main.parse_args(["-c", "@a", "-l", "ko,en"])
+    assert "하나만" in capsys.readouterr().err
+
+
+def test_metrics_server_binds_to_loopback_by_default():
+    server = collector_metrics.start_http_server(0, metrics_registry=collector_metrics.MetricsRegistry())
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_host_option_reaches_the_server(monkeypatch):
+    started = []
+
+    def fake_start(port, host):
+        started.append((port, host))
+        raise SystemExit(0)
+
+    monkeypatch.setattr(downloader, "start_metrics_server", fake_start)
+    with pytest.raises(SystemExit):
+        downloader.main(["-c", "@a", "--metrics-port", "9100"])
+    with pytest.raises(SystemExit):
+        downloader.main(["-c", "@a", "--metrics-port", "9100", "--metrics-host", "0.0.0.0"])
+    assert started == [(9100, "127.0.0.1"), (9100, "0.0.0.0")]
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import youtube_subtitle_downloader_cached as downloader
+
+
+class FlakyEngine:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def video_info(self, url):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("HTTP Error 503: Service Unavailable")
+        return {"title": "t", "webpage_url": url, "upload_date": "20240101"}
+
+
+def test_video_details_failures_are_not_cached(tmp_path):
+    engine = FlakyEngine(failures=1)
+    previous = downloader.set_collector(downloader.Collector(str(tmp_path / "a"), engine=engine))
+    try:
+        assert downloader.get_video_details("v1") is None
+        assert downloader.get_video_details("v1")["published_at"] == "2024-01-01T00:00:00Z"
+        assert downloader.get_video_details("v1")["title"] == "t"
+        assert engine.calls == 2
+
+        # 다른 Collector 는 앞 Collector 의 결과를 보지 않는다
+        other = FlakyEngine(failures=0)
+        downloader.get_collector().close()
+        downloader.set_collector(downloader.Collector(str(tmp_path / "b"), engine=other))
+        downloader.get_video_details("v1")
+        assert other.calls == 1
+    finally:
+        downloader.get_collector().close()
+        downloader.set_collector(previous)
+
+
+def test_import_does_not_change_csv_field_limit(tmp_path):
+    # 모듈은 이미 import 되어 있으므로 새 인터프리터에서 확인한다
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import csv; before = csv.field_size_limit(); import youtube_subtitle_downloader_cached; "
+            "assert csv.field_size_limit() == before; import os; assert os.listdir('.') == []")
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, check=True, env={**os.environ, "PYTHONPATH": root})
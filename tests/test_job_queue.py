@@ -0,0 +1,23 @@
+from job_queue import SQLiteJobQueue
+
+
+def _complete_all(queue, channel, count):
+    queue.add([(channel, f"v{i:03d}") for i in range(count)])
+    for job in queue.lease("w", count, 60):
+        queue.complete(job.job_id, {"video": job.video_id})
+
+
+def test_results_pages_through_all_rows(tmp_path, monkeypatch):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(SQLiteJobQueue, "RESULTS_PAGE_SIZE", 7)
+    _complete_all(queue, "a", 23)
+    _complete_all(queue, "b", 5)
+    assert [row["video"] for row in queue.results("a")] == [f"v{i:03d}" for i in range(23)]
+    assert len(list(queue.results("b"))) == 5
+    queue.close()
+
+
+def test_shared_disk_uses_rollback_journal(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "jobs.db"), shared_disk=True)
+    assert queue._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    queue.close()
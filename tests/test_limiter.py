@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+import fake_yt_dlp
+import youtube_subtitle_downloader_cached as downloader
+
+
+def test_successes_raise_limit_and_rate_up_to_ceiling():
+    limiter = downloader.AdaptiveLimiter(initial=4, maximum=5, rate=10.0, max_rate=10.5)
+    for _ in range(4):
+        limiter.record(0.1)
+    # 한도만큼 성공하면 한도가 약 1 오른다 (+1/limit 씩)
+    assert 4.8 < limiter.limit < 5.0
+    for _ in range(100):
+        limiter.record(0.1)
+    assert limiter.limit == 5
+    assert limiter.rate == 10.5
+    assert limiter.counts == {"ok": 104}
+
+
+def test_throttle_halves_limit_and_rate_once_per_interval():
+    limiter = downloader.AdaptiveLimiter(initial=16, rate=8.0, decrease_interval=60)
+    limiter.record(1.0, "throttled")
+    limiter.record(1.0, "throttled")  # 같은 순간에 몰려온 실패는 한 번만 반영한다
+    assert (limiter.limit, limiter.rate) == (8, 4.0)
+    assert limiter.counts == {"throttled": 2}
+
+
+def test_decreases_stop_at_floor():
+    limiter = downloader.AdaptiveLimiter(initial=4, minimum=2, rate=1.0, min_rate=0.5, decrease_interval=0)
+    for _ in range(5):
+        limiter.record(1.0, "timeout")
+    assert (limiter.limit, limiter.rate) == (2, 0.5)
+
+
+def test_slow_success_shrinks_limit_by_ten_percent():
+    limiter = downloader.AdaptiveLimiter(initial=10, target_latency=1.0, decrease_interval=0)
+    limiter.record(5.0)
+    assert limiter.limit == pytest.approx(9.0)
+    limiter.record(1.0, "error")  # 제한 신호가 아닌 실패는 한도를 바꾸지 않는다
+    assert limiter.limit == pytest.approx(9.0)
+
+
+def test_token_bucket_paces_request_starts():
+    limiter = downloader.AdaptiveLimiter(rate=20.0, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        with limiter:
+            pass
+    # 첫 요청은 버킷의 토큰 1개로, 나머지 5개는 초당 20개 속도로 시작한다
+    assert time.monotonic() - started >= 5 / 20 * 0.9
+
+
+def test_acquire_waits_for_a_free_slot():
+    limiter = downloader.AdaptiveLimiter(initial=1, burst=10)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def other():
+        with limiter:
+            acquired.set()
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    assert not acquired.wait(0.2)
+    limiter.release()
+    assert acquired.wait(2)
+    thread.join()
+    assert limiter.in_flight == 0
+
+
+def test_nested_acquire_in_same_thread_does_not_wait():
+    limiter = downloader.AdaptiveLimiter(initial=1, burst=10)
+    with limiter:
+        with limiter:
+            assert limiter.in_flight == 1
+    assert limiter.in_flight == 0
+
+
+def test_throttled_extractions_shrink_shared_limiter(fresh_limiter, monkeypatch, no_backoff):
+    monkeypatch.setattr(fake_yt_dlp, "THROTTLE_RATE", 1.0)
+
+    class FakeEngine(downloader.YtDlpEngine):
+        def _make_ydl(self, params):
+            return fake_yt_dlp.make_ydl(params)
+
+    with pytest.raises(Exception, match="429"):
+        FakeEngine("inprocess").video_info("https://www.youtube.com/watch?v=throttled")
+    snapshot = fresh_limiter.snapshot()
+    assert snapshot["counts"] == {"throttled": 3}
+    # 세 번의 429 는 decrease_interval 안에 왔으므로 한 번만 절반으로 줄인다
+    assert (snapshot["limit"], snapshot["rate"]) == (15, 10)
+    assert snapshot["in_flight"] == 0
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import fake_yt_dlp
+import youtube_subtitle_downloader_cached as downloader
+
+CHANNEL = "https://www.youtube.com/@sync"
+
+
+class FakeEngine(downloader.YtDlpEngine):
+    def __init__(self, mode="inprocess", **kwargs):
+        super().__init__(mode, **kwargs)
+        self.in_flight_seen = []
+
+    def _make_ydl(self, params):
+        return fake_yt_dlp.make_ydl(params)
+
+    def iter_playlist(self, source):
+        self.in_flight_seen.append(downloader.yt_dlp_limiter.snapshot()["in_flight"])
+        return super().iter_playlist(source)
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    monkeypatch.setattr(fake_yt_dlp, "CHANNEL_SIZE", 10)
+    collector = downloader.Collector(str(tmp_path), engine=FakeEngine())
+    previous = downloader.set_collector(collector)
+    yield collector
+    collector.close()
+    downloader.set_collector(previous)
+
+
+def _state(collector):
+    return collector.video_cache.get(f"channel_state_{CHANNEL}")
+
+
+def _ids(numbers):
+    return [f"sync_{number:06d}" for number in numbers]
+
+
+def test_truncated_listing_does_not_save_state(collector, monkeypatch, no_backoff):
+    monkeypatch.setattr(fake_yt_dlp, "LIST_FAIL_AFTER", 2)
+    with pytest.raises(Exception, match="429"):
+        downloader.sync_channel_ids(CHANNEL)
+    assert _state(collector) is None
+    assert collector.engine.in_flight_seen == [1, 1, 1]  # 재시도마다 목록 전체를 슬롯을 잡고 다시 받는다
+
+
+def test_incremental_sync_saves_only_complete_listings(collector, monkeypatch, no_backoff):
+    assert downloader.sync_channel_ids(CHANNEL) == _ids(range(10, 0, -1))
+
+    # 새 영상 5개가 올라왔는데 아는 ID 에 닿기 전에 끊기면 상태를 그대로 둔다
+    monkeypatch.setattr(fake_yt_dlp, "CHANNEL_SIZE", 15)
+    monkeypatch.setattr(fake_yt_dlp, "LIST_FAIL_AFTER", 3)
+    with pytest.raises(Exception, match="429"):
+        downloader.sync_channel_ids(CHANNEL)
+    assert _state(collector)["ids"] == _ids(range(10, 0, -1))
+
+    # 아는 ID 에 닿은 뒤에 끊기는 목록은 이미 끝까지 받은 것이다
+    monkeypatch.setattr(fake_yt_dlp, "LIST_FAIL_AFTER", 6)
+    assert downloader.sync_channel_ids(CHANNEL) == _ids(range(15, 0, -1))
+    assert _state(collector)["newest"] == "sync_000015"
+
+
+def test_subprocess_listing_raises_on_nonzero_exit(monkeypatch):
+    command = [sys.executable, os.path.join(os.path.dirname(fake_yt_dlp.__file__), "fake_yt_dlp.py")]
+    engine = downloader.YtDlpEngine("subprocess", command=command)
+    monkeypatch.setenv("FAKE_YTDLP_CHANNEL_SIZE", "5")
+    assert [entry["id"] for entry in engine.iter_playlist(CHANNEL + "/videos")] == _ids(range(5, 0, -1))
+
+    monkeypatch.setenv("FAKE_YTDLP_LIST_FAIL_AFTER", "2")
+    received = []
+    with pytest.raises(Exception, match="반환 코드: 1") as error:
+        for entry in engine.iter_playlist(CHANNEL + "/videos"):
+            received.append(entry["id"])
+    assert received == _ids([5, 4])
+    assert downloader.classify_error(str(error.value)) == "throttled"
+
+
+DATED = "https://www.youtube.com/@dated"
+
+
+@pytest.fixture
+def dated_channel(collector, monkeypatch):
+    # 200개 영상을 6시간 간격으로 (약 50일), 가장 최신 영상은 열흘 전에 올렸다
+    monkeypatch.setattr(fake_yt_dlp, "CHANNEL_SIZE", 200)
+    monkeypatch.setattr(fake_yt_dlp, "UPLOAD_INTERVAL", 6 * 3600)
+    monkeypatch.setattr(fake_yt_dlp, "CHANNEL_NEWEST", int(time.time()) - 10 * 86400)
+    return collector
+
+
+def _day(days_ago):
+    return datetime.fromtimestamp(time.time() - days_ago * 86400, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _uploaded_between(start_date, end_date):
+    return [f"dated_{number:06d}" for number in range(200, 0, -1)
+            if start_date <= datetime.fromtimestamp(fake_yt_dlp._upload_timestamp("dated", number),
+                                                    timezone.utc).strftime("%Y-%m-%d") <= end_date]
+
+
+@pytest.mark.parametrize("approximate", [0, 1])
+def test_date_range_matches_true_upload_dates(dated_channel, monkeypatch, approximate):
+    monkeypatch.setattr(fake_yt_dlp, "APPROXIMATE_DATES", approximate)
+    start_date, end_date = _day(40), _day(20)
+    expected = _uploaded_between(start_date, end_date)
+    assert expected
+
+    assert downloader.get_video_ids(DATED, start_date=start_date, end_date=end_date) == expected
+    # 끝난 날짜 범위를 끝까지 받았으므로 캐시한다
+    assert dated_channel.video_cache.get(f"{DATED}_None_{start_date}_{end_date}") == expected
+
+
+def test_truncated_date_listing_raises_and_caches_nothing(dated_channel, monkeypatch, no_backoff):
+    monkeypatch.setattr(fake_yt_dlp, "LIST_FAIL_AFTER", 50)
+    start_date, end_date = _day(40), _day(20)
+    with pytest.raises(Exception, match="429"):
+        downloader.get_video_ids(DATED, start_date=start_date, end_date=end_date, raise_errors=True)
+    assert downloader.get_video_ids(DATED, start_date=start_date, end_date=end_date) == []
+    assert dated_channel.video_cache.get(f"{DATED}_None_{start_date}_{end_date}") is None
+    assert dated_channel.engine.in_flight_seen == [1] * 6  # 호출마다 슬롯을 잡고 3번 시도한다
+
+
+def test_date_range_with_failed_boundary_lookups_is_not_cached(dated_channel, monkeypatch, no_backoff):
+    # 경계 영상의 정보를 못 가져오면 (멤버 전용 등) 근삿값으로 자르고, 다음에 다시 확인하도록 캐시하지 않는다
+    monkeypatch.setattr(fake_yt_dlp, "MEMBERS_ONLY_RATE", 1.0)
+    start_date, end_date = _day(40), _day(20)
+    assert downloader.get_video_ids(DATED, start_date=start_date, end_date=end_date)
+    assert dated_channel.video_cache.get(f"{DATED}_None_{start_date}_{end_date}") is None
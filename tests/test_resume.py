@@ -0,0 +1,82 @@
+import csv
+import glob
+import os
+
+import pytest
+
+import fake_yt_dlp
+import youtube_subtitle_downloader_cached as downloader
+
+CHANNEL = "https://www.youtube.com/@resume50"
+
+
+class FakeEngine(downloader.YtDlpEngine):
+    def __init__(self):
+        super().__init__("inprocess")
+        self.listing_fails = False
+
+    def _make_ydl(self, params):
+        return fake_yt_dlp.make_ydl(params)
+
+    def list_ids(self, url, max_videos=None):
+        if self.listing_fails:
+            raise RuntimeError("HTTP Error 503: Service Unavailable")
+        return super().list_ids(url, max_videos)
+
+
+class SmallRunWriter(downloader.SortedResultWriter):
+    crash_after = None
+
+    def __init__(self, *args, **kwargs):
+        kwargs["run_size"] = 10
+        super().__init__(*args, **kwargs)
+
+    def write(self, row, video_id=None):
+        if self.rows_written == self.crash_after:
+            raise RuntimeError("crash")
+        super().write(row, video_id)
+
+
+@pytest.fixture
+def collector(tmp_path, monkeypatch):
+    collector = downloader.Collector(str(tmp_path), engine=FakeEngine())
+    previous = downloader.set_collector(collector)
+    monkeypatch.setattr(downloader, "SortedResultWriter", SmallRunWriter)
+    yield collector
+    collector.close()
+    downloader.set_collector(previous)
+
+
+def collect():
+    return downloader.collect_and_save_data(CHANNEL, concurrency={"clean": 0})
+
+
+def test_failed_listing_on_resume_keeps_run_dir(collector, monkeypatch):
+    monkeypatch.setattr(SmallRunWriter, "crash_after", 25)
+    with pytest.raises(RuntimeError, match="crash"):
+        collect()
+    run_dir, = glob.glob(os.path.join(collector.result_folder, "resume50", ".run_*"))
+    saved = sorted(os.listdir(os.path.join(run_dir, "runs")))
+    assert saved == ["run_00000.csv", "run_00001.csv"]
+
+    # 목록 캐시를 비우고 목록 수집이 실패하는 상태로 다시 실행한다
+    collector.video_cache.set(f"{CHANNEL}_None_None_None", [])
+    collector.engine.listing_fails = True
+    monkeypatch.setattr(SmallRunWriter, "crash_after", None)
+    assert collect() is None
+    assert os.path.exists(os.path.join(run_dir, "journal.jsonl"))
+    assert sorted(os.listdir(os.path.join(run_dir, "runs"))) == saved
+
+    collector.engine.listing_fails = False
+    output_file = collect()
+    with open(output_file, encoding="utf-8", newline="") as f:
+        urls = [row["Video URL"] for row in csv.DictReader(f)]
+    assert len(urls) == len(set(urls)) == 50
+    assert not os.path.exists(run_dir)
+
+
+def test_empty_channel_without_history_removes_run_dir(collector):
+    collector.video_cache.set(f"{CHANNEL}_None_None_None", [])
+    collector.engine.list_ids = lambda url, max_videos=None: []
+    assert collect() is None
+    assert glob.glob(os.path.join(collector.result_folder, "resume50", ".run_*")) == []
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import defaultdict
+
+import pytest
+
+import fake_yt_dlp
+import youtube_subtitle_downloader_cached as downloader
+
+CHANNEL = "https://www.youtube.com/@retry3"
+
+
+class CountingEngine(downloader.YtDlpEngine):
+    def __init__(self):
+        super().__init__("inprocess")
+        self.calls = defaultdict(list)
+
+    def _make_ydl(self, params):
+        return fake_yt_dlp.make_ydl(params)
+
+    def video_info_with_subtitles(self, video_url, *args, **kwargs):
+        self.calls[video_url.split("v=")[-1]].append(time.monotonic())
+        return super().video_info_with_subtitles(video_url, *args, **kwargs)
+
+
+@pytest.fixture
+def collector(tmp_path):
+    collector = downloader.Collector(str(tmp_path), engine=CountingEngine())
+    previous = downloader.set_collector(collector)
+    yield collector
+    collector.close()
+    downloader.set_collector(previous)
+
+
+def run(concurrency=None):
+    rows = []
+    stats = asyncio.run(downloader.run_pipeline(CHANNEL, "ko", lambda row, video_id: rows.append(video_id),
+                                                concurrency={"clean": 0, **(concurrency or {})}))
+    return stats, rows
+
+
+def test_retry_scheduler_requeues_after_delay():
+    async def scenario():
+        scheduler = downloader.RetryScheduler()
+        inbox = asyncio.Queue()
+        scheduler.track()
+        started = time.monotonic()
+        scheduler.schedule(inbox, "item", 0.1)
+        await asyncio.sleep(0.05)
+        assert inbox.empty()
+        assert await inbox.get() == "item"
+        elapsed = time.monotonic() - started
+        assert scheduler.outstanding == 1
+        scheduler.resolve()
+        await asyncio.wait_for(scheduler.wait_drained(), 1)
+        return elapsed
+
+    assert asyncio.run(scenario()) >= 0.1
+
+
+def test_failing_videos_are_requeued_with_delay_then_given_up(collector, monkeypatch):
+    monkeypatch.setattr(fake_yt_dlp, "FAILURE_RATE", 1.0)
+    monkeypatch.setattr(downloader, "FETCH_BACKOFF_FACTOR", 0.5)
+    stats, rows = run()
+    assert rows == []
+    assert stats.failed == stats.total == 3
+    for attempts in collector.engine.calls.values():
+        # 파이프라인은 영상마다 FETCH_RETRIES 번만 시도하고, 시도 사이에는 0.5**2, 0.5**3 초를 기다린다
+        assert len(attempts) == downloader.FETCH_RETRIES
+        gaps = [later - earlier for earlier, later in zip(attempts, attempts[1:])]
+        assert gaps[0] >= 0.25 * 0.9 and gaps[1] >= 0.125 * 0.9
+
+
+def test_members_only_videos_use_negative_cache_until_ttl(collector, monkeypatch):
+    monkeypatch.setattr(fake_yt_dlp, "MEMBERS_ONLY_RATE", 1.0)
+    monkeypatch.setitem(downloader.NegativeCache.DEFAULT_TTL, "members_only", 0.5)
+
+    stats, _ = run()
+    assert stats.failed == 3
+    # 멤버 전용은 재시도하지 않는다
+    assert sorted(len(attempts) for attempts in collector.engine.calls.values()) == [1, 1, 1]
+    assert collector.negative_cache.reason("retry3_000001") == "members_only"
+
+    collector.engine.calls.clear()
+    stats, _ = run()
+    assert stats.failed == 3 and not collector.engine.calls
+
+    time.sleep(0.6)
+    assert collector.negative_cache.reason("retry3_000001") is None
+    stats, _ = run()
+    assert stats.failed == 3 and len(collector.engine.calls) == 3
+
+
+def test_negative_cache_entries_expire(tmp_path):
+    cache = downloader.NegativeCache(str(tmp_path / "negative.db"))
+    cache.add("a", "no_subtitles", ttl=0.2)
+    cache.add("b", "members_only", ttl=60)
+    assert cache.reasons(["a", "b", "c"]) == {"a": "no_subtitles", "b": "members_only"}
+    time.sleep(0.3)
+    assert cache.reasons(["a", "b", "c"]) == {"b": "members_only"}
+    cache.close()
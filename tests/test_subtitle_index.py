@@ -0,0 +1,99 @@
+import asyncio
+import csv
+import time
+
+import pytest
+
+import youtube_subtitle_downloader_cached as downloader
+from subtitle_index import SubtitleIndex, ingest_csv, to_fts_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SubtitleIndex(str(tmp_path / "index.db"))
+    index.add("v1", "foo bar baz qux", channel="https://www.youtube.com/@a", title="one")
+    index.add("v2", "foo only", channel="https://www.youtube.com/@a", title="two")
+    index.commit()
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize("query", ["foo-bar (baz", "foo-bar baz)", "(baz OR", "foo () bar", "AND foo-bar baz NOT"])
+def test_unbalanced_queries_do_not_raise(index, query):
+    assert [hit.video_id for hit in index.search(query)] == ["v1"]
+
+
+def test_query_balances_parentheses():
+    assert to_fts_query("foo-bar (baz") == '"foo-bar" AND ( "baz" )'
+    assert to_fts_query("a ) b") == '"a" AND "b"'
+    with pytest.raises(ValueError):
+        to_fts_query("( OR )")
+
+
+def _write_csv(path, fieldnames, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_ingest_csv_multi_language_columns_and_channel_url(tmp_path):
+    path = tmp_path / "result" / "channel_a" / "channel_a_subtitles.csv"
+    _write_csv(path, ["Published At", "Title", "Video URL", "Subtitles (ko)", "Subtitles (en)"],
+               [{"Published At": "2024-01-01T00:00:00Z", "Title": "t", "Video URL": "https://www.youtube.com/watch?v=v9",
+                 "Subtitles (ko)": "안녕 세계", "Subtitles (en)": "hello world"}])
+    index = SubtitleIndex(str(tmp_path / "index.db"))
+    assert ingest_csv(index, str(path)) == 1
+    hits = index.search("안녕", channel="https://www.youtube.com/@channel_a")
+    assert [hit.video_id for hit in hits] == ["v9"]
+    assert ingest_csv(index, str(path), sub_lang="en") == 1
+    assert [hit.video_id for hit in index.search("hello")] == ["v9"]
+    index.close()
+
+
+def test_index_feeder_waits_instead_of_dropping(tmp_path):
+    collector = downloader.Collector(str(tmp_path))
+    previous = downloader.set_collector(collector)
+    feeder = downloader.IndexFeeder(str(tmp_path / "index.db"), "ko", queue_size=1)
+    ingest = feeder._ingest
+
+    def slow_ingest(*entry):
+        time.sleep(0.01)
+        ingest(*entry)
+
+    feeder._ingest = slow_ingest
+    rows = [{"Title": f"영상 {number}", "Video URL": f"https://www.youtube.com/watch?v=v{number}",
+             "Published At": "2024-01-01", "Subtitles": f"자막 {number} 번째"} for number in range(30)]
+
+    async def scenario():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticking = asyncio.ensure_future(ticker())
+        for row in rows:
+            await feeder.submit_async("https://www.youtube.com/@a", row)
+        done.set()
+        await ticking
+        return ticks
+
+    try:
+        # 큐가 꽉 차 있는 동안에도 이벤트 루프는 다른 작업을 계속 돌린다
+        assert asyncio.run(scenario()) > 5
+    finally:
+        feeder.close()
+        collector.close()
+        downloader.set_collector(previous)
+
+    assert feeder.indexed == len(rows)
+    index = SubtitleIndex(str(tmp_path / "index.db"))
+    try:
+        assert index.count("번째") == len(rows)
+    finally:
+        index.close()
@@ -0,0 +1,50 @@
+import vtt_corpus
+import youtube_subtitle_downloader_cached as downloader
+
+MANUAL_VTT = """WEBVTT
+
+00:00:01.000 --> 00:00:02.000
+Are you ready?
+
+00:00:02.000 --> 00:00:03.000
+Yes.
+
+00:00:03.000 --> 00:00:04.000
+Yes.
+
+00:00:04.000 --> 00:00:05.000
+Yes.
+Let's go.
+"""
+
+
+def test_repeated_manual_cues_are_kept():
+    segments = [text for _, _, text in downloader.iter_subtitle_segments(MANUAL_VTT)]
+    assert segments == ["Are you ready?", "Yes.", "Yes.", "Yes. Let's go."]
+
+
+def test_rolling_auto_captions_drop_carried_lines():
+    vtt = vtt_corpus.generate_rolling_vtt(1, seed=3)
+    segments = [text for _, _, text in downloader.iter_subtitle_segments(vtt)]
+    forced = [text for _, _, text in downloader.iter_subtitle_segments(vtt, rolling=False)]
+    assert len(segments) < len(forced)
+    for previous, current in zip(segments, segments[1:]):
+        assert previous != current
+
+
+def test_clean_subtitles_keeps_repeated_manual_cues():
+    text, segments = downloader.clean_subtitles(MANUAL_VTT, with_segments=True)
+    assert text == "Are you ready? Yes. Yes. Yes. Let's go."
+    assert text == " ".join(segment for _, _, segment in segments)
+    assert downloader.clean_subtitles(MANUAL_VTT) == text
+
+
+def test_clean_subtitles_rolling_auto_captions_match_segments():
+    vtt = vtt_corpus.generate_rolling_vtt(1, seed=3)
+    text = downloader.clean_subtitles(vtt)
+    assert text == " ".join(segment for _, _, segment in downloader.iter_subtitle_segments(vtt))
+    assert "<" not in text and "-->" not in text
+
+
+def test_clean_subtitles_without_cues_removes_repeated_phrases():
+    assert downloader.clean_subtitles("a b a b a b c <b>d</b>") == "a b c d"
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import fake_yt_dlp
+import youtube_subtitle_downloader_cached as downloader
+from job_queue import JobQueue, SQLiteJobQueue
+from conftest import ROOT
+
+# 가짜 채널은 핸들 끝의 숫자만큼 영상이 있다
+CHANNELS = {"https://www.youtube.com/@work12": 12, "https://www.youtube.com/@shift8": 8}
+
+WORKER = """
+import sys
+sys.path[:0] = {paths!r}
+import fake_yt_dlp
+import youtube_subtitle_downloader_cached as downloader
+
+class FakeEngine(downloader.YtDlpEngine):
+    def _make_ydl(self, params):
+        return fake_yt_dlp.make_ydl(params)
+
+fake_yt_dlp.FAKE_LATENCY = 0.02
+downloader.set_collector(downloader.Collector(".", engine=FakeEngine("inprocess")))
+processed = downloader.run_worker(downloader.SQLiteJobQueue({queue!r}), sys.argv[1], lease_batch=3,
+                                  concurrency={{"fetch": 2, "clean": 1}}, poll_interval=0.05)
+print(processed)
+"""
+
+
+class FakeEngine(downloader.YtDlpEngine):
+    def _make_ydl(self, params):
+        return fake_yt_dlp.make_ydl(params)
+
+
+def fill_queue(path):
+    job_queue = SQLiteJobQueue(path)
+    job_queue.set_meta("params", {"sub_lang": ["ko"], "subtitle_source": "auto"})
+    jobs = [(channel, f"{channel.rsplit('@', 1)[1]}_{number:06d}")
+            for channel, size in CHANNELS.items() for number in range(1, size + 1)]
+    job_queue.add(jobs)
+    job_queue.set_meta("sealed", True)
+    return job_queue, jobs
+
+
+def test_job_queue_is_abstract():
+    with pytest.raises(TypeError):
+        JobQueue()
+
+    class Partial(JobQueue):
+        def add(self, jobs):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_worker_reuses_one_set_of_pools(tmp_path, monkeypatch):
+    collector = downloader.Collector(str(tmp_path), engine=FakeEngine("inprocess"))
+    previous = downloader.set_collector(collector)
+    job_queue, jobs = fill_queue(str(tmp_path / "queue.db"))
+    created = []
+    make_executors = downloader._pipeline_executors
+
+    def counting_executors(concurrency):
+        created.append(concurrency)
+        return make_executors(concurrency)
+
+    monkeypatch.setattr(downloader, "_pipeline_executors", counting_executors)
+    try:
+        processed = downloader.run_worker(job_queue, "solo", lease_batch=4, concurrency={"clean": 0},
+                                          poll_interval=0.01)
+    finally:
+        job_queue.close()
+        collector.close()
+        downloader.set_collector(previous)
+
+    # 임대 묶음이 여러 개여도 (20개 / 4개씩) 풀은 워커 전체에서 한 번만 만든다
+    assert processed == len(jobs)
+    assert len(created) == 1
+
+
+def test_workers_in_separate_processes_share_the_queue(tmp_path):
+    queue_path = str(tmp_path / "queue.db")
+    job_queue, jobs = fill_queue(queue_path)
+    job_queue.close()
+    script = WORKER.format(paths=[ROOT, os.path.join(ROOT, "benchmarks")], queue=queue_path)
+
+    workers = []
+    for worker_id in ("w1", "w2"):
+        workdir = tmp_path / worker_id
+        workdir.mkdir()
+        workers.append(subprocess.Popen([sys.executable, "-c", script, worker_id], cwd=str(workdir),
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True))
+    processed = []
+    for worker in workers:
+        stdout, _ = worker.communicate(timeout=120)
+        assert worker.returncode == 0
+        processed.append(int(stdout.strip().splitlines()[-1]))
+
+    # 모든 영상이 정확히 한 번씩 처리되고, 두 워커가 작업을 나눠 가진다
+    assert sum(processed) == len(jobs)
+    assert all(count > 0 for count in processed)
+    with sqlite3.connect(queue_path) as conn:
+        rows = conn.execute("SELECT channel, video_id, state, attempts FROM jobs").fetchall()
+    assert sorted((channel, video_id) for channel, video_id, _, _ in rows) == sorted(jobs)
+    assert {(state, attempts) for _, _, state, attempts in rows} == {("done", 1)}
+    job_queue = SQLiteJobQueue(queue_path)
+    try:
+        for channel, size in CHANNELS.items():
+            assert len(list(job_queue.results(channel))) == size
+    finally:
+        job_queue.close()
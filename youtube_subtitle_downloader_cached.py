@@ -1,239 +1,1141 @@
 import json
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import csv
 import re
 import os
 import subprocess
-from datetime import datetime
+from datetime import datetime, timezone
 import sys
 import time
 import pickle
+import zlib
 import hashlib
+import heapq
+import shutil
+import tempfile
+import html
+import io
+import sqlite3
 import logging
 import queue
 import threading
-import requests
+import socket
+import functools
+import inspect
+import importlib
+import types
 from functools import lru_cache
+from collections import OrderedDict
+from job_queue import SQLiteJobQueue
+from subtitle_index import SubtitleIndex, build_timeline, content_hash as index_content_hash
+from collector_metrics import registry as metrics, start_http_server as start_metrics_server, CPU_BUCKETS
+from collector_logging import setup_logging, ProgressReporter
+
+# 선택 의존성: jsonl.zst 출력과 캐시 압축에 필요 (zstandard 가 없으면 캐시는 zlib 로 압축)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+@lru_cache(maxsize=None)
+def optional_module(name):
+    """무거운 선택 의존성(yt_dlp, pyarrow 등)을 처음 쓸 때 import 한다. 설치되어 있지 않으면 None.
+
+    yt_dlp 가 없으면 yt-dlp 실행 파일을 쓰는 subprocess 모드로, pyarrow 가 없으면 parquet 출력 없이 동작한다.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
 
-# 로깅 설정
-LOG_FOLDER = os.path.join(os.getcwd(), "logs")
-TEMP_FOLDER = os.path.join(os.getcwd(), "temp")
-CACHE_FOLDER = os.path.join(os.getcwd(), "cache")
-RESULT_FOLDER = os.path.join(os.getcwd(), "result")
-
-for folder in [LOG_FOLDER, TEMP_FOLDER, CACHE_FOLDER, RESULT_FOLDER]:
-    if not os.path.exists(folder):
-        os.makedirs(folder)
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(LOG_FOLDER, f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"),
-                            encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# 계측 (--metrics-port 로 Prometheus 엔드포인트를 열고, 실행이 끝나면 JSON 요약을 logs/ 에 남긴다)
+CACHE_REQUESTS = metrics.counter("cache_requests_total", "캐시 조회 수 (cache, op=get|coverage, result=hit|miss)")
+EXTRACTION_SECONDS = metrics.histogram("ytdlp_extraction_seconds", "yt-dlp 호출 1회 소요 시간 (command, outcome)")
+EXTRACTION_RETRIES = metrics.counter("ytdlp_retries_total", "yt-dlp 호출 재시도 수 (command, error_class)")
+EXTRACTION_FAILURES = metrics.counter("ytdlp_failures_total", "재시도 후에도 실패한 yt-dlp 호출 수 (command, error_class)")
+VIDEOS_FAILED = metrics.counter("videos_failed_total", "수집하지 못한 영상 수 (reason)")
+VIDEOS_WRITTEN = metrics.counter("videos_written_total", "저장한 영상 수")
+CLEAN_CPU_SECONDS = metrics.histogram("clean_subtitles_cpu_seconds", "영상 하나의 자막 정리 CPU 시간", CPU_BUCKETS)
+STAGE_SECONDS = metrics.histogram("pipeline_stage_seconds", "파이프라인 단계에서 항목(배치) 하나를 처리한 시간 (stage)")
+QUEUE_DEPTH = metrics.gauge("pipeline_queue_depth", "파이프라인 단계 사이 큐에 쌓인 항목 수 (queue)")
+
 
 # 캐시 관리
+# 캐시 값 압축: pickle 결과 앞에 형식 바이트를 붙인다. pickle 은 항상 0x80 으로 시작하므로
+# 압축하지 않은 예전 값과 구분된다. zstandard 가 없으면 zlib 로 압축한다.
+_CODEC_ZLIB = b"\x01"
+_CODEC_ZSTD = b"\x02"
+CACHE_ZSTD_LEVEL = 6
+# zstd 압축 컨텍스트는 수 MB 라서 fetch 스레드마다 두지 않고 하나를 락으로 나눠 쓴다 (영상 하나 압축은 1ms 안팎)
+_zstd_lock = threading.Lock()
+_zstd_contexts = {}
+
+
+def _zstd_context(kind):
+    # 호출한 쪽에서 _zstd_lock 을 잡고 있어야 한다
+    if kind not in _zstd_contexts:
+        _zstd_contexts[kind] = (zstandard.ZstdCompressor(level=CACHE_ZSTD_LEVEL) if kind == "compress"
+                                else zstandard.ZstdDecompressor())
+    return _zstd_contexts[kind]
+
+
+def _compress_blob(blob):
+    if zstandard is None:
+        return _CODEC_ZLIB + zlib.compress(blob, 6)
+    with _zstd_lock:
+        return _CODEC_ZSTD + _zstd_context("compress").compress(blob)
+
+
+def _decompress_blob(blob):
+    codec = blob[:1]
+    if codec == _CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd 로 압축된 캐시를 읽으려면 zstandard 패키지가 필요합니다. (pip install zstandard)")
+        with _zstd_lock:
+            return _zstd_context("decompress").decompress(blob[1:])
+    if codec == _CODEC_ZLIB:
+        return zlib.decompress(blob[1:])
+    return blob
+
+
+CACHE_MEMORY_BYTES = 64 * 1024 * 1024  # 캐시 하나가 메모리 LRU 에 두는 값의 최대 크기 (직렬화 기준)
+
+
 class Cache:
-    def __init__(self, cache_dir):
-        self.cache_dir = cache_dir
-        self.memory_cache = {}
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
-        self._preload_cache()
-
-    def _preload_cache(self):
-        logger.info(f"캐시 프리로드 시작: {self.cache_dir}")
-        preload_start = time.time()
+    """SQLite(WAL) 단일 파일 캐시.
+
+    값은 요청될 때만 디스크에서 읽고(lazy), 메모리에는 최근 사용한 항목만
+    항목 수(max_memory_items)와 바이트(max_memory_bytes, 직렬화 크기 기준) 제한이 있는 LRU로 유지한다.
+    max_memory_bytes 보다 큰 값은 메모리에 두지 않는다. 쓰기는 트랜잭션 단위로 원자적으로 반영된다.
+    compress=True 이면 값을 zstd(없으면 zlib)로 압축해서 저장하고, 압축하지 않은
+    예전 값도 처음 한 번 압축해 둔다. 읽기는 압축 여부와 상관없이 된다.
+    """
+
+    def __init__(self, db_path, legacy_dir=None, max_memory_items=10000, compress=False,
+                 max_memory_bytes=CACHE_MEMORY_BYTES):
+        self.db_path = db_path
+        self.name = os.path.splitext(os.path.basename(db_path))[0]  # 계측 레이블
+        self.compress = compress
+        self.max_memory_items = max_memory_items
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_cache = OrderedDict()  # 해시 키 → (값, 크기)
+        self.memory_bytes = 0
+        self._lock = threading.RLock()
+        self._presence = None  # 저장된 키 집합 (처음 필요할 때 키만 한 번에 읽는다)
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+
+        if legacy_dir:
+            self.migrate_pickle_dir(legacy_dir)
+        if compress:
+            self.compress_existing()
+
+    @staticmethod
+    def _hash_key(key):
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def _encode(self, value):
+        # (저장할 blob, 직렬화 크기)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return (_compress_blob(blob) if self.compress else blob), len(blob)
+
+    @staticmethod
+    def _decode(blob):
+        # (값, 직렬화 크기)
+        raw = _decompress_blob(bytes(blob))
+        return pickle.loads(raw), len(raw)
+
+    def compress_existing(self, chunk_size=500):
+        """압축하지 않고 저장된 값(예전 버전, pkl 마이그레이션)을 한 번만 압축하고 파일을 줄인다."""
+        marker = "compressed:v1"
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (marker,)).fetchone()
+        if row:
+            return 0
+
+        started = time.time()
         count = 0
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, value FROM entries WHERE rowid > ? AND substr(value, 1, 1) = X'80'"
+                    " ORDER BY rowid LIMIT ?", (last_rowid, chunk_size)).fetchall()
+                if not rows:
+                    break
+                with self._conn:
+                    self._conn.executemany("UPDATE entries SET value = ? WHERE rowid = ?",
+                                           ((sqlite3.Binary(_compress_blob(bytes(value))), rowid)
+                                            for rowid, value in rows))
+            count += len(rows)
+            last_rowid = rows[-1][0]
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                                   (marker, datetime.now().isoformat()))
+            if count:
+                # 압축으로 비워진 페이지를 파일에서 돌려준다
+                self._conn.execute("VACUUM")
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # WAL 모드에서는 체크포인트 뒤에 파일이 줄어든다
+        if count:
+            logger.info(f"캐시 압축 완료 ({self.db_path}): {count}개 항목, {time.time() - started:.1f}초 소요")
+        return count
+
+    def migrate_pickle_dir(self, legacy_dir, chunk_size=1000):
+        """기존 `<md5>.pkl` 파일 캐시 디렉토리를 한 번만 DB로 옮긴다."""
+        if not os.path.isdir(legacy_dir):
+            return 0
+
+        marker = f"migrated:{os.path.abspath(legacy_dir)}"
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (marker,)).fetchone()
+        if row:
+            return 0
+
+        logger.info(f"pkl 캐시 마이그레이션 시작: {legacy_dir} -> {self.db_path}")
+        migrate_start = time.time()
+        count = 0
+        chunk = []
 
-        for filename in os.listdir(self.cache_dir):
-            if filename.endswith(".pkl"):
-                path = os.path.join(self.cache_dir, filename)
-                try:
-                    with open(path, "rb") as f:
-                        key = filename.replace(".pkl", "")
-                        self.memory_cache[key] = pickle.load(f)
-                        count += 1
-                except Exception as e:
-                    logger.warning(f"캐시 프리로드 실패: {e}")
-
-        elapsed = time.time() - preload_start
-        logger.info(f"캐시 프리로드 완료: {count}개 파일 로딩 ({elapsed:.1f}초 소요)")
+        def flush():
+            # 이미 DB에 있는 키는 덮어쓰지 않는다 (DB 쪽이 더 최신)
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT OR IGNORE INTO entries (key, value) VALUES (?, ?)", chunk)
+            chunk.clear()
 
-    def get_cache_path(self, key):
-        hashed_key = hashlib.md5(key.encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"{hashed_key}.pkl")
+        for filename in os.listdir(legacy_dir):
+            if not filename.endswith(".pkl"):
+                continue
+            try:
+                with open(os.path.join(legacy_dir, filename), "rb") as f:
+                    # 파일 내용이 이미 pickle 형식이므로 역직렬화 없이 그대로 옮긴다
+                    chunk.append((filename[:-len(".pkl")], sqlite3.Binary(f.read())))
+                    count += 1
+            except Exception as e:
+                logger.warning(f"캐시 마이그레이션 실패 ({filename}): {e}")
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                               (marker, datetime.now().isoformat()))
+            self._presence = None
+
+        elapsed = time.time() - migrate_start
+        logger.info(f"pkl 캐시 마이그레이션 완료: {count}개 항목 ({elapsed:.1f}초 소요). "
+                    f"확인 후 {legacy_dir} 폴더는 삭제해도 됩니다.")
+        return count
+
+    def _remember(self, hashed_key, value, size):
+        # 호출한 쪽에서 self._lock 을 잡고 있어야 한다
+        previous = self.memory_cache.pop(hashed_key, None)
+        if previous is not None:
+            self.memory_bytes -= previous[1]
+        if size > self.max_memory_bytes:
+            return
+        self.memory_cache[hashed_key] = (value, size)
+        self.memory_bytes += size
+        while len(self.memory_cache) > self.max_memory_items or self.memory_bytes > self.max_memory_bytes:
+            _, (_, evicted) = self.memory_cache.popitem(last=False)
+            self.memory_bytes -= evicted
 
     def get(self, key):
-        hashed_key = hashlib.md5(key.encode()).hexdigest()
-        return self.memory_cache.get(hashed_key, None)
+        hashed_key = self._hash_key(key)
+        with self._lock:
+            if hashed_key in self.memory_cache:
+                self.memory_cache.move_to_end(hashed_key)
+                CACHE_REQUESTS.inc(cache=self.name, op="get", result="hit")
+                return self.memory_cache[hashed_key][0]
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (hashed_key,)).fetchone()
+        CACHE_REQUESTS.inc(cache=self.name, op="get", result="miss" if row is None else "hit")
+        if row is None:
+            return None
+        try:
+            value, size = self._decode(row[0])
+        except Exception as e:
+            logger.warning(f"캐시 읽기 실패: {e}")
+            return None
+        with self._lock:
+            self._remember(hashed_key, value, size)
+        return value
+
+    def _presence_index(self):
+        # 호출한 쪽에서 self._lock 을 잡고 있어야 한다
+        if self._presence is None:
+            self._presence = {row[0] for row in self._conn.execute("SELECT key FROM entries")}
+        return self._presence
+
+    def contains(self, key):
+        hashed_key = self._hash_key(key)
+        with self._lock:
+            return hashed_key in self.memory_cache or hashed_key in self._presence_index()
+
+    def missing_keys(self, keys):
+        """keys 중 캐시에 없는 것만 반환한다 (키 존재 여부만 메모리에서 한 번에 확인)"""
+        keys = list(keys)
+        with self._lock:
+            presence = self._presence_index()
+            missing = [key for key in keys if self._hash_key(key) not in presence]
+        CACHE_REQUESTS.inc(len(keys) - len(missing), cache=self.name, op="coverage", result="hit")
+        CACHE_REQUESTS.inc(len(missing), cache=self.name, op="coverage", result="miss")
+        return missing
 
     def set(self, key, value):
-        cache_path = self.get_cache_path(key)
-        hashed_key = hashlib.md5(key.encode()).hexdigest()
+        hashed_key = self._hash_key(key)
         try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(value, f)
-            self.memory_cache[hashed_key] = value
+            blob, size = self._encode(value)
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)",
+                                       (hashed_key, sqlite3.Binary(blob)))
+                self._remember(hashed_key, value, size)
+                if self._presence is not None:
+                    self._presence.add(hashed_key)
             return True
         except Exception as e:
             logger.warning(f"캐시 저장 실패: {e}")
             return False
 
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class NegativeCache(Cache):
+    """다시 시도해도 받을 수 없는 영상 기록 (이유 + 만료 시각).
+
+    멤버 전용/성인 인증은 영상 ID, 자막 없음은 `영상ID:언어` 를 키로 쓴다.
+    만료되면 없는 것으로 취급해 다음 실행에서 다시 확인한다.
+    """
+
+    DEFAULT_TTL = {
+        "members_only": 30 * 24 * 3600,
+        "age_restricted": 90 * 24 * 3600,
+        "no_subtitles": 3 * 24 * 3600,  # 자동 자막은 업로드 후 늦게 생기기도 한다
+    }
+
+    def add(self, key, reason, ttl=None):
+        if ttl is None:
+            ttl = self.DEFAULT_TTL.get(reason, 24 * 3600)
+        return self.set(key, {"reason": reason, "expires_at": time.time() + ttl})
+
+    def reason(self, key):
+        entry = self.get(key)
+        if entry and entry["expires_at"] > time.time():
+            return entry["reason"]
+        return None
+
+    def reasons(self, keys):
+        """keys 중 유효한 항목만 {key: reason} 으로 (없는 키는 키 인덱스로 걸러서 DB를 읽지 않는다)"""
+        keys = list(keys)
+        missing = set(self.missing_keys(keys))
+        found = {}
+        for key in keys:
+            if key not in missing:
+                reason = self.reason(key)
+                if reason:
+                    found[key] = reason
+        return found
+
+
+# ─── 수집기 설정 (폴더, 캐시, yt-dlp 엔진) ─────────────────────────────
+# 모듈을 import 하는 것만으로는 폴더, 로그 파일, 캐시 DB 를 만들지 않는다. 모두 Collector 가 처음 쓸 때 만든다.
+class _Lazy:
+    """처음 읽을 때 factory(collector) 로 만들어 두는 속성. 여러 스레드가 동시에 읽어도 한 번만 만든다"""
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+        with instance._lock:
+            if self.name not in instance.__dict__:
+                instance.__dict__[self.name] = self.factory(instance)
+            return instance.__dict__[self.name]
+
+
+class Collector:
+    """수집기가 쓰는 폴더, 캐시, yt-dlp 엔진을 가진 설정 객체.
+
+    만들 때는 경로만 정하고 폴더/캐시 DB/엔진은 처음 쓸 때 만든다. base_dir 를 주지 않으면 만들 때의
+    작업 디렉토리 아래 logs/, temp/, cache/, result/ 를 쓴다. 모듈 함수들은 get_collector() 의 기본 Collector 를
+    쓰며, 다른 폴더나 엔진을 쓰려면 set_collector(Collector(...)) 로 바꾼다. 캐시와 엔진은 값을 넣어 바꿀 수도 있다.
+    """
+
+    def __init__(self, base_dir=None, engine=None):
+        base_dir = base_dir or os.getcwd()
+        self.log_folder = os.path.join(base_dir, "logs")
+        self.temp_folder = os.path.join(base_dir, "temp")
+        self.cache_folder = os.path.join(base_dir, "cache")
+        self.result_folder = os.path.join(base_dir, "result")
+        self._lock = threading.RLock()
+        # get_video_details 결과 (실패는 넣지 않는다). 이 Collector 와 함께 사라진다
+        self.video_details = {}
+        if engine is not None:
+            self.engine = engine
+
+    def folder(self, name):
+        """log / temp / cache / result 폴더 경로. 없으면 만든다"""
+        path = getattr(self, f"{name}_folder")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def start_logging(self):
+        """logs/ 에 JSON 로그 파일을 만들고 큐 기반 로깅을 켠다 (루트 로거가 이미 설정되어 있으면 그대로 둔다)"""
+        return setup_logging(self.log_folder)
+
+    # 기존 pkl 디렉토리는 처음 열 때 한 번 자동 마이그레이션
+    video_cache = _Lazy(lambda self: Cache(os.path.join(self.folder("cache"), "videos.db"),
+                                           legacy_dir=os.path.join(self.cache_folder, "videos")))
+    subtitle_cache = _Lazy(lambda self: Cache(os.path.join(self.folder("cache"), "subtitles.db"),
+                                              legacy_dir=os.path.join(self.cache_folder, "subtitles"), compress=True,
+                                              max_memory_bytes=16 * 1024 * 1024))
+    # 정리된 자막 (원본 자막 내용 해시 + CLEANER_VERSION 이 키). 다시 실행할 때 정리 작업을 건너뛴다
+    cleaned_cache = _Lazy(lambda self: Cache(os.path.join(self.folder("cache"), "cleaned.db"), max_memory_items=1000,
+                                             compress=True))
+    negative_cache = _Lazy(lambda self: NegativeCache(os.path.join(self.folder("cache"), "negative.db")))
+    engine = _Lazy(lambda self: YtDlpEngine())
+
+    def close(self):
+        """이 Collector 가 연 캐시 DB 를 닫는다"""
+        with self._lock:
+            for name in ("video_cache", "subtitle_cache", "cleaned_cache", "negative_cache"):
+                cache = self.__dict__.pop(name, None)
+                if cache is not None:
+                    cache.close()
+            self.video_details.clear()
+
+
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def get_collector():
+    """모듈 함수들이 쓰는 기본 Collector. 처음 부를 때 현재 작업 디렉토리 기준으로 만든다"""
+    global _collector
+    if _collector is None:
+        with _collector_lock:
+            if _collector is None:
+                _collector = Collector()
+    return _collector
+
+
+def set_collector(collector):
+    """기본 Collector 를 바꾸고 이전 것을 돌려준다 (None 이면 다음에 쓸 때 새로 만든다)"""
+    global _collector
+    with _collector_lock:
+        previous, _collector = _collector, collector
+    return previous
+
+
+# 예전에 모듈 속성이던 이름 → 기본 Collector 의 속성 (`모듈.video_cache`, `모듈.engine = ...` 등이 그대로 동작한다)
+_COLLECTOR_ATTRIBUTES = {
+    "LOG_FOLDER": "log_folder", "TEMP_FOLDER": "temp_folder", "CACHE_FOLDER": "cache_folder",
+    "RESULT_FOLDER": "result_folder", "video_cache": "video_cache", "subtitle_cache": "subtitle_cache",
+    "cleaned_cache": "cleaned_cache", "negative_cache": "negative_cache", "engine": "engine",
+}
+# 처음 읽을 때 import 하는 선택 의존성 모듈 속성 → 함께 불러올 모듈
+_LAZY_MODULES = {"yt_dlp": "yt_dlp", "pyarrow": "pyarrow.parquet"}
+
+
+def __getattr__(name):
+    if name in _COLLECTOR_ATTRIBUTES:
+        return getattr(get_collector(), _COLLECTOR_ATTRIBUTES[name])
+    if name in _LAZY_MODULES:
+        return optional_module(name) if optional_module(_LAZY_MODULES[name]) else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _CollectorModule(types.ModuleType):
+    def __setattr__(self, name, value):
+        if name in _COLLECTOR_ATTRIBUTES:
+            setattr(get_collector(), _COLLECTOR_ATTRIBUTES[name], value)
+        else:
+            super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _CollectorModule
+
+# ─── yt-dlp 동시 실행 제어 (AIMD + 토큰 버킷) ──────────────────────────
+class AdaptiveLimiter:
+    """yt-dlp 동시 실행 수와 요청 속도를 응답에 맞춰 조절한다.
+
+    - 정상 응답이 target_latency 안에 오면 동시 실행 한도를 조금씩 올린다 (한도만큼 성공하면 +1)
+    - 429/봇 확인/시간 초과 같은 제한 신호가 오면 한도와 속도를 절반으로 줄인다
+    - 응답이 target_latency 보다 느리면 한도를 10% 줄인다
+    - 요청 시작은 토큰 버킷으로 초당 rate 개까지만 허용한다 (속도도 같은 방식으로 조절)
+    - 슬롯을 잡은 스레드가 다시 acquire 하면 (채널 목록을 받는 중에 영상 정보를 조회하는 경우 등)
+      새 슬롯을 기다리지 않고 토큰만 받는다. 한도가 1 이어도 스스로를 기다리며 멈추지 않는다
+    """
+
+    def __init__(self, initial=30, minimum=1, maximum=100, target_latency=15.0,
+                 rate=20.0, min_rate=0.5, max_rate=50.0, burst=30, decrease_interval=2.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.decrease_interval = decrease_interval
+        self.in_flight = 0
+        self.counts = {}
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+        self._token_lock = threading.Lock()
+        self._held = threading.local()
+
+    def acquire(self):
+        depth = getattr(self._held, "depth", 0)
+        if not depth:
+            with self._condition:
+                while self.in_flight >= max(int(self.limit), self.minimum):
+                    self._condition.wait()
+                self.in_flight += 1
+        self._held.depth = depth + 1
+        self._take_token()
+
+    def _take_token(self):
+        # 토큰을 미리 예약(음수 허용)하고 모자란 만큼만 락 밖에서 기다린다
+        with self._token_lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            self._tokens -= 1
+            wait_time = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait_time:
+            time.sleep(wait_time)
+
+    def release(self):
+        self._held.depth -= 1
+        if self._held.depth:
+            return
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def record(self, latency, error_class=None):
+        """요청 한 번의 결과를 반영한다. error_class 는 classify_error 결과 (성공이면 None)"""
+        with self._condition:
+            key = error_class or "ok"
+            self.counts[key] = self.counts.get(key, 0) + 1
+            now = time.monotonic()
+            if error_class in THROTTLE_ERROR_CLASSES:
+                # 같은 순간에 몰려온 실패로 여러 번 줄이지 않도록 간격을 둔다
+                if now - self._decreased_at >= self.decrease_interval:
+                    self._decreased_at = now
+                    self.limit = max(self.minimum, self.limit / 2)
+                    self.rate = max(self.min_rate, self.rate / 2)
+                    logger.warning(f"요청 제한 감지({error_class}): 동시 실행 {self.limit:.1f}, "
+                                   f"초당 {self.rate:.1f}회로 줄임")
+            elif error_class is None:
+                if latency > self.target_latency:
+                    if now - self._decreased_at >= self.decrease_interval:
+                        self._decreased_at = now
+                        self.limit = max(self.minimum, self.limit * 0.9)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                    self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def snapshot(self):
+        with self._condition:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "rate": round(self.rate, 2),
+                "counts": dict(self.counts),
+            }
+
+
+# yt-dlp 실행 동시 제한 (고정 세마포어 대신 응답에 따라 조절)
+yt_dlp_limiter = AdaptiveLimiter()
+metrics.gauge("ytdlp_concurrency_limit", "yt-dlp 동시 실행 한도").set_function(lambda: yt_dlp_limiter.snapshot()["limit"])
+metrics.gauge("ytdlp_in_flight", "실행 중인 yt-dlp 호출 수").set_function(lambda: yt_dlp_limiter.snapshot()["in_flight"])
+metrics.gauge("ytdlp_rate_per_second", "yt-dlp 호출 시작 속도 한도").set_function(lambda: yt_dlp_limiter.snapshot()["rate"])
 
-# 인스턴스 생성
-video_cache = Cache(os.path.join(CACHE_FOLDER, "videos"))
-subtitle_cache = Cache(os.path.join(CACHE_FOLDER, "subtitles"))
+# 재시도해도 소용없는 에러 문구 (stderr 또는 DownloadError 메시지 기준)
+MEMBERS_ONLY_MARKERS = ("available to this channel's members", "Join this channel to get access", "members-only content")
+AGE_RESTRICTED_MARKERS = ("confirm your age", "may be inappropriate for some users")
+# YouTube 가 요청 속도를 제한할 때 보이는 문구
+THROTTLED_MARKERS = ("HTTP Error 429", "Too Many Requests", "confirm you're not a bot", "confirm you’re not a bot",
+                     "rate-limited", "rate limited")
+THROTTLE_ERROR_CLASSES = ("throttled", "timeout")
 
-# yt-dlp 실행 동시 제한용 세마포어
-yt_dlp_semaphore = threading.Semaphore(30)  # 동시에 최대 50개 yt-dlp 실행
 
-# 요청 처리 및 재시도 로직
-def execute_command(cmd, retries=3, backoff_factor=1.5,timeout=60):
+class VideoUnavailableError(Exception):
+    """멤버 전용/성인 인증 등 재시도해도 받을 수 없는 영상"""
+
+    def __init__(self, reason, message):
+        super().__init__(f"{reason}: {message}")
+        self.reason = reason
+
+
+def classify_error(message):
+    message = message or ""
+    if any(marker in message for marker in MEMBERS_ONLY_MARKERS):
+        return "members_only"
+    if any(marker in message for marker in AGE_RESTRICTED_MARKERS):
+        return "age_restricted"
+    if any(marker in message for marker in THROTTLED_MARKERS):
+        return "throttled"
+    if "timed out" in message or "시간 초과" in message:
+        return "timeout"
+    return None
+
+
+# 요청 처리 및 재시도 로직 (subprocess/in-process 공통)
+def run_with_retries(func, retries=3, backoff_factor=1.5, command="other", record_latency=True):
+    # command 는 계측 레이블 (list, video_info, subtitles 등).
+    # record_latency=False: 채널 목록처럼 원래 오래 걸리는 호출은 느린 응답으로 보고 동시 실행 한도를 줄이지 않는다
     attempt = 0
     last_error = None
-    # yt-dlp 실행 부분에 세마포어 걸기
-    with yt_dlp_semaphore:
-        while attempt < retries:
+    while attempt < retries:
+        # 동시 실행 슬롯은 시도하는 동안만 잡고, 재시도 대기 중에는 다른 영상에 양보한다
+        with yt_dlp_limiter:
+            started = time.monotonic()
             try:
-                logger.debug(f"명령 실행: {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
-
-                # ─── 멤버 전용 에러 감지 ───────────────────────────────────────
-                stderr = result.stderr or ""
-                if result.returncode != 0 and "available to this channel's members" in stderr or "Join this channel to get access" in stderr or "members-only content" in stderr:
-                    logger.warning(f"멤버 전용 영상, 더 이상 재시도하지 않고 스킵합니다.")
-                    # 강제로 재시도 횟수를 다 소진시켜 바로 함수 종료
-                    attempt = retries
-                    break
-                # ──────────────────────────────────────────────────────────
-
-                # ─── 성인 인증 에러 감지 ───────────────────────────────────────
-                stderr = result.stderr or ""
-                if result.returncode != 0 and "confirm your age" in stderr or "may be inappropriate for some users" in stderr or "members-only content" in stderr:
-                    logger.warning(f"멤버 전용 영상, 더 이상 재시도하지 않고 스킵합니다.")
-                    # 강제로 재시도 횟수를 다 소진시켜 바로 함수 종료
-                    attempt = retries
-                    break
-                # ──────────────────────────────────────────────────────────
-                if result.returncode == 0:
-                    return result
-                last_error = f"반환 코드: {result.returncode}, stderr: {stderr}"
-
+                result = func()
+                latency = time.monotonic() - started
+                yt_dlp_limiter.record(latency if record_latency else 0.0)
+                EXTRACTION_SECONDS.observe(latency, command=command, outcome="ok")
+                return result
             except subprocess.TimeoutExpired:
                 last_error = "명령 실행 시간 초과"
             except Exception as e:
                 last_error = str(e)
 
-            # 재시도
-            attempt += 1
-            wait_time = backoff_factor ** attempt
-            logger.warning(f"명령 실패 ({attempt}/{retries}), {wait_time:.1f}초 후 재시도. 오류: {last_error}")
-            time.sleep(wait_time)
+            reason = classify_error(last_error)
+            latency = time.monotonic() - started
+            yt_dlp_limiter.record(latency, reason or "error")
+            EXTRACTION_SECONDS.observe(latency, command=command, outcome="error")
+
+        # ─── 멤버 전용 / 성인 인증 에러 감지 ───────────────────────────
+        if reason == "members_only":
+            logger.warning(f"멤버 전용 영상, 더 이상 재시도하지 않고 스킵합니다.")
+            EXTRACTION_FAILURES.inc(command=command, error_class=reason)
+            raise VideoUnavailableError(reason, last_error)
+        if reason == "age_restricted":
+            logger.warning(f"성인 인증 영상, 더 이상 재시도하지 않고 스킵합니다.")
+            EXTRACTION_FAILURES.inc(command=command, error_class=reason)
+            raise VideoUnavailableError(reason, last_error)
+        # ──────────────────────────────────────────────────────────
+
+        # 재시도
+        attempt += 1
+        if attempt >= retries:
+            break
+        EXTRACTION_RETRIES.inc(command=command, error_class=reason or "error")
+        wait_time = backoff_factor ** attempt
+        logger.warning(f"명령 실패 ({attempt}/{retries}), {wait_time:.1f}초 후 재시도. 오류: {last_error}")
+        time.sleep(wait_time)
+
+    EXTRACTION_FAILURES.inc(command=command, error_class=reason or "error")
+    raise Exception(f"최대 재시도 횟수 초과: {last_error}")
+
+
+def execute_command(cmd, retries=3, backoff_factor=1.5,timeout=60, command="other"):
+    def attempt():
+        logger.debug(f"명령 실행: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise Exception(f"반환 코드: {result.returncode}, stderr: {result.stderr or ''}")
+        return result
+
+    return run_with_retries(attempt, retries, backoff_factor, command=command)
+
+
+# ─── yt-dlp 추출 엔진 ───────────────────────────────────────────────
+class _YtDlpLogger:
+    """in-process yt-dlp 출력을 터미널 대신 로거로 보낸다"""
+
+    def debug(self, msg):
+        logger.debug(msg)
+
+    def info(self, msg):
+        logger.debug(msg)
+
+    def warning(self, msg):
+        logger.debug(msg)
+
+    def error(self, msg):
+        logger.debug(msg)
+
+
+# ─── 자막 언어 / 트랙 종류 ──────────────────────────────────────────
+# auto = 자동 생성 자막(automatic_captions), manual = 업로더가 올린 자막(subtitles)
+SUBTITLE_TRACK_FIELDS = {"auto": "automatic_captions", "manual": "subtitles"}
+# 자막 선택 방식 → 언어마다 확인할 트랙 종류 (앞의 것이 있으면 그것을 쓴다)
+SUBTITLE_SOURCES = {
+    "auto": ("auto",),
+    "manual": ("manual",),
+    "prefer-manual": ("manual", "auto"),
+    "prefer-auto": ("auto", "manual"),
+}
+
+
+# 자막 트랙 키는 언어 코드 그대로다 (ko, en-US, zh-Hans, ko-orig 등)
+_LANGUAGE_CODE = re.compile(r"[A-Za-z0-9]+(?:[-_][A-Za-z0-9]+)*")
+
+
+def parse_languages(sub_lang):
+    """"ko", "ko,en" 또는 ["ko", "en"] → ("ko", "en") (순서 유지, 중복 제거)"""
+    if isinstance(sub_lang, str):
+        sub_lang = sub_lang.split(",")
+    languages = tuple(OrderedDict.fromkeys(lang.strip() for lang in sub_lang if lang and lang.strip()))
+    if not languages:
+        raise ValueError("자막 언어를 하나 이상 지정해야 합니다.")
+    invalid = [lang for lang in languages if not _LANGUAGE_CODE.fullmatch(lang)]
+    if invalid:
+        raise ValueError(f"올바르지 않은 자막 언어 코드: {', '.join(invalid)}")
+    return languages
+
+
+def select_subtitle_tracks(info, languages, source="auto"):
+    """추출 결과에서 언어마다 쓸 vtt 자막 트랙을 {언어: (트랙 종류, 트랙)} 으로 고른다. 트랙이 없는 언어는 빠진다"""
+    selected = {}
+    for lang in languages:
+        for kind in SUBTITLE_SOURCES[source]:
+            formats = (info.get(SUBTITLE_TRACK_FIELDS[kind]) or {}).get(lang) or []
+            track = next((fmt for fmt in formats
+                          if fmt.get("ext") == "vtt" and (fmt.get("data") is not None or fmt.get("url"))), None)
+            if track:
+                selected[lang] = (kind, track)
+                break
+    return selected
+
+
+class YtDlpEngine:
+    """yt-dlp 호출 방식을 감춘다.
+
+    - inprocess: 스레드마다 YoutubeDL 인스턴스를 만들어 두고 계속 재사용
+    - subprocess: 호출마다 yt-dlp 프로세스를 띄우는 기존 방식 (yt_dlp 모듈이 없을 때의 폴백)
+    """
+
+    BASE_PARAMS = {
+        "quiet": True,
+        "no_warnings": True,
+        "noprogress": True,
+        "skip_download": True,
+        "socket_timeout": 30,
+        "retries": 3,
+    }
+
+    def __init__(self, mode=None, command=("yt-dlp",)):
+        if mode is None:
+            mode = "inprocess" if optional_module("yt_dlp") is not None else "subprocess"
+        if mode == "inprocess" and optional_module("yt_dlp") is None:
+            raise ValueError("inprocess 모드에는 yt_dlp 패키지가 필요합니다.")
+        if mode not in ("inprocess", "subprocess"):
+            raise ValueError(f"알 수 없는 추출 모드: {mode}")
+        self.mode = mode
+        self.command = list(command)
+        self._local = threading.local()
+
+    def _make_ydl(self, params):
+        return optional_module("yt_dlp").YoutubeDL(params)
+
+    def _get_ydl(self, kind, **params):
+        # 같은 스레드에서 같은 종류의 요청은 같은 인스턴스를 재사용 (추출기 초기화 비용 1회)
+        pool = self._local.__dict__.setdefault("ydls", {})
+        if kind not in pool:
+            pool[kind] = self._make_ydl({**self.BASE_PARAMS, "logger": _YtDlpLogger(), **params})
+        return pool[kind]
+
+    def _run(self, command, cmd_args, inprocess_func, timeout=60, retries=3):
+        # command: 계측에서 호출 종류를 나누는 이름
+        if self.mode == "subprocess":
+            return execute_command(self.command + cmd_args, retries=retries, timeout=timeout, command=command)
+        return run_with_retries(inprocess_func, retries=retries, command=command)
+
+    def list_ids(self, source, max_videos=None):
+        cmd = ["--no-warnings", "--flat-playlist", "--print", "%(id)s", "--socket-timeout", "30", source]
+        if max_videos:
+            cmd.extend(["--playlist-end", str(max_videos)])
+
+        def inprocess():
+            ydl = self._get_ydl(f"list_{max_videos}", extract_flat="in_playlist", playlistend=max_videos)
+            info = ydl.extract_info(source, download=False)
+            return [entry["id"] for entry in info.get("entries") or [] if entry and entry.get("id")]
+
+        result = self._run("list", cmd, inprocess, timeout=None)
+        if self.mode == "subprocess":
+            return [line.strip() for line in result.stdout.strip().split("\n") if line.strip()]
+        return result
+
+    def iter_playlist(self, source):
+        """flat-playlist 항목을 받는 대로 하나씩 내보낸다 (최신순 채널 목록에서 중간에 멈출 수 있다).
+
+        항목은 {"id": ..., "timestamp": ...} 형태이며 timestamp 는 없으면 None 이다.
+        채널 목록의 timestamp 는 "3 days ago" 같은 상대 시간에서 계산한 근삿값이다 (approximate_date).
+        목록이 중간에 끊기면 (429 등) 받은 데까지를 끝으로 보지 않고 예외를 올린다. 재시도와 동시 실행 슬롯은
+        목록 전체를 run_with_retries 로 감싸는 호출한 쪽이 맡는다 (받은 항목을 처음부터 다시 받아야 하므로).
+        """
+        if self.mode == "subprocess":
+            yield from self._iter_playlist_subprocess(source)
+            return
+
+        ydl = self._get_ydl("flat", extract_flat="in_playlist", lazy_playlist=True,
+                            extractor_args={"youtubetab": {"approximate_date": [""]}})
+        # process=False 로 받으면 entries 가 페이지 단위로 가져오는 제너레이터로 남는다
+        info = ydl.extract_info(source, download=False, process=False)
+        while info.get("_type") in ("url", "url_transparent"):
+            info = ydl.extract_info(info["url"], download=False, process=False)
+        for entry in info.get("entries") or []:
+            if entry and entry.get("id"):
+                yield {"id": entry["id"], "timestamp": entry.get("timestamp")}
+
+    def _iter_playlist_subprocess(self, source):
+        cmd = self.command + ["--no-warnings", "--flat-playlist", "--print", "%(id)s\t%(timestamp)s",
+                              "--extractor-args", "youtubetab:approximate_date", "--socket-timeout", "30", source]
+        logger.debug(f"명령 실행: {' '.join(cmd)}")
+        # stderr 는 파이프 대신 임시 파일로 받는다 (읽지 않는 파이프가 가득 차면 yt-dlp 가 멈춘다)
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8", errors="replace") as stderr:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+            try:
+                for line in process.stdout:
+                    video_id, _, timestamp = line.strip().partition("\t")
+                    if video_id:
+                        yield {"id": video_id, "timestamp": int(timestamp) if timestamp.isdigit() else None}
+                returncode = process.wait()
+            finally:
+                # 중간에 멈춘 경우 남은 페이지는 받지 않는다
+                if process.poll() is None:
+                    process.terminate()
+                process.wait()
+                process.stdout.close()
+            if returncode != 0:
+                # 끝까지 받지 못한 목록 (429 등). 받은 데까지를 전체 목록으로 쓰면 안 된다
+                stderr.seek(0)
+                raise Exception(f"반환 코드: {returncode}, stderr: {stderr.read()}")
+
+    def video_info(self, video_url):
+        cmd = ["--no-warnings", video_url, "--dump-json", "--skip-download", "--socket-timeout", "30",
+               "--retries", "3"]
+
+        def inprocess():
+            ydl = self._get_ydl("details")
+            return ydl.sanitize_info(ydl.extract_info(video_url, download=False))
+
+        result = self._run("video_info", cmd, inprocess)
+        if self.mode == "subprocess":
+            return json.loads(result.stdout)
+        return result
+
+    def video_info_with_subtitles(self, video_url, languages, source="auto", retries=3):
+        """영상 정보와 여러 언어의 자막을 한 번의 추출로 가져온다 (watch 페이지 1회).
+
+        (info, {언어: (트랙 종류, 자막 문자열)}) 을 반환한다. 언어마다 source 의 우선순위대로 수동/자동
+        자막 트랙을 고르고(select_subtitle_tracks), 자막 트랙이 없는 언어는 결과에서 빠진다.
+        자막은 파일로 쓰지 않는다. 트랙에 내용(data)이 있으면 그대로 쓰고, 없으면 트랙 URL 을 바로 받는다.
+        """
+        languages = parse_languages(languages) if languages else ()
+        # --dump-json 결과에는 모든 언어의 자막 트랙 목록이 들어 있으므로 트랙 선택은 여기서 한다
+        cmd = ["--no-warnings", "--dump-json", "--skip-download", "--no-playlist", "--retries", "3",
+               "--socket-timeout", "30", video_url]
+
+        def inprocess():
+            ydl = self._get_ydl("subtitles", noplaylist=True)
+            info = ydl.extract_info(video_url, download=False)
+            for _, track in select_subtitle_tracks(info, languages, source).values():
+                if track.get("data") is None:
+                    # ydl.urlopen 은 추출할 때와 같은 쿠키/프록시/헤더를 쓴다
+                    with ydl.urlopen(track["url"]) as response:
+                        track["data"] = response.read().decode("utf-8")
+            return ydl.sanitize_info(info)
+
+        info = self._run("video_info_subtitles", cmd, inprocess, retries=retries)
+        if self.mode == "subprocess":
+            info = json.loads(info.stdout)
+        subtitles = {}
+        for lang, (kind, track) in select_subtitle_tracks(info, languages, source).items():
+            if track.get("data") is None:
+                track["data"] = run_with_retries(functools.partial(_download_subtitle_track, track),
+                                                 retries=retries, command="subtitle_track")
+            subtitles[lang] = (kind, track.pop("data") or "")
+        return info, subtitles
+
+
+def _download_subtitle_track(track):
+    import requests  # URL 로만 주어진 자막 트랙을 받을 때만 필요하다
+
+    response = requests.get(track["url"], headers=track.get("http_headers"), timeout=30)
+    response.raise_for_status()
+    response.encoding = "utf-8"
+    return response.text
+
+
+
+def sync_channel_ids(channel_url):
+    """채널의 영상 ID 목록을 증분 동기화한다 (최신순).
+
+    채널별로 알고 있는 ID 목록을 캐시에 두고, /videos 목록을 최신순으로 받다가
+    이미 아는 ID가 나오면 바로 멈춘다. 새로 올라온 영상만큼만 목록을 받는다.
+    목록이 아는 ID 에 닿기 전에 끊기면 처음부터 다시 받고, 끝내 실패하면 상태를 바꾸지 않고 예외를 올린다
+    (받은 데까지를 저장하면 그보다 오래된 새 영상을 다음 동기화에서도 찾지 못한다).
+    """
+    collector = get_collector()
+    state_key = f"channel_state_{channel_url}"
+    state = collector.video_cache.get(state_key) or {"ids": [], "newest": None, "synced_at": None}
+    known = set(state["ids"])
+
+    def listing():
+        new_ids = []
+        entries = collector.engine.iter_playlist(channel_url.rstrip("/") + "/videos")
+        try:
+            for entry in entries:
+                if entry["id"] in known:
+                    break
+                new_ids.append(entry["id"])
+        finally:
+            entries.close()
+        return new_ids
+
+    # 목록을 받는 동안 yt-dlp 동시 실행 슬롯을 잡는다
+    new_ids = run_with_retries(listing, command="playlist", record_latency=False)
+    ids = new_ids + state["ids"]
+    collector.video_cache.set(state_key, {
+        "ids": ids,
+        "newest": ids[0] if ids else None,
+        "synced_at": datetime.now().isoformat(),
+    })
+    logger.info(f"증분 동기화 완료: 새 영상 {len(new_ids)}개, 전체 {len(ids)}개 (마지막 동기화: {state['synced_at']})")
+    return ids
+
+
+# ─── 날짜 범위로 채널 목록 받기 ───────────────────────────────────────
+# /videos 목록은 최신순이므로 end_date 보다 새로운 영상은 건너뛰고, start_date 보다 오래된 영상이 나오면
+# 목록을 그만 받는다. 목록 항목의 날짜는 상대 시간("3 days ago")에서 나온 근삿값이라 경계 근처에서만
+# 영상 정보를 조회해(get_video_details, 캐시됨) 정확한 업로드 날짜를 확인한다.
+DATE_PROBE_CHUNK = 30  # 목록 한 페이지 정도. 청크의 가장 오래된 영상으로 청크 전체를 먼저 판단한다
+_DAY = 86400
+# 상대 시간의 단위 (긴 것부터): YouTube 는 영상 나이에 따라 년/개월/주/일/시간/분 단위로 보여 준다
+_RELATIVE_TIME_UNITS = (366 * _DAY, 31 * _DAY, 7 * _DAY, _DAY, 3600, 60)
+
+
+def _approximate_bounds(timestamp, now):
+    """상대 시간에서 나온 timestamp 로 실제 업로드 시각이 있을 수 있는 범위 (lower, upper)"""
+    # "N units ago" 의 근삿값 나이는 N * unit 이상이므로, 나이가 닿는 가장 긴 단위가 표시 단위다
+    age = now - timestamp
+    unit = next((unit for unit in _RELATIVE_TIME_UNITS if age >= unit * 0.9), 60)
+    # "3 days ago" 는 3일 이상 4일 미만 전이고 yt-dlp 가 단위에 맞춰 반올림하므로 앞뒤로 여유를 둔다
+    return timestamp - 2 * unit, timestamp + unit
+
+
+def _date_timestamp(date_text):
+    return datetime.strptime(date_text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def _published_timestamp(video_id):
+    details = get_video_details(video_id)
+    published_at = details and details.get("published_at")
+    if not published_at:
+        return None
+    return datetime.strptime(published_at[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+
+def list_ids_by_date(channel_url, start_date=None, end_date=None, max_videos=None):
+    """채널 /videos 목록에서 업로드 날짜가 start_date ~ end_date (당일 포함) 인 영상 ID 만 최신순으로 받는다.
+
+    목록은 DATE_PROBE_CHUNK 개씩 판단한다. 청크의 가장 오래된 영상이 end_date 보다 새로우면 청크 전체를
+    건너뛰고, 경계가 걸친 청크에서는 이진 탐색으로 경계를 찾는다. 근삿값으로 판단이 되면 조회하지 않으므로
+    최근 구간은 목록 몇 페이지와 경계 근처 영상 몇 개의 조회로 끝난다. 최신순이 어긋난 영상(프리미어 등)이
+    경계 바로 옆에 있으면 빠질 수 있다.
+    목록이 중간에 끊기면 처음부터 다시 받고, 끝내 실패하면 받은 데까지를 돌려주지 않고 예외를 올린다.
+    """
+    return _list_ids_by_date(channel_url, start_date, end_date, max_videos)[0]
+
+
+def _list_ids_by_date(channel_url, start_date, end_date, max_videos):
+    # (ids, exact). exact 는 경계 판단에 필요한 영상 정보를 모두 조회했는지 (근삿값으로 대신한 경계는 캐시하지 않는다)
+    start_ts = _date_timestamp(start_date) if start_date else None
+    end_ts = _date_timestamp(end_date) + _DAY if end_date else None
+    now = time.time()
+    lookups = 0
+    exact = True
+
+    def older_than(entry, boundary):
+        nonlocal lookups, exact
+        timestamp = entry.get("timestamp")
+        if timestamp is not None:
+            lower, upper = _approximate_bounds(timestamp, now)
+            if upper < boundary:
+                return True
+            if lower >= boundary:
+                return False
+        lookups += 1
+        published = _published_timestamp(entry["id"])
+        if published is None:
+            # 정보를 못 가져온 영상(멤버 전용 등)은 근삿값으로, 그것도 없으면 범위 안으로 본다
+            exact = False
+            return timestamp is not None and timestamp < boundary
+        return published < boundary
+
+    def first_older(chunk, boundary, lo=0):
+        # chunk[lo:] 에서 boundary 보다 오래된 첫 위치 (최신순이므로 이진 탐색). 마지막 항목부터 확인한다
+        if boundary is None or lo >= len(chunk) or not older_than(chunk[-1], boundary):
+            return len(chunk)
+        hi = len(chunk) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if older_than(chunk[mid], boundary):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def scan():
+        nonlocal exact
+        exact = True
+        ids = []
+        scanned = 0
+        chunk = []
+        entries = get_collector().engine.iter_playlist(channel_url.rstrip("/") + "/videos")
+        try:
+            while True:
+                entry = next(entries, None)
+                if entry is not None:
+                    chunk.append(entry)
+                    if len(chunk) < DATE_PROBE_CHUNK:
+                        continue
+                if not chunk:
+                    break
+                scanned += len(chunk)
+                # [0, first): end_date 보다 새로움, [first, stop): 범위 안, [stop, ...): start_date 보다 오래됨
+                first = first_older(chunk, end_ts) if end_ts and not ids else 0
+                stop = first_older(chunk, start_ts, first)
+                ids.extend(item["id"] for item in chunk[first:stop])
+                if entry is None or stop < len(chunk) or (max_videos and len(ids) >= max_videos):
+                    break
+                chunk = []
+        finally:
+            entries.close()
+        return ids, scanned
 
-        raise Exception(f"최대 재시도 횟수 초과: {last_error}")
+    # 목록을 받는 동안 yt-dlp 동시 실행 슬롯을 잡는다 (경계 조회는 같은 스레드라 슬롯을 다시 잡지 않는다)
+    ids, scanned = run_with_retries(scan, command="playlist", record_latency=False)
+    ids = ids[:max_videos] if max_videos else ids
+    logger.info(f"날짜 범위 목록 완료: {len(ids)}개 (목록 {scanned}개 확인, 영상 정보 조회 {lookups}회)")
+    return ids, exact
 
 
 # 영상 ID 목록을 가져오는 함수 (성능 개선)
-def get_video_ids(channel_url, max_videos=None, start_date=None, end_date=None):
+def get_video_ids(channel_url, max_videos=None, start_date=None, end_date=None, incremental=False,
+                  raise_errors=False):
+    """채널의 영상 ID 목록. 목록을 받지 못하면 빈 목록을 돌려준다 (raise_errors=True 이면 예외를 그대로 올린다)"""
+    collector = get_collector()
+    if incremental and not (start_date or end_date):
+        try:
+            ids = sync_channel_ids(channel_url)
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"영상 ID 증분 동기화 실패: {e}")
+            return []
+        return ids[:max_videos] if max_videos else ids
+
     cache_key = f"{channel_url}_{max_videos}_{start_date}_{end_date}"
-    cached_ids = video_cache.get(cache_key)
+    cached_ids = collector.video_cache.get(cache_key)
     if cached_ids:
         logger.info(f"캐시에서 {len(cached_ids)}개의 영상 ID 로드")
         return cached_ids
 
     logger.info(f"영상 ID 목록 수집 시작: {channel_url}")
 
-    if start_date and end_date:
-        # 검색 기반 수집
-        search_query = f"{channel_url} before:{end_date} after:{start_date}"
-        cmd = [
-            "yt-dlp",
-            f"ytsearch100:{search_query}",
-            "--flat-playlist",
-            "--print", "%(id)s",
-            "--socket-timeout", "30"
-        ]
-    else:
-        # 기본 채널 기반 수집
-        cmd = [
-            "yt-dlp",
-            "--no-warnings",
-            "--flat-playlist",
-            "--print", "%(id)s",
-            "--socket-timeout", "30",
-            channel_url + "/videos"
-        ]
-
-    if max_videos:
-        cmd.extend(["--playlist-end", str(max_videos)])
-
     try:
-        result = execute_command(cmd,timeout=None)
-        ids = [line.strip() for line in result.stdout.strip().split("\n") if line.strip()]
+        exact = True
+        if start_date or end_date:
+            ids, exact = _list_ids_by_date(channel_url, start_date, end_date, max_videos)
+        else:
+            ids = collector.engine.list_ids(channel_url + "/videos", max_videos)
         logger.info(f"수집 완료: 총 {len(ids)}개 ID")
 
-        # 캐시에 저장
-        video_cache.set(cache_key, ids)
+        # 캐시에 저장 (끝나지 않은 날짜 범위는 새 영상이 더 올라올 수 있으므로, 경계 영상의 정보를 못 가져와
+        # 근삿값으로 자른 범위는 다음에 다시 확인해야 하므로 저장하지 않는다)
+        closed = not (start_date or end_date) or (end_date and _date_timestamp(end_date) + _DAY < time.time())
+        if closed and exact:
+            collector.video_cache.set(cache_key, ids)
         return ids
     except Exception as e:
+        if raise_errors:
+            raise
         logger.error(f"영상 ID 수집 실패: {e}")
         return []
 
 
-# 병렬 실행 관리를 위한 작업 큐
-result_queue = queue.Queue()
-progress_lock = threading.Lock()
-processed_count = 0
-total_count = 0
+def _details_from_info(data):
+    timestamp = data.get("upload_timestamp")
+    if timestamp:
+        published_at = datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
+    else:
+        upload_date = data.get("upload_date")
+        if upload_date:
+            published_at = datetime.strptime(upload_date, "%Y%m%d").isoformat() + "Z"
+        else:
+            published_at = None
+
+    return {
+        "title": data.get("title"),
+        "url": data.get("webpage_url"),
+        "published_at": published_at
+    }
 
 
-@lru_cache(maxsize=None)
 def get_video_details(video_id):
+    collector = get_collector()
+    details = collector.video_details.get(video_id)
+    if details:
+        return details
+
     # 캐시 확인
     cache_key = f"details_{video_id}"
-    cached_details = video_cache.get(cache_key)
+    cached_details = collector.video_cache.get(cache_key)
     if cached_details:
+        collector.video_details[video_id] = cached_details
         return cached_details
 
-    cmd = [
-        "yt-dlp",
-        "--no-warnings",
-        f"https://www.youtube.com/watch?v={video_id}",
-        "--dump-json",
-        "--skip-download",
-        "--socket-timeout", "30",
-        "--retries", "3"
-    ]
-
     try:
-        result = execute_command(cmd)
-        data = json.loads(result.stdout)
+        details = _details_from_info(collector.engine.video_info(f"https://www.youtube.com/watch?v={video_id}"))
 
-        timestamp = data.get("upload_timestamp")
-        if timestamp:
-            published_at = datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
-        else:
-            upload_date = data.get("upload_date")
-            if upload_date:
-                published_at = datetime.strptime(upload_date, "%Y%m%d").isoformat() + "Z"
-            else:
-                published_at = None
-
-        details = {
-            "title": data.get("title"),
-            "url": data.get("webpage_url"),
-            "published_at": published_at
-        }
-
-        # 캐시에 저장
-        video_cache.set(cache_key, details)
+        # 캐시에 저장 (실패하면 아무것도 남기지 않으므로 다음 호출에서 다시 시도한다)
+        collector.video_cache.set(cache_key, details)
+        collector.video_details[video_id] = details
         return details
 
     except Exception as e:
@@ -243,251 +1145,1504 @@ def get_video_details(video_id):
 
 def get_subtitles(video_url, sub_lang="ko"):
     video_id = video_url.split("v=")[-1]
-    subtitle_path = os.path.join(TEMP_FOLDER, f"{video_id}.{sub_lang}.vtt")
-
-    # 캐시 확인
-    cache_key = f"subtitle_{video_id}_{sub_lang}"
-    cached_subtitle = subtitle_cache.get(cache_key)
-    if cached_subtitle:
-        return cached_subtitle
-
-    # 파일 확인
-    if os.path.exists(subtitle_path):
-        with open(subtitle_path, "r", encoding="utf-8") as file:
-            subtitle_content = file.read()
-            subtitle_cache.set(cache_key, subtitle_content)
-            return subtitle_content
-
-    # 다운로드
-    cmd = [
-        "yt-dlp",
-        "--no-warnings",
-        "--write-auto-sub",
-        "--sub-lang", sub_lang,
-        "--skip-download",
-        "--no-playlist",
-        "--retries", "3",
-        "--socket-timeout", "30",
-        "--output", os.path.join(TEMP_FOLDER, "%(id)s.%(ext)s"),
-        video_url
-    ]
-
     try:
-        execute_command(cmd)
-        if os.path.exists(subtitle_path):
-            with open(subtitle_path, "r", encoding="utf-8") as file:
-                subtitle_content = file.read()
-                subtitle_cache.set(cache_key, subtitle_content)
-                return subtitle_content
+        _, subtitles = fetch_video(video_id, sub_lang)
+        return subtitles
     except Exception as e:
         logger.warning(f"자막 다운로드 실패 ({video_id}): {e}")
-
     return ""
 
 
-def clean_subtitles(subtitles):
-    # 메모리 효율적인 처리를 위해 한 번에 처리
-    cleaned = re.sub(r"<\d{2}:\d{2}:\d{2}\.\d{3}>|"
-                     r"\d{2}:\d{2}:\d{2}\.\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}\.\d{3}|"
-                     r"align:[\w\-]+ position:\d+%|"
-                     r"<.*?>|\[.*?\]",
-                     "", subtitles.replace("\n", " "))
-
-    # 반복 구문 제거 함수
-    def remove_repeated_phrases(text):
-        words = text.split()
-        n = len(words)
-        i = 0
-        result = []
-
-        while i < n:
-            found_repeat = False
-            # 최대 검사 길이 제한
-            for length in range(1, min(15, n - i)):
-                segment = words[i:i + length]
-                repetitions = 0
-                for j in range(i, min(i + length * 3, n), length):
-                    if j + length <= n and words[j:j + length] == segment:
-                        repetitions += 1
-                    else:
-                        break
-                if repetitions >= 3:
-                    found_repeat = True
-                    i += length * repetitions
-                    result.extend(segment)
-                    break
-            if not found_repeat:
-                result.append(words[i])
-                i += 1
+# 예전 버전은 자막을 temp/<id>.<lang>.vtt 로 받은 뒤 읽었다. 지금은 temp 에 아무것도 쓰지 않으므로
+# 남은 파일은 모두 정리 대상이다. 같은 폴더를 쓰는 다른 프로세스가 있을 수 있어 오래된 파일만 지운다.
+TEMP_MAX_AGE_SECONDS = 6 * 3600
+_TEMP_SUBTITLE_FILE = re.compile(r"^(?P<video_id>[\w-]+)\.(?P<lang>[\w-]+)\.vtt$")
 
-        return " ".join(result)
 
-    cleaned_subtitles = remove_repeated_phrases(cleaned)
-    return re.sub(r"\s{2,}", " ", cleaned_subtitles).strip()
+def collect_temp_garbage(max_age=TEMP_MAX_AGE_SECONDS):
+    """temp 폴더에서 max_age 초보다 오래된 파일을 지운다.
 
+    자막 파일은 캐시에 없으면 먼저 subtitle_cache 로 옮긴다. 지운 파일 수를 반환한다.
+    """
+    collector = get_collector()
+    cutoff = time.time() - max_age
+    removed = imported = 0
+    try:
+        entries = os.scandir(collector.temp_folder)
+    except FileNotFoundError:
+        return 0
+    with entries:
+        for entry in entries:
+            try:
+                if not entry.is_file(follow_symlinks=False) or entry.stat().st_mtime > cutoff:
+                    continue
+                match = _TEMP_SUBTITLE_FILE.match(entry.name)
+                if match:
+                    key = subtitle_cache_key(match["video_id"], match["lang"])
+                    if not collector.subtitle_cache.contains(key):
+                        with open(entry.path, "r", encoding="utf-8") as file:
+                            content = file.read()
+                        if content:
+                            if not collector.subtitle_cache.set(key, content):
+                                continue
+                            imported += 1
+                os.remove(entry.path)
+                removed += 1
+            except (OSError, UnicodeDecodeError) as e:
+                logger.debug(f"temp 파일 정리 실패 ({entry.path}): {e}")
+    if removed:
+        logger.info(f"temp 폴더 정리: 파일 {removed}개 삭제 (자막 {imported}개는 캐시로 옮김)")
+    return removed
+
+
+def start_temp_gc(max_age=TEMP_MAX_AGE_SECONDS):
+    # 파일이 아주 많이 쌓였을 수 있으므로 수집을 막지 않도록 백그라운드에서 돈다
+    thread = threading.Thread(target=collect_temp_garbage, args=(max_age,), name="temp-gc", daemon=True)
+    thread.start()
+    return thread
+
+
+def subtitle_cache_key(video_id, lang, kind="auto"):
+    # 자동 자막은 예전 키를 그대로 쓴다
+    return f"subtitle_{video_id}_{lang}" if kind == "auto" else f"subtitle_{video_id}_{lang}_{kind}"
+
+
+def subtitle_negative_key(video_id, lang, kind="auto"):
+    return f"{video_id}:{lang}" if kind == "auto" else f"{video_id}:{lang}:{kind}"
+
+
+def lookup_cached_subtitles(video_id, lang, source="auto"):
+    """캐시만 보고 언어 하나의 자막을 정한다.
+
+    (트랙 종류, 자막) 을 반환한다. 확인할 트랙이 모두 없다고 기록되어 있으면 (None, ""),
+    우선순위가 더 높은 트랙을 아직 확인하지 않았으면 None (추출해야 알 수 있다).
+    """
+    collector = get_collector()
+    for kind in SUBTITLE_SOURCES[source]:
+        subtitles = collector.subtitle_cache.get(subtitle_cache_key(video_id, lang, kind))
+        if subtitles:
+            return kind, subtitles
+        if collector.negative_cache.reason(subtitle_negative_key(video_id, lang, kind)) != "no_subtitles":
+            return None
+    return None, ""
+
+
+def negative_reasons(video_ids, languages="ko", source="auto"):
+    """video_ids 중 네거티브 캐시로 건너뛸 영상 {영상 ID: 이유}.
+
+    멤버 전용 등 영상 자체의 기록과, 요청한 모든 언어의 자막 트랙이 없다고 기록된 경우(no_subtitles)다.
+    """
+    languages = parse_languages(languages)
+    track_keys = {video_id: [subtitle_negative_key(video_id, lang, kind)
+                             for lang in languages for kind in SUBTITLE_SOURCES[source]]
+                  for video_id in video_ids}
+    found = get_collector().negative_cache.reasons(list(track_keys) + [key for keys in track_keys.values() for key in keys])
+    reasons = {}
+    for video_id, keys in track_keys.items():
+        if video_id in found:
+            reasons[video_id] = found[video_id]
+        elif all(found.get(key) == "no_subtitles" for key in keys):
+            reasons[video_id] = "no_subtitles"
+    return reasons
+
+
+def fetch_video_subtitles(video_id, languages=("ko",), source="auto", retries=3):
+    """영상 정보와 여러 언어의 자막을 함께 가져온다. (details, {언어: 자막}) 를 반환한다.
+
+    영상 정보나 어느 한 언어라도 캐시로 정해지지 않으면 한 번의 추출로 메타데이터와 필요한 언어의
+    자막 트랙을 모두 받아 video_cache / subtitle_cache (언어·트랙 종류마다 따로) 를 채운다.
+    자막이 없는 언어는 결과에서 빠지고 네거티브 캐시에 기록된다.
+    추출 실패는 예외로 올라간다 (멤버 전용/성인 인증은 VideoUnavailableError).
+    네거티브 캐시에 있는 영상은 yt-dlp 를 실행하지 않는다.
+    """
+    collector = get_collector()
+    languages = parse_languages(languages)
+    details = collector.video_cache.get(f"details_{video_id}")
+    cached = {lang: lookup_cached_subtitles(video_id, lang, source) for lang in languages}
+    pending = [lang for lang, found in cached.items() if found is None]
+    if details and not pending:
+        return details, {lang: subtitles for lang, (_, subtitles) in cached.items() if subtitles}
+
+    reason = collector.negative_cache.reason(video_id)
+    if reason:
+        raise VideoUnavailableError(reason, "네거티브 캐시에 기록된 영상")
+
+    try:
+        data, fetched = collector.engine.video_info_with_subtitles(f"https://www.youtube.com/watch?v={video_id}",
+                                                                   pending, source, retries=retries)
+    except VideoUnavailableError as e:
+        collector.negative_cache.add(video_id, e.reason)
+        raise
+
+    if not details:
+        details = _details_from_info(data)
+        collector.video_cache.set(f"details_{video_id}", details)
+    for lang in pending:
+        kind, subtitles = fetched.get(lang, (None, ""))
+        # 고른 트랙보다 우선순위가 높은 트랙은 없는 것이다 (고른 트랙이 없으면 모두 없다)
+        for candidate in SUBTITLE_SOURCES[source]:
+            if candidate == kind:
+                break
+            collector.negative_cache.add(subtitle_negative_key(video_id, lang, candidate), "no_subtitles")
+        if subtitles:
+            # 자막은 메모리로 받아 바로 캐시에 넣는다 (temp 파일을 거치지 않는다)
+            collector.subtitle_cache.set(subtitle_cache_key(video_id, lang, kind), subtitles)
+        cached[lang] = (kind, subtitles)
+    return details, {lang: subtitles for lang, (_, subtitles) in cached.items() if subtitles}
+
+
+def fetch_video(video_id, sub_lang="ko", retries=3):
+    """fetch_video_subtitles 의 한 언어(자동 자막) 버전. (details, 자막 문자열) 을 반환한다.
+
+    추출이 성공했는데 자막 문자열이 비어 있으면 해당 언어 자막이 없는 영상이다.
+    """
+    details, subtitles = fetch_video_subtitles(video_id, [sub_lang], retries=retries)
+    return details, subtitles.get(sub_lang, "")
+
+
+# 반복 구문 제거 (같은 구문이 연속 3번 나오면 1번만 남긴다)
+_HASH_MOD = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+
+
+def remove_repeated_phrases(text, max_length=14):
+    """길이 1~max_length 단어 구문이 연속 3번 반복되면 한 번으로 줄인다.
+
+    단어를 정수 ID로 바꾼 뒤, 같은 단어의 다음 위치(next occurrence)를 따라가며
+    반복 후보 길이만 검사하고 구문 비교는 prefix rolling hash 로 O(1)에 한다.
+    위치마다 리스트 슬라이스를 만들지 않으므로 전체가 선형 시간에 가깝다.
+    (예전 구현과 같은 결과: 짧은 길이부터 검사하고 처음 찾은 반복을 적용)
+    """
+    words = text.split()
+    n = len(words)
+    if n == 0:
+        return ""
+
+    vocab = {}
+    ids = [vocab.setdefault(word, len(vocab) + 1) for word in words]
+
+    # 같은 단어가 다음에 나오는 위치
+    next_same = [n] * n
+    last_seen = {}
+    for i in range(n - 1, -1, -1):
+        next_same[i] = last_seen.get(ids[i], n)
+        last_seen[ids[i]] = i
+
+    prefix = [0] * (n + 1)
+    for i, word_id in enumerate(ids):
+        prefix[i + 1] = (prefix[i] * _HASH_BASE + word_id) % _HASH_MOD
+    powers = [1] * (max_length + 1)
+    for length in range(1, max_length + 1):
+        powers[length] = powers[length - 1] * _HASH_BASE % _HASH_MOD
+
+    def segment_hash(start, length):
+        return (prefix[start + length] - prefix[start] * powers[length]) % _HASH_MOD
+
+    result = []
+    i = 0
+    while i < n:
+        limit = min(max_length + 1, n - i)
+        j = next_same[i]
+        while j - i < limit:
+            length = j - i
+            k = j + length
+            if (k + length <= n and ids[k] == ids[i]
+                    and segment_hash(i, length) == segment_hash(j, length) == segment_hash(k, length)
+                    and ids[i:i + length] == ids[j:j + length] == ids[k:k + length]):
+                result.extend(words[i:i + length])
+                i = k + length
+                break
+            j = next_same[j]
+        else:
+            result.append(words[i])
+            i += 1
+
+    return " ".join(result)
+
+
+# ─── WebVTT 파서 ──────────────────────────────────────────────────
+_VTT_TIMING = re.compile(r"((?:\d+:)?\d{2}:\d{2}\.\d{3})\s*-->\s*((?:\d+:)?\d{2}:\d{2}\.\d{3})")
+_VTT_MARKUP = re.compile(r"<[^>]*>|\[.*?\]")
+# 단어별 시각 태그 (<00:00:01.234>). YouTube 자동 자막(롤링 큐)에만 있다
+_VTT_WORD_TIMING = re.compile(r"<(?:\d+:)?\d{2}:\d{2}\.\d{3}>")
+
+
+def _vtt_seconds(timestamp):
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def iter_vtt_cues(lines):
+    """VTT 줄 단위 입력에서 (start, end, payload 줄 목록) 을 하나씩 내보낸다.
+
+    헤더, NOTE/STYLE 블록, 큐 식별자 줄은 건너뛴다. 큐는 완전히 빈 줄에서 끝난다
+    (YouTube 자동 자막에는 공백 한 칸짜리 줄이 큐 안에 들어 있으므로 strip 하지 않는다).
+    """
+    start = end = None
+    payload = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if start is not None:
+                yield start, end, payload
+                start, payload = None, []
+            continue
+        if start is None:
+            match = _VTT_TIMING.search(line) if "-->" in line else None
+            if match:
+                start, end = _vtt_seconds(match.group(1)), _vtt_seconds(match.group(2))
+            continue
+        payload.append(line)
+    if start is not None:
+        yield start, end, payload
+
+
+def iter_subtitle_segments(subtitles, rolling=None):
+    """(start, end, text) 구간을 내보낸다.
+
+    YouTube 자동 자막의 롤링 큐는 직전 큐의 마지막 줄을 첫 줄로 다시 보여 주므로,
+    현재 큐 앞부분 중 직전 큐 끝부분과 같은 줄을 떼어 내고 새로 나온 줄만 남긴다.
+    이 처리는 롤링 자막에만 한다. 수동 자막에서는 같은 줄이 이어져도("Yes." / "Yes.") 실제로 반복된 말이다.
+    rolling 을 주지 않으면 단어별 시각 태그가 있는 큐가 나온 뒤부터 롤링 자막으로 본다 (자동 자막은 첫 큐부터 있다).
+    subtitles 는 문자열 또는 줄 단위 iterable (열린 파일 등) 이다.
+    """
+    lines = io.StringIO(subtitles) if isinstance(subtitles, str) else subtitles
+    previous = []
+    for start, end, payload in iter_vtt_cues(lines):
+        if rolling is None and any(_VTT_WORD_TIMING.search(line) for line in payload):
+            rolling = True
+        texts = []
+        for line in payload:
+            text = " ".join(html.unescape(_VTT_MARKUP.sub("", line)).split())
+            if text:
+                texts.append(text)
+        if not texts:
+            continue
+
+        carried = 0
+        for size in range(min(len(texts), len(previous)) if rolling else 0, 0, -1):
+            if texts[:size] == previous[-size:]:
+                carried = size
+                break
+        previous = texts
+        if carried < len(texts):
+            yield start, end, " ".join(texts[carried:])
+
+
+# clean_subtitles 의 결과가 달라지는 수정을 하면 올린다. 예전 버전으로 정리된 캐시 항목은 쓰지 않는다
+CLEANER_VERSION = "3"
+
+
+def cleaned_cache_key(subtitles):
+    digest = hashlib.blake2b(subtitles.encode("utf-8"), digest_size=16).hexdigest()
+    return f"cleaned_{CLEANER_VERSION}_{digest}"
+
+
+def lookup_cleaned_subtitles(subtitles_list):
+    """(캐시 키 목록, 정리된 자막 목록) — 정리된 자막 캐시에 없는 항목은 None"""
+    collector = get_collector()
+    keys = [cleaned_cache_key(subtitles) for subtitles in subtitles_list]
+    return keys, [collector.cleaned_cache.get(key) for key in keys]
+
+
+def store_cleaned_subtitles(keys, cleaned_list):
+    cleaned_cache = get_collector().cleaned_cache
+    for key, cleaned in zip(keys, cleaned_list):
+        cleaned_cache.set(key, cleaned)
+
+
+def clean_subtitles_cached(subtitles):
+    (key,), (cleaned,) = lookup_cleaned_subtitles([subtitles])
+    if cleaned is None:
+        cleaned = clean_subtitles(subtitles)
+        get_collector().cleaned_cache.set(key, cleaned)
+    return cleaned
+
+
+def clean_subtitles(subtitles, with_segments=False):
+    """VTT 자막을 정리된 텍스트로 바꾼다.
+
+    with_segments=True 이면 (text, [(start, end, text), ...]) 를 반환한다.
+    큐 구조가 있는 자막은 iter_subtitle_segments 의 큐 단위 중복 제거만 하고 그대로 잇는다. 반복 구문을
+    어림으로 지우는 remove_repeated_phrases 는 실제로 반복된 말도 지우므로 큐 구조가 없는 입력에만 쓴다.
+    """
+    if "-->" in subtitles:
+        segments = list(iter_subtitle_segments(subtitles))
+        cleaned = " ".join(text for _, _, text in segments)
+    else:
+        # 큐 구조가 없는 입력은 예전 방식대로 태그를 걷어 내고 반복 구문을 지운다
+        segments = []
+        cleaned = remove_repeated_phrases(_VTT_MARKUP.sub("", subtitles.replace("\n", " ")))
 
-def process_video(video_id, sub_lang):
-    global processed_count
+    cleaned_subtitles = re.sub(r"\s{2,}", " ", cleaned).strip()
+    if with_segments:
+        return cleaned_subtitles, segments
+    return cleaned_subtitles
 
+
+def process_video(video_id, sub_lang, subtitle_source="auto"):
     try:
-        video = get_video_details(video_id)
+        video, subtitles = fetch_video_subtitles(video_id, sub_lang, subtitle_source)
         if not video:
             return None
 
-        url = video["url"]
-        title = video["title"]
-        subtitles = get_subtitles(url, sub_lang)
-
         if subtitles:
-            cleaned = clean_subtitles(subtitles)
-            result = {
-                "Title": title,
-                "Video URL": url,
-                "Published At": video.get("published_at"),
-                "Subtitles": cleaned
-            }
-
-            # 진행 상황 업데이트
-            with progress_lock:
-                processed_count += 1
-                if processed_count % 5 == 0 or processed_count == total_count:
-                    logger.info(f"진행 상황: {processed_count}/{total_count} ({processed_count / total_count * 100:.1f}%)"+f"현재 살아있는 스레드 수: {threading.active_count()}" )
-
-            return result
+            cleaned = {lang: clean_subtitles_cached(text) for lang, text in subtitles.items()}
+            return _build_row(video, cleaned, sub_lang)
 
     except Exception as e:
         logger.error(f"비디오 처리 중 오류 발생 ({video_id}): {e}")
 
-    # 진행 상황 업데이트 (실패한 경우에도)
-    with progress_lock:
-        processed_count += 1
-        if processed_count % 5 == 0 or processed_count == total_count:
-            logger.info(f"진행 상황: {processed_count}/{total_count} ({processed_count / total_count * 100:.1f}%)")
-
     return None
 
 
-def process_batch(video_ids, sub_lang, batch_idx, batch_size, output_file,max_workers=1000):
-    batch_results = []
+def _build_row(video, cleaned, languages):
+    # cleaned: {언어: 정리된 자막}. 자막이 없는 언어의 열은 빈 문자열
+    row = {
+        "Title": video["title"],
+        "Video URL": video["url"],
+        "Published At": video.get("published_at"),
+    }
+    for lang, column in subtitle_columns(languages).items():
+        row[column] = cleaned.get(lang, "")
+    return row
+
+
+# ─── 작업 저널 (중단 후 이어서 실행) ─────────────────────────────────
+class RunJournal:
+    """실행 단위 write-ahead 저널. 영상 ID마다 마지막 상태를 한 줄씩 덧붙여 기록한다.
+
+    상태: pending → details-done → subtitles-done → cleaned → written
+          (또는 failed: 멤버 전용, 자막 없음 등 다시 시도해도 안 되는 경우)
+    다시 실행하면 written / failed 인 영상은 건너뛴다.
+    """
+
+    FINISHED_STATES = ("written", "failed")
+
+    def __init__(self, path):
+        self.path = path
+        self.states = {}
+        self.meta = {}
+        if os.path.exists(path):
+            self._load()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    kind, key, value, _reason = json.loads(line)
+                except ValueError:
+                    # 비정상 종료로 마지막 줄이 잘린 경우
+                    continue
+                if kind == "meta":
+                    self.meta[key] = value
+                else:
+                    self.states[key] = value
 
-    with ThreadPoolExecutor(max_workers) as executor:
-        futures = [executor.submit(process_video, vid, sub_lang) for vid in video_ids]
-        for future in as_completed(futures):
+    def _append(self, records, sync=False):
+        self.file.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
 
-            try:
-                result = future.result()
-                if result:
-                    batch_results.append(result)
-            except Exception as e:
-                logger.error(f"Future 실행 중 오류: {e}")
-        
-    # 배치 결과 저장
-    if batch_results:
-        batch_file = f"{output_file}.batch{batch_idx}"
-        # 배치 파일 저장 디렉토리 확인
-        batch_dir = os.path.dirname(batch_file)
-        if not os.path.exists(batch_dir):
-            os.makedirs(batch_dir)
+    def set_meta(self, name, value):
+        self.meta[name] = value
+        self._append([("meta", name, value, None)], sync=True)
 
-        with open(batch_file, "w", encoding="utf-8", newline="") as csvfile:
-            fieldnames = ["Published At", "Title", "Video URL", "Subtitles"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(batch_results)
+    def state(self, video_id):
+        return self.states.get(video_id)
 
-        logger.info(f"배치 {batch_idx} 결과 저장 완료: {len(batch_results)}개 항목")
+    def is_finished(self, video_id):
+        return self.states.get(video_id) in self.FINISHED_STATES
 
-    return batch_results
+    def record(self, video_id, state, reason=None):
+        self.states[video_id] = state
+        self._append([("video", video_id, state, reason)])
 
+    def record_many(self, video_ids, state):
+        video_ids = list(video_ids)
+        for video_id in video_ids:
+            self.states[video_id] = state
+        self._append([("video", video_id, state, None) for video_id in video_ids], sync=True)
 
-def collect_and_save_data(channel_url, sub_lang="ko", max_videos=None, start_date=None, end_date=None):
-    global processed_count, total_count
+    def count(self, state):
+        return sum(1 for value in self.states.values() if value == state)
+
+    def close(self):
+        self.file.close()
+
+
+# ─── asyncio 수집 파이프라인 ──────────────────────────────────────────
+# 목록 수집 → 영상 정보/자막 가져오기 → 자막 정리 → 저장
+# 단계마다 동시 실행 수를 따로 두고, 단계 사이는 크기 제한이 있는 큐로 연결한다.
+# 채널 크기와 상관없이 스레드 수와 메모리 사용량이 일정하게 유지된다.
+# fetch 는 네트워크 추출, load 는 캐시에 다 있는 영상 읽기,
+# clean 은 자막 정리 프로세스 수 (0 이면 프로세스 풀 없이 스레드에서 정리)
+PIPELINE_CONCURRENCY = {"fetch": 30, "load": 4, "clean": os.cpu_count() or 1, "write": 1}
+PIPELINE_QUEUE_SIZE = 200
+CLEAN_BATCH_SIZE = 32  # 프로세스 간 전송(IPC) 횟수를 줄이기 위해 한 번에 보내는 자막 수
+PROGRESS_INTERVAL = 5  # 진행 상황(처리량, 남은 시간)을 로그로 남기는 간격 (초)
+
+FETCH_RETRIES = 3  # 파이프라인에서 영상 하나를 네트워크로 가져오는 최대 시도 횟수
+FETCH_BACKOFF_FACTOR = 1.5
+
+_STAGE_DONE = object()
+
+
+class RetryLater(Exception):
+    """이 항목을 delay 초 뒤에 같은 단계에서 다시 처리한다"""
+
+    def __init__(self, delay, message):
+        super().__init__(message)
+        self.delay = delay
+
+
+class RetryScheduler:
+    """재시도 항목을 이벤트 루프 타이머(call_later)로 다시 큐에 넣는다.
+
+    기다리는 동안 스레드나 yt-dlp 실행 슬롯을 잡고 있지 않으므로 정상 영상 처리가 막히지 않는다.
+    outstanding 은 단계에 들어갔지만 아직 최종 결과(성공/실패)가 나지 않은 항목 수이며,
+    0 이 되어야 단계를 닫을 수 있다.
+    """
+
+    def __init__(self):
+        self.outstanding = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._tasks = set()
+
+    def track(self):
+        self.outstanding += 1
+        self._drained.clear()
+
+    def resolve(self):
+        self.outstanding -= 1
+        if self.outstanding == 0:
+            self._drained.set()
+
+    def schedule(self, queue, item, delay):
+        loop = asyncio.get_running_loop()
+
+        def requeue():
+            task = loop.create_task(queue.put(item))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        loop.call_later(delay, requeue)
+
+    async def wait_drained(self):
+        await self._drained.wait()
+
+
+class PipelineStats:
+    """파이프라인 진행 상황. 이벤트 루프 스레드에서만 갱신하므로 락이 필요 없다.
 
-    start_time = time.time()
-    logger.info(f"작업 시작: {channel_url}, 언어: {sub_lang}")
-
-    # 비디오 ID 수집
-    video_ids = get_video_ids(channel_url, max_videos, start_date, end_date)
-    if not video_ids:
-        logger.error("영상 ID를 가져오지 못했습니다.")
-        return
-    check_cache_coverage(video_ids=video_ids)
-    check_cache_coverage(subtitle=video_ids)
-    # 채널 핸들 추출
-    if '@' in channel_url:
-        channel_handle = channel_url.split('@')[-1].split('/')[0]
-    else:
-        channel_handle = channel_url.rstrip('/').split('/')[-1]
+    진행 로그는 ProgressReporter 스레드가 일정 간격으로 값을 읽어서 남긴다 (읽기만 하므로 역시 락이 필요 없다).
+    """
 
-    # 채널별 결과 디렉토리 생성
-    channel_result_dir = os.path.join(RESULT_FOLDER, channel_handle)
-    if not os.path.exists(channel_result_dir):
-        os.makedirs(channel_result_dir)
+    def __init__(self, label=None):
+        self.label = label  # 여러 채널을 함께 돌릴 때 진행 로그 앞에 붙는 채널 이름
+        self.total = 0
+        self.written = 0
+        self.failed = 0
+        self.resumed = 0  # 이전 실행에서 이미 끝난 영상 수
+        self.listed = False  # 영상 ID 목록을 받았는지 (목록 수집이 실패하면 False)
+        self.started_at = time.time()
 
-    # 출력 파일 설정
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_filename = f"{channel_handle}_subtitles_{timestamp}.csv"
-    output_file = os.path.join(channel_result_dir, output_filename)
+    @property
+    def processed(self):
+        return self.written + self.failed
 
-    # 전역 카운터 초기화
-    total_count = len(video_ids)
-    processed_count = 0
+class ChannelJob:
+    """파이프라인 안에서 채널 하나가 가지는 상태.
+
+    여러 채널이 같은 단계/스레드/캐시를 함께 쓰므로, 큐를 지나는 항목마다 자기 job 을 들고 다니며
+    결과 행(on_row, 코루틴 함수여도 된다), 저널 기록, 진행 상황을 채널별로 나눈다. weight 는 목록을 큐에 넣을 때
+    한 바퀴에 이 채널 영상을 몇 개씩 넣을지이다. video_ids 를 주면 채널 목록을 받지 않고 그 영상만 처리한다.
+    """
+
+    def __init__(self, channel_url, on_row, journal=None, weight=1, label=None, video_ids=None):
+        self.channel_url = channel_url
+        self.on_row = on_row
+        self.journal = journal
+        self.weight = max(int(weight), 1)
+        self.video_ids = video_ids
+        self.stats = PipelineStats(label)
+
+    def record(self, video_id, state, reason=None):
+        if state == "failed":
+            VIDEOS_FAILED.inc(reason=reason or "error")
+        if self.journal:
+            self.journal.record(video_id, state, reason)
+
+    def fail(self):
+        self.stats.failed += 1
+
+
+async def _run_stage(name, handler, inbox, outbox, workers, retry=None):
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _STAGE_DONE:
+                return
+            try:
+                with STAGE_SECONDS.time(stage=name):
+                    result = await handler(item)
+            except RetryLater as e:
+                logger.warning(f"[{name}] {e.delay:.1f}초 뒤 재시도 예약 ({item['video_id']}): {e}")
+                EXTRACTION_RETRIES.inc(command=f"pipeline_{name}", error_class=classify_error(str(e)) or "error")
+                retry.schedule(inbox, item, e.delay)
+                continue
+            except Exception as e:
+                logger.error(f"[{name}] 처리 중 오류 발생 ({item['video_id']}): {e}")
+                VIDEOS_FAILED.inc(reason=classify_error(str(e)) or "error")
+                result = None
+            if result is None:
+                item["job"].fail()
+            else:
+                await outbox.put(result)
+            if retry:
+                retry.resolve()
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+async def _run_batch_stage(name, handler, inbox, outbox, workers, batch_size):
+    # _run_stage 와 같지만 큐에 쌓여 있는 항목을 batch_size 까지 모아 handler(items) 로 한 번에 넘긴다
+    async def worker():
+        finished = False
+        while not finished:
+            batch = []
+            item = await inbox.get()
+            while True:
+                if item is _STAGE_DONE:
+                    finished = True
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size or inbox.empty():
+                    break
+                item = inbox.get_nowait()
+            if not batch:
+                continue
+
+            try:
+                with STAGE_SECONDS.time(stage=name):
+                    results = await handler(batch)
+            except Exception as e:
+                logger.error(f"[{name}] 배치 처리 중 오류 발생 ({len(batch)}개): {e}")
+                VIDEOS_FAILED.inc(len(batch), reason="error")
+                results = [None] * len(batch)
+            for item, result in zip(batch, results):
+                if result is None:
+                    item["job"].fail()
+                    continue
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+async def _close_after(stages, outbox, consumers):
+    # 앞 단계(여러 개일 수 있음)가 모두 끝나면 다음 단계 worker 수만큼 종료 신호를 넣는다
+    await asyncio.gather(*stages)
+    for _ in range(consumers):
+        await outbox.put(_STAGE_DONE)
+
+
+def _clean_subtitles_batch_timed(subtitles_list):
+    # 프로세스 풀에서 실행되는 배치 정리 함수 (pickle 가능하도록 모듈 최상위에 둔다).
+    # 정리한 자막과 영상마다 쓴 CPU 시간을 함께 돌려준다 (계측은 부모 프로세스에서 한다)
+    results = []
+    for subtitles in subtitles_list:
+        started = time.process_time()
+        cleaned = clean_subtitles(subtitles)
+        results.append((cleaned, time.process_time() - started))
+    return results
+
+
+async def run_pipeline(channel_url, sub_lang, on_row, max_videos=None, start_date=None, end_date=None,
+                       concurrency=None, queue_size=PIPELINE_QUEUE_SIZE, clean_batch_size=CLEAN_BATCH_SIZE,
+                       journal=None, incremental=False, subtitle_source="auto"):
+    """채널 하나를 수집해 정리된 행마다 on_row(row, video_id) 를 호출하고 PipelineStats 를 반환한다.
+    on_row 가 awaitable 을 돌려주면 저장 단계가 그것을 기다린 다음 행으로 넘어간다.
+
+    journal(RunJournal) 을 넘기면 영상별 진행 상태를 기록하고, 이미 끝난 영상은 건너뛴다.
+    """
+    job = ChannelJob(channel_url, on_row, journal)
+    await run_channels([job], sub_lang, max_videos, start_date, end_date, concurrency=concurrency,
+                       queue_size=queue_size, clean_batch_size=clean_batch_size, incremental=incremental,
+                       subtitle_source=subtitle_source)
+    return job.stats
+
+
+def _progress_detail(jobs):
+    # 진행 로그 끝에 붙는 부가 정보: 채널이 여럿이면 채널별 진행, 그리고 yt-dlp 요청 제어 상태
+    parts = [f"[{job.stats.label}] {job.stats.processed}/{job.stats.total}"
+             for job in jobs if job.stats.label and job.stats.processed < job.stats.total]
+    limiter = yt_dlp_limiter.snapshot()
+    parts.append(f"yt-dlp 동시 실행 한도: {limiter['limit']} (초당 {limiter['rate']}회)")
+    return ", ".join(parts)
+
+
+def _pipeline_executors(concurrency):
+    # 네트워크/캐시 작업은 fetch 동시 실행 수만큼의 스레드에서, CPU 작업인 자막 정리는
+    # 별도 프로세스 풀에서 실행해 GIL 경합 없이 모든 코어를 쓴다
+    clean_processes = concurrency["clean"]
+    executor = ThreadPoolExecutor(max_workers=concurrency["fetch"] + concurrency["load"] + (0 if clean_processes else 1))
+    clean_executor = ProcessPoolExecutor(max_workers=clean_processes) if clean_processes else executor
+    return executor, clean_executor
+
+
+def _shutdown_executors(executors):
+    executor, clean_executor = executors
+    executor.shutdown(wait=False)
+    if clean_executor is not executor:
+        clean_executor.shutdown()
+
+
+async def run_channels(jobs, sub_lang, max_videos=None, start_date=None, end_date=None, concurrency=None,
+                       queue_size=PIPELINE_QUEUE_SIZE, clean_batch_size=CLEAN_BATCH_SIZE, incremental=False,
+                       subtitle_source="auto", executors=None):
+    """여러 채널(ChannelJob 목록)을 하나의 파이프라인에서 함께 수집한다.
+
+    스레드 풀, 프로세스 풀, 캐시, yt-dlp 요청 제어는 모든 채널이 공유한다. 채널 목록은 가중치
+    라운드 로빈으로 섞어서 큐에 넣으므로 영상이 아주 많은 채널이 있어도 다른 채널이 밀리지 않는다.
+    sub_lang 은 언어 하나 또는 여러 개("ko,en" 이나 목록)이며, 영상마다 한 번의 추출로 모든 언어를
+    받고 언어마다 한 열씩 행을 만든다. 요청한 언어 중 하나라도 자막이 있으면 저장한다.
+    executors 로 (스레드 풀, 정리 프로세스 풀) 을 넘기면 그것을 쓰고 닫지 않는다 (여러 번 부르는 워커용,
+    _pipeline_executors 로 같은 concurrency 에서 만든다). 주지 않으면 이번 실행에서 만들고 닫는다.
+    """
+    concurrency = {**PIPELINE_CONCURRENCY, **(concurrency or {})}
+    languages = parse_languages(sub_lang)
+    loop = asyncio.get_running_loop()
+    owns_executors = executors is None
+    executor, clean_executor = executors = executors or _pipeline_executors(concurrency)
+    clean_workers = max(concurrency["clean"], 1)
+
+    fetch_queue = asyncio.Queue(queue_size)
+    load_queue = asyncio.Queue(queue_size)
+    clean_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    retry = RetryScheduler()
+    stage_queues = {"fetch": fetch_queue, "load": load_queue, "clean": clean_queue, "write": write_queue}
+    for queue_name, stage_queue in stage_queues.items():
+        QUEUE_DEPTH.set_function(stage_queue.qsize, queue=queue_name)
+
+    async def list_ids(job):
+        # 채널 하나의 영상 ID 를 모아 (보낼 큐, 항목) 목록으로 돌려준다
+        stats, journal = job.stats, job.journal
+        try:
+            video_ids = job.video_ids
+            if video_ids is None:
+                video_ids = await loop.run_in_executor(executor, functools.partial(
+                    get_video_ids, job.channel_url, max_videos, start_date, end_date, incremental, raise_errors=True))
+        except Exception as e:
+            logger.error(f"[{job.channel_url}] 영상 ID 목록 수집 실패: {e}")
+            return []
+        stats.listed = True
+        stats.total = len(video_ids)
+        if journal:
+            stats.resumed = sum(1 for video_id in video_ids if journal.is_finished(video_id))
+            if stats.resumed:
+                logger.info(f"[{job.channel_url}] 이전 실행 이어서 진행: {stats.resumed}개 영상은 이미 완료되어 건너뜀")
+            video_ids = [video_id for video_id in video_ids if not journal.is_finished(video_id)]
+            journal.record_many((video_id for video_id in video_ids if journal.state(video_id) is None), "pending")
+            stats.total = len(video_ids)
+        missing = set()
+        negative = {}
+        if video_ids:
+            missing = set(await loop.run_in_executor(executor, check_cache_coverage, languages, video_ids, video_ids,
+                                                     subtitle_source))
+            negative = await loop.run_in_executor(executor, negative_reasons, missing, languages, subtitle_source)
+            if negative:
+                logger.info(f"[{job.channel_url}] 네거티브 캐시: {len(negative)}개 영상은 확인 없이 건너뜀")
+        routed = []
+        for video_id in video_ids:
+            reason = negative.get(video_id)
+            if reason:
+                # 멤버 전용/자막 없음 등으로 기록된 영상은 yt-dlp 를 실행하지 않는다
+                job.record(video_id, "failed", reason)
+                job.fail()
+            elif video_id in missing:
+                routed.append((fetch_queue, {"video_id": video_id, "job": job}))
+            else:
+                # 캐시에 다 있는 영상은 네트워크 단계를 거치지 않는다
+                routed.append((load_queue, {"video_id": video_id, "job": job}))
+        return routed
+
+    async def dispatch():
+        # 목록이 먼저 나온 채널부터 돌리되, 한 바퀴에 채널마다 weight 개씩만 큐에 넣는다
+        listing = {asyncio.ensure_future(list_ids(job)): job for job in jobs}
+        active = []
+        while listing or active:
+            if listing:
+                done, _ = await asyncio.wait(listing, timeout=0 if active else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    job = listing.pop(task)
+                    active.append((job, job.weight, iter(task.result())))
+            for _, (target_queue, item) in weighted_round(active):
+                if target_queue is fetch_queue:
+                    retry.track()
+                await target_queue.put(item)
+
+        for _ in range(concurrency["load"]):
+            await load_queue.put(_STAGE_DONE)
+        # 재시도 예약된 항목까지 모두 끝난 뒤에 fetch 단계를 닫는다
+        await retry.wait_drained()
+        for _ in range(concurrency["fetch"]):
+            await fetch_queue.put(_STAGE_DONE)
+
+    async def fetch(item, retries=1):
+        # 파이프라인에서는 한 번만 시도하고, 실패하면 RetryLater 로 타이머에 다시 예약한다
+        video_id, job = item["video_id"], item["job"]
+        try:
+            details, subtitles = await loop.run_in_executor(executor, fetch_video_subtitles, video_id, languages,
+                                                            subtitle_source, retries)
+        except VideoUnavailableError as e:
+            job.record(video_id, "failed", e.reason)
+            return None
+        except Exception as e:
+            if retries == 1 and item.get("attempt", 1) < FETCH_RETRIES:
+                item["attempt"] = item.get("attempt", 1) + 1
+                raise RetryLater(FETCH_BACKOFF_FACTOR ** item["attempt"], str(e))
+            raise
+        job.record(video_id, "details-done")
+        if not subtitles:
+            logger.info(f"자막 없음: {video_id}")
+            job.record(video_id, "failed", "no_subtitles")
+            return None
+        job.record(video_id, "subtitles-done")
+        item["details"], item["subtitles"] = details, subtitles
+        return item
+
+    async def clean(items):
+        # 정리된 자막 캐시(원본 내용 해시 + CLEANER_VERSION)에 있는 영상은 프로세스 풀로 보내지 않는다.
+        # 영상마다 언어별 자막이 있으므로 (영상, 언어) 단위로 펼쳐서 한 번에 정리한다
+        owners = [(item, lang) for item in items for lang in item["subtitles"]]
+        subtitles_list = [item["subtitles"][lang] for item, lang in owners]
+        keys, cleaned_list = await loop.run_in_executor(executor, lookup_cleaned_subtitles, subtitles_list)
+        pending = [index for index, cleaned in enumerate(cleaned_list) if cleaned is None]
+        if pending:
+            results = await loop.run_in_executor(clean_executor, _clean_subtitles_batch_timed,
+                                                 [subtitles_list[index] for index in pending])
+            for index, (cleaned, cpu_seconds) in zip(pending, results):
+                CLEAN_CPU_SECONDS.observe(cpu_seconds)
+                cleaned_list[index] = cleaned
+            await loop.run_in_executor(executor, store_cleaned_subtitles,
+                                       [keys[index] for index in pending], [cleaned_list[index] for index in pending])
+        for (item, lang), cleaned in zip(owners, cleaned_list):
+            item["subtitles"][lang] = cleaned
+        for item in items:
+            item["row"] = _build_row(item.pop("details"), item.pop("subtitles"), languages)
+            item["job"].record(item["video_id"], "cleaned")
+        return items
+
+    async def write():
+        while True:
+            item = await write_queue.get()
+            if item is _STAGE_DONE:
+                return
+            job = item["job"]
+            written = job.on_row(item["row"], item["video_id"])
+            if inspect.isawaitable(written):
+                await written
+            VIDEOS_WRITTEN.inc()
+            job.stats.written += 1
+
+    # 진행 로그는 항목마다 남기지 않고 별도 스레드가 PROGRESS_INTERVAL 초마다 카운터를 읽어서 남긴다
+    def progress():
+        return sum(job.stats.processed for job in jobs), sum(job.stats.total for job in jobs)
+
+    reporter = ProgressReporter(progress, PROGRESS_INTERVAL, detail=lambda: _progress_detail(jobs), log=logger).start()
+    try:
+        await asyncio.gather(
+            dispatch(),
+            _close_after([
+                _run_stage("fetch", fetch, fetch_queue, clean_queue, concurrency["fetch"], retry),
+                _run_stage("load", functools.partial(fetch, retries=FETCH_RETRIES), load_queue, clean_queue,
+                           concurrency["load"]),
+            ], clean_queue, clean_workers),
+            _close_after([
+                _run_batch_stage("clean", clean, clean_queue, write_queue, clean_workers, clean_batch_size),
+            ], write_queue, concurrency["write"]),
+            *(write() for _ in range(concurrency["write"])),
+        )
+    finally:
+        reporter.stop()
+        for queue_name in stage_queues:
+            QUEUE_DEPTH.remove(queue=queue_name)
+        if owns_executors:
+            _shutdown_executors(executors)
+    return [job.stats for job in jobs]
 
-    # 배치 처리
-    BATCH_SIZE = 5000  # 배치 크기 설정
-    all_results = []
 
-    for i in range(0, len(video_ids), BATCH_SIZE):
-        batch = video_ids[i:i + BATCH_SIZE]
-        batch_idx = i // BATCH_SIZE + 1
-        logger.info(f"배치 {batch_idx} 처리 시작: {len(batch)}개 비디오")
+# ─── 결과 저장 (외부 병합 정렬) ───────────────────────────────────────
+OUTPUT_FIELDNAMES = ["Published At", "Title", "Video URL", "Subtitles"]
+RUN_SIZE = 1000  # 메모리에 모았다가 정렬해서 run 파일로 내보내는 행 수
+CSV_FIELD_SIZE_LIMIT = min(sys.maxsize, 2 ** 31 - 1)  # Windows 의 C long 은 32비트
+
+
+def raise_csv_field_limit():
+    # 긴 자막이 한 칸에 들어가므로 CSV 를 다시 읽기 전에 csv 기본 필드 크기 제한(128KB)을 푼다.
+    # 프로세스 전체 설정이므로 import 할 때가 아니라 실제로 읽는 곳에서 부른다
+    csv.field_size_limit(CSV_FIELD_SIZE_LIMIT)
+
 
-        batch_results = process_batch(batch, sub_lang, batch_idx, BATCH_SIZE, output_file, max_workers=max_videos)
-        all_results.extend(batch_results)
+def subtitle_columns(languages):
+    """{언어: 자막 열 이름}. 언어가 하나면 예전처럼 `Subtitles`, 여럿이면 `Subtitles (ko)` 처럼 언어마다 한 열"""
+    languages = parse_languages(languages)
+    if len(languages) == 1:
+        return {languages[0]: "Subtitles"}
+    return {lang: f"Subtitles ({lang})" for lang in languages}
 
-        # 중간 결과 저장
-        with open(output_file, "w", encoding="utf-8", newline="") as csvfile:
-            fieldnames = ["Published At", "Title", "Video URL", "Subtitles"]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(all_results)
 
-        logger.info(f"중간 결과 저장 완료: {len(all_results)}개 항목")
+def output_fieldnames(languages="ko"):
+    return OUTPUT_FIELDNAMES[:-1] + list(subtitle_columns(languages).values())
 
-    logger.info(f"\n===== 최종 정렬 작업 실행 =====")
-    all_results.sort(
-        key=lambda x: datetime.fromisoformat(x["Published At"].rstrip("Z"))
-    )
-    # ──────────────────────────────────────────────────────────
 
-    # ─── 최종 저장 ───────────────────────────────────────────────
-    with open(output_file, "w", encoding="utf-8", newline="") as csvfile:
+def _published_at_key(row):
+    return row.get("Published At") or ""
+
+
+class _CsvSink:
+    extension = "csv"
+
+    def __init__(self, path, fieldnames):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetSink:
+    """zstd 압축 Parquet. row_group_size 행마다 row group 하나를 바로 써 낸다."""
+    extension = "parquet"
+    requires = "pyarrow"
+
+    def __init__(self, path, fieldnames, row_group_size=1000):
+        self.fieldnames = fieldnames
+        self.row_group_size = row_group_size
+        self.pyarrow = optional_module("pyarrow")
+        self.schema = self.pyarrow.schema([(name, self.pyarrow.string()) for name in fieldnames])
+        self.writer = optional_module("pyarrow.parquet").ParquetWriter(path, self.schema, compression="zstd")
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            columns = {name: [row.get(name) for row in self.rows] for name in self.fieldnames}
+            self.writer.write_table(self.pyarrow.table(columns, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+class _JsonlZstSink:
+    """한 줄에 JSON 객체 하나, zstd 스트림 압축"""
+    extension = "jsonl.zst"
+    requires = "zstandard"
+
+    def __init__(self, path, fieldnames, level=3):
+        self.fieldnames = fieldnames
+        self.file = open(path, "wb")
+        self.stream = zstandard.ZstdCompressor(level=level).stream_writer(self.file, closefd=False)
+
+    def write(self, row):
+        record = {name: row.get(name) for name in self.fieldnames}
+        self.stream.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def close(self):
+        self.stream.close()
+        self.file.close()
+
+
+OUTPUT_FORMATS = {
+    "csv": _CsvSink,
+    "parquet": _ParquetSink,
+    "jsonl.zst": _JsonlZstSink,
+}
+
+
+def get_output_sink_class(output_format):
+    # 형식 이름과 선택 의존성을 작업 시작 전에 확인한다
+    sink_class = OUTPUT_FORMATS.get(output_format)
+    if sink_class is None:
+        raise ValueError(f"지원하지 않는 출력 형식: {output_format} (가능: {', '.join(OUTPUT_FORMATS)})")
+    package = getattr(sink_class, "requires", None)
+    if package and optional_module(_LAZY_MODULES.get(package, package)) is None:
+        raise ImportError(f"{output_format} 출력에는 {package} 패키지가 필요합니다. (pip install {package})")
+    return sink_class
+
+
+def open_output_sink(output_format, path, fieldnames=OUTPUT_FIELDNAMES):
+    return get_output_sink_class(output_format)(path, fieldnames)
+
+
+class SortedResultWriter:
+    """행을 받는 즉시 버퍼에 쌓고, run_size 개가 차면 정렬해서 run 파일로 내보낸다.
+
+    close() 에서 run 파일들을 k-way merge 해 `Published At` 순서로 최종 출력 파일
+    (csv / parquet / jsonl.zst) 에 흘려 쓴다. 메모리에는 항상 run 하나 분량만 남으므로
+    채널 크기와 상관없이 사용량이 일정하다.
+    """
+
+    def __init__(self, output_file, fieldnames=OUTPUT_FIELDNAMES, run_size=RUN_SIZE, work_dir=None,
+                 output_format="csv", on_spill=None):
+        get_output_sink_class(output_format)
+        self.output_file = output_file
+        self.output_format = output_format
+        self.fieldnames = fieldnames
+        self.run_size = run_size
+        self.work_dir = work_dir or f"{output_file}.runs"
+        self.on_spill = on_spill
+        self.buffer = []
+        self.rows_written = 0
+        # 이전 실행이 남긴 run 파일은 그대로 최종 병합에 포함한다
+        self.run_files = sorted(
+            os.path.join(self.work_dir, name) for name in os.listdir(self.work_dir)
+            if name.startswith("run_") and name.endswith(".csv")
+        ) if os.path.isdir(self.work_dir) else []
+
+    def write(self, row, video_id=None):
+        self.buffer.append((row, video_id))
+        self.rows_written += 1
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        if not self.buffer:
+            return
+        if not os.path.exists(self.work_dir):
+            os.makedirs(self.work_dir)
+        self.buffer.sort(key=lambda entry: _published_at_key(entry[0]))
+        run_file = os.path.join(self.work_dir, f"run_{len(self.run_files):05d}.csv")
+        _write_csv_atomic(run_file, self.fieldnames, (row for row, _ in self.buffer))
+        self.run_files.append(run_file)
+        if self.on_spill:
+            # run 파일이 디스크에 확정된 다음에 알린다 (저널의 written 기록)
+            self.on_spill(run_file, [video_id for _, video_id in self.buffer if video_id])
+        self.buffer = []
+
+    def read_video_urls(self, run_file):
+        raise_csv_field_limit()
+        with open(run_file, "r", encoding="utf-8", newline="") as f:
+            return [row["Video URL"] for row in csv.DictReader(f)]
+
+    def close(self):
+        self._spill()
+        logger.info(f"정렬된 run {len(self.run_files)}개 병합 시작")
+        raise_csv_field_limit()
+        readers = []
+        files = []
+        tmp_path = f"{self.output_file}.tmp"
+        sink = open_output_sink(self.output_format, tmp_path, self.fieldnames)
+        try:
+            for run_file in self.run_files:
+                f = open(run_file, "r", encoding="utf-8", newline="")
+                files.append(f)
+                readers.append(csv.DictReader(f))
+            for row in heapq.merge(*readers, key=_published_at_key):
+                sink.write(row)
+        finally:
+            sink.close()
+            for f in files:
+                f.close()
+        os.replace(tmp_path, self.output_file)
+
+        for run_file in self.run_files:
+            os.remove(run_file)
+        if os.path.isdir(self.work_dir) and not os.listdir(self.work_dir):
+            os.rmdir(self.work_dir)
+
+
+def _write_csv_atomic(path, fieldnames, rows):
+    # 임시 파일에 다 쓴 다음 교체해서, 중간에 죽어도 반쯤 쓰인 파일이 남지 않게 한다
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(all_results)
-    # ──────────────────────────────────────────
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
 
-    # 최종 결과 정리
-    elapsed_time = time.time() - start_time
-    success_rate = len(all_results) / total_count * 100 if total_count else 0
 
-    logger.info(f"\n===== 작업 완료 =====")
-    logger.info(f"채널: {channel_url}")
-    logger.info(f"총 영상 수: {total_count}")
-    logger.info(f"성공한 영상 수: {len(all_results)} ({success_rate:.1f}%)")
-    logger.info(f"처리 시간: {elapsed_time / 60:.1f}분")
-    logger.info(f"데이터 저장 위치: {output_file}")
+def _channel_handle(channel_url):
+    # 채널 핸들 추출
+    if '@' in channel_url:
+        return channel_url.split('@')[-1].split('/')[0]
+    return channel_url.rstrip('/').split('/')[-1]
+
 
+def _channel_result_dir(channel_handle):
+    # 채널별 결과 디렉토리 생성
+    channel_result_dir = os.path.join(get_collector().result_folder, channel_handle)
+    if not os.path.exists(channel_result_dir):
+        os.makedirs(channel_result_dir)
+    return channel_result_dir
+
+
+def _channel_weights(channels):
+    # 채널 URL 또는 (채널 URL, 가중치) 목록 → {채널 URL: 가중치}. 같은 채널은 하나로 합친다
+    weights = OrderedDict()
+    for channel in channels:
+        channel_url, weight = (channel, 1) if isinstance(channel, str) else channel
+        weights[channel_url] = max(weights.get(channel_url, 0), int(weight))
+    if not weights:
+        raise ValueError("수집할 채널이 없습니다.")
+    return weights
+
+
+class IndexFeeder:
+    """저장된 결과 행을 백그라운드 스레드에서 검색 색인(SubtitleIndex)에 넣는다.
+
+    자막 구간 시각(timeline)은 subtitle_cache 의 원본 자막으로 만든다. 색인된 내용과 같은 영상은
+    해시만 비교하고 넘어가므로 같은 채널을 다시 수집해도 색인 비용은 거의 들지 않는다.
+    색인이 밀려 큐가 가득 차면 넣는 쪽이 자리가 날 때까지 기다린다 (영상을 건너뛰지 않는다).
+    asyncio 저장 단계에서는 이벤트 루프를 막지 않도록 submit_async() 를, 이벤트 루프 밖
+    (코디네이터의 결과 합치기)에서는 submit() 을 쓴다.
+    여러 언어를 수집할 때는 첫 번째 언어의 자막 열만 색인한다.
+    """
+
+    def __init__(self, index_path, sub_lang, queue_size=1000, subtitle_source="auto"):
+        self.index = SubtitleIndex(index_path)
+        languages = parse_languages(sub_lang)
+        self.sub_lang = languages[0]
+        self.column = subtitle_columns(languages)[self.sub_lang]
+        self.subtitle_source = subtitle_source
+        self.indexed = 0
+        self.unchanged = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="subtitle-index", daemon=True)
+        self._thread.start()
+
+    def _entry(self, channel_url, row, video_id):
+        return channel_url, row, video_id or row["Video URL"].split("v=")[-1]
+
+    def submit(self, channel_url, row, video_id=None):
+        self._queue.put(self._entry(channel_url, row, video_id))
+
+    async def submit_async(self, channel_url, row, video_id=None):
+        entry = self._entry(channel_url, row, video_id)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # 저장 단계만 기다리게 하고 (앞의 정리/수집 단계는 저장 큐가 차면 알아서 멈춘다) 이벤트 루프는 막지 않는다
+            await asyncio.get_running_loop().run_in_executor(None, self._queue.put, entry)
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            try:
+                self._ingest(*entry)
+            except Exception as e:
+                logger.warning(f"검색 색인 실패 ({entry[2]}): {e}")
+
+    def _ingest(self, channel_url, row, video_id):
+        text = row.get(self.column)
+        if not text:
+            return
+        if self.index.indexed_hash(video_id) == index_content_hash(row.get("Title"), text):
+            self.unchanged += 1
+            return
+        _, subtitles = lookup_cached_subtitles(video_id, self.sub_lang, self.subtitle_source) or (None, None)
+        timeline = build_timeline(text, iter_subtitle_segments(subtitles)) if subtitles else None
+        self.index.add(video_id, text, channel=channel_url, title=row.get("Title"), url=row.get("Video URL"),
+                       published_at=row.get("Published At"), timeline=timeline)
+        self.indexed += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self.index.close()
+        logger.info(f"검색 색인 갱신 ({self.index.db_path}): 새로 색인 {self.indexed}개, 변경 없음 {self.unchanged}개")
+
+
+class _ChannelRun:
+    """채널 하나의 결과 폴더, 작업 폴더(저널 + run 파일), 출력 파일을 준비하고 마무리한다"""
+
+    def __init__(self, channel_url, sub_lang, max_videos, start_date, end_date, output_format, weight=1,
+                 label=None, index_feeder=None, subtitle_source="auto"):
+        self.channel_url = channel_url
+        self.index_feeder = index_feeder
+        sink_class = get_output_sink_class(output_format)
+        languages = parse_languages(sub_lang)
+
+        channel_handle = _channel_handle(channel_url)
+        channel_result_dir = _channel_result_dir(channel_handle)
+
+        # 같은 조건으로 다시 실행하면 같은 작업 폴더의 저널과 run 파일을 이어서 쓴다
+        # (자동 자막만 받는 기본값이면 예전 버전과 같은 작업 폴더가 나온다)
+        run_params = f"{channel_url}|{','.join(languages)}|{max_videos}|{start_date}|{end_date}|{output_format}"
+        if subtitle_source != "auto":
+            run_params += f"|{subtitle_source}"
+        run_key = hashlib.md5(run_params.encode()).hexdigest()[:12]
+        self.run_dir = os.path.join(channel_result_dir, f".run_{run_key}")
+        if not os.path.exists(self.run_dir):
+            os.makedirs(self.run_dir)
+        self.journal = RunJournal(os.path.join(self.run_dir, "journal.jsonl"))
+        self.resuming = bool(self.journal.states)  # 이전 실행이 남긴 진행 기록이 있는지
+
+        # 출력 파일 설정 (이어서 실행하는 경우 처음 정한 파일 이름을 그대로 쓴다)
+        self.output_file = self.journal.meta.get("output_file")
+        if not self.output_file:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_filename = f"{channel_handle}_subtitles_{timestamp}.{sink_class.extension}"
+            self.output_file = os.path.join(channel_result_dir, output_filename)
+            self.journal.set_meta("output_file", self.output_file)
+
+        # 끝난 영상부터 바로 run 파일로 흘려 쓰고 마지막에 병합 정렬
+        self.writer = SortedResultWriter(self.output_file, output_fieldnames(languages), output_format=output_format,
+                                         work_dir=os.path.join(self.run_dir, "runs"), on_spill=self.on_spill)
+
+        # run 파일은 확정됐는데 저널에 기록하기 직전에 죽은 경우: run 파일 내용으로 저널을 맞춘다
+        for run_file in self.writer.run_files:
+            if f"run:{os.path.basename(run_file)}" not in self.journal.meta:
+                self.on_spill(run_file, [url.split("v=")[-1] for url in self.writer.read_video_urls(run_file)])
+
+        self.job = ChannelJob(channel_url, self.on_row, self.journal, weight, label)
+
+    async def on_row(self, row, video_id):
+        self.writer.write(row, video_id)
+        if self.index_feeder:
+            await self.index_feeder.submit_async(self.channel_url, row, video_id)
+
+    def on_spill(self, run_file, video_ids):
+        self.journal.record_many(video_ids, "written")
+        self.journal.set_meta(f"run:{os.path.basename(run_file)}", len(video_ids))
+
+    def finish(self, elapsed_time):
+        """최종 정렬 파일을 만들고 결과를 기록한다. 영상 ID 를 하나도 못 가져왔으면 None
+
+        목록 수집이 실패했거나 이전 실행의 기록이 있으면 작업 폴더(저널 + run 파일)를 지우지 않고 남겨서
+        다음 실행이 이어서 쓰게 한다. 목록을 받았는데 영상이 없고 이어 쓸 기록도 없을 때만 지운다.
+        """
+        stats = self.job.stats
+        if not stats.total and not stats.resumed:
+            self.journal.close()
+            if stats.listed and not self.resuming:
+                logger.error(f"영상 ID를 가져오지 못했습니다: {self.channel_url}")
+                shutil.rmtree(self.run_dir, ignore_errors=True)
+            else:
+                logger.error(f"영상 ID를 가져오지 못했습니다: {self.channel_url} "
+                             f"(다음 실행에서 이어서 쓰도록 작업 폴더를 남겨 둡니다: {self.run_dir})")
+            return None
 
+        logger.info(f"\n===== 최종 정렬 작업 실행 ({self.channel_url}) =====")
+        self.writer.close()
+        written_count = self.journal.count("written")
+        total_count = stats.total + stats.resumed
+
+        # 끝까지 저장했으므로 저널과 run 파일은 더 이상 필요 없다
+        self.journal.close()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+        # 최종 결과 정리
+        success_rate = written_count / total_count * 100 if total_count else 0
+
+        logger.info(f"\n===== 작업 완료 =====")
+        logger.info(f"채널: {self.channel_url}")
+        logger.info(f"총 영상 수: {total_count}")
+        logger.info(f"성공한 영상 수: {written_count} ({success_rate:.1f}%)")
+        logger.info(f"처리 시간: {elapsed_time / 60:.1f}분")
+        logger.info(f"데이터 저장 위치: {self.output_file}")
+        return self.output_file
+
+
+def write_metrics_summary(started_at, written_before=0, label="run"):
+    """이번 실행의 계측 값(JSON 요약)을 logs/ 에 남기고 경로를 돌려준다.
+
+    카운터는 프로세스 전체 누적값이므로 처리량은 실행 시작 시점의 저장 수(written_before)를 빼서 계산한다.
+    """
+    elapsed = time.time() - started_at
+    written = VIDEOS_WRITTEN.value() - written_before
+    label = re.sub(r"[^\w.-]", "_", label)
+    path = os.path.join(get_collector().folder("log"), f"metrics_{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    metrics.write_summary(path, run_seconds=round(elapsed, 3), videos_written=written,
+                          videos_per_second=round(written / elapsed, 3) if elapsed else 0)
+    logger.info(f"계측 요약 저장: {path} (초당 {written / elapsed if elapsed else 0:.2f}개 영상)")
+    return path
+
+
+def collect_channels(channels, sub_lang="ko", max_videos=None, start_date=None, end_date=None,
+                     concurrency=None, output_format="csv", incremental=False, index_path=None,
+                     subtitle_source="auto"):
+    """여러 채널을 한 프로세스에서 함께 수집하고 채널마다 출력 파일을 하나씩 만든다.
+
+    channels 는 채널 URL 또는 (채널 URL, 가중치) 목록이다. 가중치가 클수록 한 바퀴에 더 많은
+    영상이 큐에 들어간다. 반환값은 {채널 URL: 출력 파일 경로 (영상이 없으면 None)}.
+    sub_lang 에 언어를 여러 개("ko,en" 이나 목록) 주면 영상마다 한 번만 추출하고 언어마다 한 열을 쓴다.
+    subtitle_source 는 수동/자동 자막 중 무엇을 쓸지 정한다 (SUBTITLE_SOURCES, 기본값은 자동 자막만).
+    index_path 를 주면 저장되는 영상을 그 검색 색인에도 넣는다.
+    """
+    get_collector().start_logging()
+    start_time = time.time()
+    written_before = VIDEOS_WRITTEN.value()
+    get_output_sink_class(output_format)
+    languages = parse_languages(sub_lang)
+    if subtitle_source not in SUBTITLE_SOURCES:
+        raise ValueError(f"알 수 없는 자막 선택 방식: {subtitle_source} (가능: {', '.join(SUBTITLE_SOURCES)})")
+    start_temp_gc()
+
+    # 같은 채널이 두 번 들어오면 같은 작업 폴더를 쓰게 되므로 하나로 합친다
+    weights = _channel_weights(channels)
+    logger.info(f"작업 시작: 채널 {len(weights)}개 ({', '.join(weights)}), 언어: {', '.join(languages)}, "
+                f"자막: {subtitle_source}")
+
+    label_channels = len(weights) > 1
+    index_feeder = IndexFeeder(index_path, languages, subtitle_source=subtitle_source) if index_path else None
+    runs = [_ChannelRun(channel_url, languages, max_videos, start_date, end_date, output_format, weight,
+                        label=channel_url if label_channels else None, index_feeder=index_feeder,
+                        subtitle_source=subtitle_source)
+            for channel_url, weight in weights.items()]
+    try:
+        asyncio.run(run_channels([run.job for run in runs], languages, max_videos, start_date, end_date,
+                                 concurrency=concurrency, incremental=incremental, subtitle_source=subtitle_source))
+    except BaseException:
+        for run in runs:
+            run.journal.close()
+        raise
+    finally:
+        if index_feeder:
+            index_feeder.close()
+
+    elapsed_time = time.time() - start_time
+    outputs = OrderedDict((run.channel_url, run.finish(elapsed_time)) for run in runs)
+    logger.info(f"yt-dlp 요청 제어 상태: {yt_dlp_limiter.snapshot()}")
+    write_metrics_summary(start_time, written_before)
+    return outputs
+
+
+def collect_and_save_data(channel_url, sub_lang="ko", max_videos=None, start_date=None, end_date=None,
+                          concurrency=None, output_format="csv", incremental=False, index_path=None,
+                          subtitle_source="auto"):
+    outputs = collect_channels([channel_url], sub_lang, max_videos, start_date, end_date, concurrency=concurrency,
+                               output_format=output_format, incremental=incremental, index_path=index_path,
+                               subtitle_source=subtitle_source)
+    return outputs[channel_url]
+
+
+# ─── 여러 머신에서 나눠 수집 (코디네이터 / 워커) ──────────────────────
+# 코디네이터가 채널 목록을 받아 영상 ID 를 작업 큐에 넣고, 워커들이 임대해서 처리한 결과 행을 큐에 남긴다.
+# 모든 작업이 끝나면 코디네이터가 채널별로 결과를 모아 정렬된 출력 파일 하나로 합친다.
+LEASE_SECONDS = 600  # 임대 한 번의 유효 시간. 처리 중에는 1/3 마다 연장한다
+LEASE_BATCH = 100  # 워커가 한 번에 임대하는 영상 수
+QUEUE_POLL_INTERVAL = 5  # 할 일이 없을 때 큐를 다시 확인하는 간격(초)
+# 다시 시도해도 결과가 같은 실패. 이 밖의 실패는 큐의 시도 횟수가 남았으면 다른 워커가 다시 처리한다
+PERMANENT_FAILURES = ("members_only", "age_restricted", "no_subtitles")
+
+
+def weighted_round(active):
+    """[(key, weight, 반복자)] 를 한 바퀴 돌며 key 마다 weight 개씩 (key, item) 을 내보낸다.
+
+    다 쓴 항목은 active 에서 뺀다. 바퀴 사이에 active 에 새 항목을 넣어도 된다 (파이프라인의 dispatch).
+    """
+    for entry in list(active):
+        key, weight, items = entry
+        for _ in range(weight):
+            item = next(items, None)
+            if item is None:
+                active.remove(entry)
+                break
+            yield key, item
+
+
+def interleave_weighted(channel_items):
+    """[(key, weight, items)] 를 가중치 라운드 로빈 순서의 (key, item) 으로 펼친다"""
+    active = [(key, max(int(weight), 1), iter(items)) for key, weight, items in channel_items]
+    while active:
+        yield from weighted_round(active)
+
+
+def coordinate_channels(job_queue, channels, sub_lang="ko", max_videos=None, start_date=None, end_date=None,
+                        output_format="csv", incremental=False, poll_interval=QUEUE_POLL_INTERVAL,
+                        index_path=None, subtitle_source="auto"):
+    """채널 영상을 작업 큐에 넣고 워커들이 끝낼 때까지 기다린 뒤 채널별 출력 파일을 만든다.
+
+    같은 큐 파일로 다시 실행하면 이미 끝난 영상은 다시 넣지 않고 남은 작업만 기다린다.
+    반환값은 {채널 URL: 출력 파일 경로 (결과가 없으면 None)}.
+    index_path 를 주면 합친 결과를 검색 색인에도 넣는다 (원본 자막이 이 머신의 캐시에 없으면 시각 정보는 빠진다).
+    """
+    get_collector().start_logging()
+    start_time = time.time()
+    get_output_sink_class(output_format)
+    languages = parse_languages(sub_lang)
+    weights = _channel_weights(channels)
+    job_queue.set_meta("params", {"sub_lang": list(languages), "subtitle_source": subtitle_source})
+
+    channel_ids = []
+    for channel_url, weight in weights.items():
+        video_ids = get_video_ids(channel_url, max_videos, start_date, end_date, incremental)
+        logger.info(f"[{channel_url}] 영상 {len(video_ids)}개 작업 큐에 등록")
+        channel_ids.append((channel_url, weight, video_ids))
+    # 큐는 등록 순서대로 임대되므로 라운드 로빈 순서로 넣어 두면 워커 쪽도 채널을 번갈아 처리한다
+    added = job_queue.add(interleave_weighted(channel_ids))
+    job_queue.set_meta("sealed", True)
+    logger.info(f"새 작업 {added}개 등록, 워커 처리 대기 중")
+
+    while True:
+        # 죽은 워커의 작업도 워커가 다시 임대하기 전에 진행 상황에 반영되도록 코디네이터도 회수한다
+        job_queue.reclaim_expired()
+        counts = job_queue.counts()
+        total = sum(counts.values())
+        finished = counts["done"] + counts["failed"]
+        percent = finished / total * 100 if total else 100.0
+        logger.info(f"작업 큐 진행 상황: {finished}/{total} ({percent:.1f}%) "
+                    f"대기 {counts['pending']}, 처리 중 {counts['leased']}, 실패 {counts['failed']}")
+        if not counts["pending"] and not counts["leased"]:
+            break
+        time.sleep(poll_interval)
+
+    outputs = OrderedDict()
+    index_feeder = IndexFeeder(index_path, languages, subtitle_source=subtitle_source) if index_path else None
+    for channel_url in weights:
+        channel_handle = _channel_handle(channel_url)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = os.path.join(_channel_result_dir(channel_handle),
+                                   f"{channel_handle}_subtitles_{timestamp}.{OUTPUT_FORMATS[output_format].extension}")
+        writer = SortedResultWriter(output_file, output_fieldnames(languages), output_format=output_format)
+        for row in job_queue.results(channel_url):
+            writer.write(row)
+            if index_feeder:
+                index_feeder.submit(channel_url, row)
+        if not writer.rows_written:
+            logger.error(f"수집된 결과가 없습니다: {channel_url}")
+            outputs[channel_url] = None
+            continue
+        writer.close()
+        logger.info(f"[{channel_url}] {writer.rows_written}개 영상 저장: {output_file}")
+        outputs[channel_url] = output_file
+    if index_feeder:
+        index_feeder.close()
+    logger.info(f"처리 시간: {(time.time() - start_time) / 60:.1f}분")
+    return outputs
+
+
+class _LeasedChannelJob(ChannelJob):
+    """임대한 영상만 처리하고 결과를 작업 큐에 돌려주는 ChannelJob"""
+
+    def __init__(self, channel_url, leased, job_queue):
+        self.leased = {job.video_id: job for job in leased}
+        self.job_queue = job_queue
+        self.reasons = {}
+        super().__init__(channel_url, self.complete, video_ids=list(self.leased), label=channel_url)
+
+    def record(self, video_id, state, reason=None):
+        super().record(video_id, state, reason)
+        if state == "failed":
+            self.reasons[video_id] = reason
+
+    def complete(self, row, video_id):
+        self.job_queue.complete(self.leased.pop(video_id).job_id, row)
+
+    def settle(self):
+        # 결과가 나오지 않은 영상은 영구 실패면 바로, 아니면 시도 횟수가 남은 동안 큐에 되돌린다
+        for video_id, job in self.leased.items():
+            reason = self.reasons.get(video_id) or "error"
+            self.job_queue.fail(job.job_id, reason, retry=reason not in PERMANENT_FAILURES)
+        self.leased = {}
+
+    def release(self):
+        # 중단된 워커: 시도 횟수를 쓰지 않고 바로 다른 워커가 가져갈 수 있게 한다
+        for job in self.leased.values():
+            self.job_queue.release(job.job_id)
+        self.leased = {}
+
+
+def run_worker(job_queue, worker_id=None, lease_batch=LEASE_BATCH, lease_seconds=LEASE_SECONDS, concurrency=None,
+               poll_interval=QUEUE_POLL_INTERVAL):
+    """작업 큐에서 영상을 임대해 처리한다. 코디네이터가 등록을 마쳤고 남은 작업이 없으면 끝난다.
+
+    이벤트 루프, 스레드 풀, 정리 프로세스 풀, 임대 연장 스레드는 워커가 끝날 때까지 하나씩만 만들어
+    모든 임대 묶음이 함께 쓴다. 반환값은 이 워커가 결과를 넘긴 영상 수.
+    """
+    get_collector().start_logging()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    started_at = time.time()
+    written_before = VIDEOS_WRITTEN.value()
+    logger.info(f"워커 시작: {worker_id}")
+    start_temp_gc()
+    concurrency = {**PIPELINE_CONCURRENCY, **(concurrency or {})}
+    executors = _pipeline_executors(concurrency)
+
+    # 처리하는 동안 임대가 만료되지 않도록 이 워커의 임대를 주기적으로 연장한다
+    stop_renewing = threading.Event()
+
+    def renew():
+        while not stop_renewing.wait(lease_seconds / 3):
+            job_queue.renew(worker_id, lease_seconds)
+
+    renewer = threading.Thread(target=renew, name="lease-renewer", daemon=True)
+    renewer.start()
+    try:
+        processed = asyncio.run(_work_leases(job_queue, worker_id, lease_batch, lease_seconds, concurrency,
+                                             poll_interval, executors))
+    finally:
+        stop_renewing.set()
+        renewer.join()
+        _shutdown_executors(executors)
+    logger.info(f"워커 종료: {worker_id}, 처리한 영상 {processed}개")
+    write_metrics_summary(started_at, written_before, label=f"worker_{worker_id}")
+    return processed
+
+
+async def _work_leases(job_queue, worker_id, lease_batch, lease_seconds, concurrency, poll_interval, executors):
+    # run_worker 의 본체: 임대 묶음마다 같은 이벤트 루프와 풀로 run_channels 를 돌린다
+    processed = 0
+    while True:
+        params = job_queue.get_meta("params")
+        leased = job_queue.lease(worker_id, lease_batch, lease_seconds) if params else []
+        if not leased:
+            counts = job_queue.counts()
+            if job_queue.get_meta("sealed") and not counts["pending"] and not counts["leased"]:
+                return processed
+            await asyncio.sleep(poll_interval)
+            continue
+
+        by_channel = OrderedDict()
+        for job in leased:
+            by_channel.setdefault(job.channel, []).append(job)
+        jobs = [_LeasedChannelJob(channel_url, channel_jobs, job_queue) for channel_url, channel_jobs in by_channel.items()]
+        try:
+            await run_channels(jobs, params["sub_lang"], concurrency=concurrency,
+                               subtitle_source=params.get("subtitle_source", "auto"), executors=executors)
+        except BaseException:
+            for job in jobs:
+                job.release()
+            raise
+        for job in jobs:
+            processed += job.stats.written
+            job.settle()
+
+
+def load_channel_list(path):
+    """채널 목록 파일 읽기: 한 줄에 `채널 URL [가중치]`, 빈 줄과 #으로 시작하는 줄은 무시한다"""
+    channels = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) > 2 or (len(parts) == 2 and not validate_positive_integer(parts[1])):
+                raise ValueError(f"{path}:{line_number}: `채널 URL [가중치]` 형식이 아닙니다: {line}")
+            channels.append((parts[0], int(parts[1]) if len(parts) == 2 else 1))
+    return channels
 
-    # 임시 파일 정리
-    if input("배치 파일을 정리하시겠습니까? (y/n): ").lower() == 'y':
-        # 배치 파일 정리
-        for i in range(1, (total_count // BATCH_SIZE) + 2):  # +2는 나머지와 인덱스 1부터 시작을 고려
-            batch_file = f"{output_file}.batch{i}"
-            if os.path.exists(batch_file):
-                os.remove(batch_file)
-        logger.info("배치 파일 정리 완료")
 
 def get_valid_input(prompt, validation_func=None, optional=False):
     while True:
@@ -503,6 +2658,13 @@ def validate_positive_integer(value):
     return value.isdigit() and int(value) > 0
 
 
+def validate_languages(value):
+    try:
+        return bool(parse_languages(value))
+    except ValueError:
+        return False
+
+
 def validate_date_format(value):
     try:
         datetime.fromisoformat(value)
@@ -510,41 +2672,172 @@ def validate_date_format(value):
     except ValueError:
         return False
 
-def check_cache_coverage(lang="ko", subtitle=None,video_ids=None):
+def check_cache_coverage(languages="ko", subtitle=None, video_ids=None, source="auto"):
+    """캐시에 영상 정보 / 자막이 없는 영상 ID 목록 (파일 시스템을 뒤지지 않고 키 인덱스로 한 번에 확인)
+
+    languages 는 언어 하나 또는 여러 개다. 자막은 언어마다 source 의 우선순위대로 트랙을 확인해서,
+    쓸 트랙이 캐시에 있거나 더 앞선 트랙들이 없다고 기록된 언어만 채워진 것으로 본다.
+    """
+    collector = get_collector()
     missing = []
     if video_ids:
-        for vid in video_ids:
-            hashed_key = hashlib.md5(f"details_{vid}".encode()).hexdigest()
-            path = os.path.join(CACHE_FOLDER, "videos", f"{hashed_key}.pkl")
-            if not os.path.exists(path):
-                missing.append(vid)
+        missing = [key[len("details_"):] for key in collector.video_cache.missing_keys(f"details_{vid}" for vid in video_ids)]
         logger.info(f"비디오 디테일 : 총 {len(video_ids)}개 중 {len(missing)}개 캐시 누락")
-        
+
     if subtitle:
-        missing_subs = []
-        for vid in subtitle:
-            hashed_key = hashlib.md5(f"subtitle_{vid}_{lang}".encode()).hexdigest()
-            path = os.path.join(CACHE_FOLDER, "subtitles", f"{hashed_key}.pkl")
-            if not os.path.exists(path):
-                missing_subs.append(vid)
+        tracks = [(vid, lang, kind) for vid in subtitle for lang in parse_languages(languages)
+                  for kind in SUBTITLE_SOURCES[source]]
+        uncached = set(collector.subtitle_cache.missing_keys(subtitle_cache_key(*track) for track in tracks))
+        absent = collector.negative_cache.reasons(subtitle_negative_key(*track) for track in tracks
+                                        if subtitle_cache_key(*track) in uncached)
+        resolved = {}  # (영상, 언어) → 캐시로 정해졌는지
+        for vid, lang, kind in tracks:
+            if resolved.get((vid, lang)) is not None:
+                continue
+            if subtitle_cache_key(vid, lang, kind) not in uncached:
+                resolved[vid, lang] = True
+            elif absent.get(subtitle_negative_key(vid, lang, kind)) != "no_subtitles":
+                resolved[vid, lang] = False
+        missing_subs = list(OrderedDict.fromkeys(vid for (vid, _), found in resolved.items() if found is False))
         logger.info(f"자막 : 총 {len(subtitle)}개 중 {len(missing_subs)}개 캐시 누락")
         missing.extend(missing_subs)
     return missing
 
-if __name__ == "__main__":
+def date_argument(value):
+    if not validate_date_format(value):
+        raise argparse.ArgumentTypeError(f"YYYY-MM-DD 형식이 아닙니다: {value}")
+    return value
+
+
+def languages_argument(value):
+    try:
+        return ",".join(parse_languages(value))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"{e} ({value!r})")
+
+
+def positive_int_argument(value):
+    if not validate_positive_integer(value):
+        raise argparse.ArgumentTypeError(f"양의 정수가 아닙니다: {value}")
+    return int(value)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="YouTube 채널 자막 수집기. 채널을 지정하지 않으면 대화형으로 입력받는다.")
+    parser.add_argument("-c", "--channel", action="append", default=[],
+                        help="채널 URL 또는 핸들 (여러 번 지정 가능)")
+    parser.add_argument("-f", "--channels-file",
+                        help="채널 목록 파일 (한 줄에 `채널 URL [가중치]`, #으로 시작하면 주석)")
+    parser.add_argument("-l", "--lang", type=languages_argument, default="ko",
+                        help="자막 언어, 여러 개는 쉼표로 구분 (예: ko,en,ja). 영상마다 한 번만 추출하고 "
+                             "언어마다 한 열을 쓴다 (기본값: ko)")
+    parser.add_argument("--sub-source", choices=list(SUBTITLE_SOURCES), default="auto",
+                        help="auto: 자동 생성 자막, manual: 업로더가 올린 자막, prefer-manual / prefer-auto: "
+                             "앞의 것이 없으면 다른 쪽 (기본값: auto)")
+    parser.add_argument("--max-videos", type=positive_int_argument, help="채널당 최대 영상 수")
+    parser.add_argument("--start-date", type=date_argument, help="시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date_argument, help="종료일 (YYYY-MM-DD)")
+    parser.add_argument("--format", dest="output_format", choices=list(OUTPUT_FORMATS), default="csv",
+                        help="출력 형식 (기본값: csv)")
+    parser.add_argument("--incremental", action="store_true", help="새로 올라온 영상만 증분 동기화")
+    parser.add_argument("--fetch-workers", type=positive_int_argument,
+                        help=f"네트워크 추출 동시 실행 수 (기본값: {PIPELINE_CONCURRENCY['fetch']})")
+    parser.add_argument("--clean-processes", type=int,
+                        help=f"자막 정리 프로세스 수, 0 이면 스레드에서 정리 (기본값: {PIPELINE_CONCURRENCY['clean']})")
+    parser.add_argument("--index", nargs="?", const=os.path.join(get_collector().cache_folder, "subtitle_index.db"),
+                        help="수집한 자막을 검색 색인에도 넣는다 (경로를 생략하면 cache/subtitle_index.db). "
+                             "검색은 python subtitle_index.py <색인> search <검색어>")
+    parser.add_argument("--metrics-port", type=int,
+                        help="지정하면 이 포트에서 Prometheus 형식 /metrics 와 /metrics.json 을 제공한다")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="메트릭 엔드포인트를 열 주소 (기본값: 127.0.0.1, 다른 머신에서 수집하려면 0.0.0.0)")
+    distributed = parser.add_argument_group("여러 머신에서 나눠 수집")
+    distributed.add_argument("--queue", help="작업 큐 SQLite 파일 (코디네이터와 워커가 같은 파일을 쓴다)")
+    distributed.add_argument("--role", choices=["coordinator", "worker"],
+                             help="coordinator: 채널 영상을 큐에 넣고 결과를 합친다, worker: 큐의 영상을 처리한다")
+    distributed.add_argument("--worker-id", help="워커 이름 (기본값: 호스트명-PID)")
+    distributed.add_argument("--lease-seconds", type=positive_int_argument, default=LEASE_SECONDS,
+                             help=f"임대 유효 시간(초) (기본값: {LEASE_SECONDS})")
+    distributed.add_argument("--lease-batch", type=positive_int_argument, default=LEASE_BATCH,
+                             help=f"워커가 한 번에 임대하는 영상 수 (기본값: {LEASE_BATCH})")
+    distributed.add_argument("--shared-disk", action="store_true",
+                             help="큐 파일을 여러 머신이 공유 디스크로 함께 쓸 때 WAL 대신 롤백 저널을 쓴다 "
+                                  "(코디네이터와 모든 워커에 같이 준다)")
+    return parser
+
+
+def prompt_arguments():
+    """인자 없이 실행했을 때의 대화형 입력"""
     print("===== YouTube 자막 수집기 =====")
     print(f"현재 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     channel_url = input("YouTube 채널 URL 또는 핸들을 입력하세요: ")
-    subtitle_lang = input("자막 언어(ko, en 등)를 입력하세요 [기본값: ko]: ") or "ko"
+    subtitle_lang = get_valid_input("자막 언어(ko, en 등, 여러 개는 쉼표로 구분)를 입력하세요 [기본값: ko]: ",
+                                    validate_languages, optional=True) or "ko"
     max_videos = get_valid_input("최대 영상 수(숫자 또는 'skip'): ", validate_positive_integer, optional=True)
     max_videos = int(max_videos) if max_videos else None
 
     date_format_msg = "YYYY-MM-DD 형식으로 입력하세요 (또는 'skip'): "
     start_date = get_valid_input(f"시작일 {date_format_msg}", validate_date_format, optional=True)
     end_date = get_valid_input(f"종료일 {date_format_msg}", validate_date_format, optional=True)
+    output_format = get_valid_input(f"출력 형식({', '.join(OUTPUT_FORMATS)}) [기본값: csv]: ",
+                                    lambda value: value in OUTPUT_FORMATS, optional=True) or "csv"
+    incremental = input("새로 올라온 영상만 증분 동기화할까요? (y/n) [기본값: n]: ").strip().lower() == "y"
+
+    return dict(channels=[channel_url], sub_lang=subtitle_lang, max_videos=max_videos, start_date=start_date,
+                end_date=end_date, output_format=output_format, incremental=incremental)
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    channels = list(args.channel)
+    if args.channels_file:
+        try:
+            channels.extend(load_channel_list(args.channels_file))
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    if args.metrics_port is not None:
+        start_metrics_server(args.metrics_port, host=args.metrics_host)
+
+    concurrency = {}
+    if args.fetch_workers:
+        concurrency["fetch"] = args.fetch_workers
+    if args.clean_processes is not None:
+        concurrency["clean"] = args.clean_processes
+
+    if args.role:
+        if not args.queue:
+            parser.error("--role 에는 --queue 가 필요합니다.")
+        job_queue = SQLiteJobQueue(args.queue, shared_disk=args.shared_disk)
+        try:
+            if args.role == "worker":
+                run_worker(job_queue, args.worker_id, args.lease_batch, args.lease_seconds, concurrency=concurrency)
+                return 0
+            if not channels:
+                parser.error("코디네이터에는 -c 또는 --channels-file 로 채널을 지정해야 합니다.")
+            outputs = coordinate_channels(job_queue, channels, args.lang, args.max_videos, args.start_date,
+                                          args.end_date, args.output_format, args.incremental,
+                                          index_path=args.index, subtitle_source=args.sub_source)
+        finally:
+            job_queue.close()
+        return 0 if any(outputs.values()) else 1
+
+    if not channels:
+        options = dict(prompt_arguments(), index_path=args.index, subtitle_source=args.sub_source)
+    else:
+        options = dict(channels=channels, sub_lang=args.lang, max_videos=args.max_videos,
+                       start_date=args.start_date, end_date=args.end_date, output_format=args.output_format,
+                       incremental=args.incremental, concurrency=concurrency, index_path=args.index,
+                       subtitle_source=args.sub_source)
 
+    outputs = collect_channels(**options)
+    return 0 if any(outputs.values()) else 1
 
-    collect_and_save_data(channel_url, subtitle_lang, max_videos, start_date, end_date)
 
-    #https://youtube.com/@sbsnews8
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
+
+    #https://youtube.com/@sbsnews8